@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -86,6 +87,10 @@ DATABASES = {
     }
 }
 
+# 執行測試時直接依模型建立 scraper 的資料表，部分模型 (如情感分析與 AI 報告) 尚未有對應的遷移檔
+if 'test' in sys.argv:
+    MIGRATION_MODULES = {'scraper': None}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -176,5 +181,63 @@ AI_REPORT_SETTINGS = {
     'SAVE_PATH': os.path.join(MEDIA_ROOT, 'ai_reports'),  # 報告保存路徑
 }
 
+# 背景任務佇列設置，任務由 `python manage.py run_task_worker` 執行
+TASK_QUEUE_SETTINGS = {
+    'LEASE_SECONDS': 120,       # 領取任務的租約時間(秒)，工作程序中斷且租約到期後可由其他程序接手
+    'HEARTBEAT_INTERVAL': 30,   # 執行中任務延長租約的間隔(秒)
+    'RETRY_BACKOFF': 30,        # 失敗重試前的等待秒數，每次失敗加倍
+    'POLL_INTERVAL': 2.0,       # 工作程序沒有任務時的輪詢間隔(秒)
+    # 各類資源的總容量，所有工作程序共用；任務所需資源超過剩餘容量時留在佇列中等待
+    'RESOURCE_CAPACITY': {
+        'browser': 8,   # Chrome 瀏覽器 (爬蟲線程) 數
+        'model': 2,     # 同時執行的 CPU 模型推論任務數 (CKIP、情感分析)
+        'llm': 4,       # 同時進行的 LLM 請求數
+    },
+}
+
 # 確保報告保存目錄存在
 os.makedirs(AI_REPORT_SETTINGS['SAVE_PATH'], exist_ok=True)
+
+# 爬蟲設置
+SCRAPER_SETTINGS = {
+    'DRIVER_MAX_PAGES': 50,  # 瀏覽器池中每個瀏覽器服務多少頁後回收重建
+    'HTTP_TIMEOUT': 10,      # HTTP 抓取模式的請求超時時間(秒)
+    'ASYNC_MAX_CONCURRENCY': 200,  # asyncio 引擎同時進行中的請求上限
+    'ASYNC_PER_HOST_LIMIT': 64,    # asyncio 引擎每個主機的並行上限
+    'ASYNC_RATE_PER_HOST': 20.0,   # asyncio 引擎每個主機每秒請求數(令牌桶速率)
+    'LISTING_MAX_WORKERS': 9,      # 多線程模式下並行爬取列表頁的工作線程數(每個類別一個)
+    'PIPELINE': True,              # 以管線方式同時進行列表頁收集、文章爬取與 NLP 分析
+    'PIPELINE_QUEUE_SIZE': 100,    # 管線各階段間佇列的容量上限(背壓)
+    'NLP_WORKERS': 1,              # 管線模式的 NLP 工作線程數
+    'CHECKPOINT_INTERVAL': 20,     # 每寫入多少篇文章保存一次檢查點，供任務中斷後接續
+    'HTML_CACHE': True,            # 保存原始 HTML，重新爬取時發送條件式請求，並可離線重新解析
+    'HTML_CACHE_DIR': os.path.join(MEDIA_ROOT, 'html_cache'),  # HTML 快取目錄
+    'ADAPTIVE_CONCURRENCY': True,  # 多線程模式依延遲與錯誤率自動調整並行數 (以任務的最大線程數為起點)
+    'ADAPTIVE_MAX_WORKERS': 32,    # 自動調整時的並行數上限 (另受任務分得的瀏覽器容量限制)
+    'NEAR_DUPLICATE': 'flag',      # 近似重複文章處理方式: flag 標記並跳過 NLP/LLM 分析、skip 不保存、None 不偵測
+    'NEAR_DUPLICATE_THRESHOLD': 3,  # SimHash 漢明距離不超過此值視為近似重複
+    'SHARD_LOCAL_WORKERS': None,   # 分片任務在本機啟動的工作程序數，None 為 min(分片數, CPU 核心數)，0 表示全由其他主機執行
+    'SHARD_HEARTBEAT_INTERVAL': 30,  # 分片工作程序更新心跳的間隔(秒)
+    'SHARD_STALE_SECONDS': 300,    # 執行中分片超過此秒數沒有心跳，視為工作程序中斷，可由其他程序接手
+}
+
+# NLP 模型設置，模型在每個程序中第一次使用時載入一次，由爬蟲管線與網頁/API 視圖共用
+NLP_SETTINGS = {
+    'CKIP_MODEL': 'albert-tiny',   # CKIP Transformers 模型 (albert-tiny 效能較佳)
+    'CKIP_DEVICE': -1,             # 執行裝置，-1 為 CPU，0 以上為 GPU 編號
+    'BATCH_SIZE': 32,              # 每次模型推論的句段數，句段依長度分組以減少補齊 (padding)
+    'MAX_LENGTH': 256,             # 每個句段的最大字數，需小於模型的最大序列長度 (albert 為 510)
+    'BATCH_ARTICLES': 32,          # 一起送入模型的文章數，分析結果再依來源文章拆回
+    # 推論後端: torch 為原始 fp32 模型；quantized 為 PyTorch 動態 int8 量化；
+    # onnx 匯出為 ONNX 並以 ONNX Runtime 執行 (需安裝 onnx 與 onnxruntime)。
+    # 變更前可用 manage.py compare_nlp_backends 檢查與 torch 的結果是否一致
+    'BACKEND': 'torch',
+    'ONNX_DIR': os.path.join(MEDIA_ROOT, 'onnx_models'),  # 匯出的 ONNX 模型目錄
+    'ONNX_THREADS': None,          # ONNX Runtime 每次推論使用的線程數，None 為自動
+    'RESULT_CACHE': True,          # 以內容雜湊快取斷詞、詞性與命名實體結果，相同內容不重複分析
+    'RESULT_CACHE_PATH': os.path.join(MEDIA_ROOT, 'nlp_cache.sqlite3'),  # 快取資料庫路徑
+    # NLP 工作程序數，大於 1 時爬蟲任務的文章分析分散到多個程序，每個程序各自載入一次模型；
+    # 0 或 1 在爬蟲程序內分析
+    'PROCESS_WORKERS': 0,
+    'TORCH_THREADS': None,         # 每個 NLP 工作程序的 PyTorch 線程數，None 為 CPU 核心數除以程序數
+}
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, SentimentAnalysis, CategorySentimentSummary
+from .models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, SentimentAnalysis, CategorySentimentSummary, \
+    CrawlShard, BackgroundTask, ArticleKeyword, ArticleEntity
 
 admin.site.site_header = 'LED管理後台'  # 设置header
 admin.site.site_title = 'LED管理後台'  # 设置title
@@ -26,6 +27,23 @@ class ScrapeJobAdmin(admin.ModelAdmin):
     date_hierarchy = 'created_at'
 
 
+@admin.register(CrawlShard)
+class CrawlShardAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'shard_index', 'status', 'worker', 'attempts', 'article_count', 'heartbeat_at')
+    list_filter = ('status', 'job')
+    search_fields = ('worker',)
+    exclude = ('frontier',)  # 內容龐大，不在後台顯示
+
+
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task_type', 'user', 'status', 'priority', 'resources', 'attempts', 'worker', 'run_after',
+                    'created_at')
+    list_filter = ('status', 'task_type', 'user')
+    search_fields = ('dedupe_key', 'worker', 'user__username')
+    readonly_fields = ('created_at', 'started_at', 'finished_at')
+
+
 @admin.register(Article)
 class ArticleAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'category', 'date', 'author', 'job')
@@ -60,4 +78,28 @@ class NamedEntityAnalysisAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         # 優化查詢，減少數據庫查詢
-        return super().get_queryset(request).select_related('job')
\ No newline at end of file
+        return super().get_queryset(request).select_related('job')
+
+
+@admin.register(ArticleKeyword)
+class ArticleKeywordAdmin(admin.ModelAdmin):
+    list_display = ('id', 'word', 'pos', 'count', 'article', 'job')
+    list_filter = ('pos', 'job')
+    search_fields = ('word',)
+    raw_id_fields = ('article',)
+    list_per_page = 100
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('job', 'article')
+
+
+@admin.register(ArticleEntity)
+class ArticleEntityAdmin(admin.ModelAdmin):
+    list_display = ('id', 'entity', 'entity_type', 'count', 'article', 'job')
+    list_filter = ('entity_type', 'job')
+    search_fields = ('entity',)
+    raw_id_fields = ('article',)
+    list_per_page = 100
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('job', 'article')
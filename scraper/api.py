@@ -46,7 +46,7 @@ class SearchTermsAnalysisView(BaseAPIView):
             if not search_terms:
                 return self.get_error_response('未提供搜索詞')
 
-            # 創建CTTextProcessor實例
+            # CKIP 模型由程序內共用的模型登錄提供，建立處理器不會重新載入模型
             processor = CTTextProcessor(output_dir=settings.MEDIA_ROOT)
 
             # 分析搜索詞
@@ -150,6 +150,25 @@ class ArticleStatisticsView(BaseAPIView):
         }
 
 
+class TaskQueueStatsView(BaseAPIView):
+    """背景任務佇列狀態API，僅限管理員"""
+
+    def get(self, request):
+        """獲取各階段的佇列深度、等待時間與資源用量"""
+        if not request.user.is_staff:
+            return self.get_error_response('無權訪問', status=403)
+
+        try:
+            from .services.queue_service import queue_stats
+            hours = int(request.GET.get('hours', 24))
+            return self.get_success_response(queue_stats(window_hours=hours))
+        except ValueError:
+            return self.get_error_response('hours 參數必須為整數')
+        except Exception as e:
+            logger.error(f"獲取背景任務佇列狀態時出錯: {e}", exc_info=True)
+            return self.get_error_response(f"處理請求時發生錯誤: {str(e)}", status=500)
+
+
 @method_decorator(login_required, name='dispatch')
 class SearchPreviewView(BaseAPIView):
     """搜索預覽API，返回搜索條件匹配的文章計數"""
@@ -202,7 +221,7 @@ def analyze_search_terms_api(request):
         if not search_terms:
             return JsonResponse({'status': 'error', 'message': '未提供搜索詞'})
 
-        # 使用CTTextProcessor進行分析
+        # 使用CTTextProcessor進行分析，模型已在程序內共用
         processor = CTTextProcessor(output_dir=settings.MEDIA_ROOT)
 
         # 進行斷詞
@@ -374,7 +393,7 @@ class SummaryAnalysisAPIView(BaseAPIView):
             analyzed_summaries = ArticleSummary.objects.filter(job=job, status='completed').count()
 
             # 啟動非同步摘要分析任務
-            thread = analyze_job_summaries_async(job_id, batch_size, max_workers)
+            task = analyze_job_summaries_async(job_id, batch_size, max_workers)
 
             return self.get_success_response({
                 'message': '摘要分析任務已啟動',
@@ -41,7 +41,8 @@ class ScrapeJobForm(forms.ModelForm):
 
     class Meta:
         model = ScrapeJob
-        fields = ['categories', 'limit_per_category', 'use_threading', 'max_workers']
+        fields = ['categories', 'limit_per_category', 'use_threading', 'max_workers', 'fetch_mode', 'incremental', 'lean_browser',
+                  'shard_count', 'shard_strategy']
         widgets = {
             'limit_per_category': forms.NumberInput(attrs={
                 'class': 'form-control',
@@ -53,12 +54,27 @@ class ScrapeJobForm(forms.ModelForm):
                 'class': 'form-control',
                 'min': '1',
                 'max': '50'
-            })
+            }),
+            'fetch_mode': forms.Select(attrs={'class': 'form-select'}),
+            'incremental': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'lean_browser': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+            'shard_count': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': '1',
+                'max': '64'
+            }),
+            'shard_strategy': forms.Select(attrs={'class': 'form-select'})
         }
         help_texts = {
             'limit_per_category': '每個類別最多爬取的文章數',
             'use_threading': '是否使用多線程提高爬取速度',
-            'max_workers': '多線程模式下的最大線程數'
+            'max_workers': '多線程模式下的最大線程數',
+            'fetch_mode': 'HTTP 模式會先直接下載頁面解析，失敗或遇到 Cloudflare 時才改用瀏覽器；'
+                          'Asyncio 模式可同時發出數百個請求，適合大量文章',
+            'incremental': '先前任務已保存的文章直接沿用，不再重新抓取，適合定期執行的任務',
+            'lean_browser': '瀏覽器不載入圖片、字型、樣式與廣告，頁面載入更快、記憶體用量更低',
+            'shard_count': '大於 1 時將文章分成多個分片，由多個工作程序 (可在其他主機) 同時爬取，適合數萬篇的大型任務',
+            'shard_strategy': '雜湊分配讓各分片文章數平均；類別分配讓每個分片只爬取部分類別'
         }
 
     def clean_categories(self):
@@ -0,0 +1,225 @@
+import json
+import logging
+import os
+import resource
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import urlparse
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.utils.browser_pool import BrowserPool
+from scraper.utils.concurrency import AdaptiveConcurrency
+from scraper.utils.html_cache import HtmlCache
+from scraper.utils.replay_server import ReplayServer
+from scraper.utils.scraper_utils import CTSimpleScraper
+
+ENGINES = ('selenium', 'pooled', 'http', 'async')
+
+
+def _process_tree_rss():
+    """計算本程序與所有子程序(例如 Chrome)的 RSS 總和(bytes)，無 /proc 時返回 None"""
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = {}
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/stat', 'r') as f:
+                # 程序名稱可能含空白，從最後一個右括號之後解析
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(pid))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    stack = [os.getpid()]
+    while stack:
+        pid = stack.pop()
+        stack.extend(children.get(pid, []))
+        try:
+            with open(f'/proc/{pid}/status', 'r') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+    return total
+
+
+class RssSampler:
+    """於背景線程定期取樣程序樹的 RSS，記錄尖峰值"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            rss = _process_tree_rss()
+            if rss is None:
+                # 無法取樣時退回本程序的歷史最大 RSS (Linux 上單位為 KB)
+                rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            self.peak = max(self.peak, rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+
+
+def _percentile(values, pct):
+    """以最近排名法計算百分位數"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = '以本機回放伺服器評估各文章抓取引擎的吞吐量，不需連網'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--engines', default=','.join(ENGINES),
+                            help=f'要評估的引擎，以逗號分隔: {", ".join(ENGINES)}')
+        parser.add_argument('--articles', type=int, default=200, help='每個引擎抓取的文章總數')
+        parser.add_argument('--categories', type=int, default=3, help='文章平均分配到的類別數')
+        parser.add_argument('--workers', type=int, default=8, help='線程數 (selenium / pooled / http)')
+        parser.add_argument('--async-concurrency', type=int, default=200, help='asyncio 引擎同時請求上限')
+        parser.add_argument('--async-rate', type=float, default=0.0,
+                            help='asyncio 引擎每個主機每秒請求數，0 表示不限速以便與其他引擎比較')
+        parser.add_argument('--latency', type=float, default=0.05, help='回放伺服器每個回應的延遲(秒)')
+        parser.add_argument('--jitter', type=float, default=0.02, help='延遲的隨機變動範圍(秒)')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='回應 HTTP 500 的比例')
+        parser.add_argument('--challenge-rate', type=float, default=0.0, help='回應 Cloudflare 挑戰頁面的比例')
+        parser.add_argument('--adaptive', action='store_true',
+                            help='線程引擎以 --workers 為起點自動調整並行數')
+        parser.add_argument('--adaptive-max', type=int, default=32, help='自動調整時的並行數上限')
+        parser.add_argument('--full-browser', action='store_true',
+                            help='瀏覽器載入圖片、字型、樣式與廣告 (預設使用精簡瀏覽模式)')
+        parser.add_argument('--cache-dir', help='以 HtmlCache 中錄製的文章頁面回放')
+        parser.add_argument('--seed', type=int, default=42, help='錯誤注入的隨機種子')
+        parser.add_argument('--json', dest='json_output', help='將結果另存為 JSON 檔案')
+
+    def handle(self, *args, **options):
+        engines = [e.strip() for e in options['engines'].split(',') if e.strip()]
+        unknown = [e for e in engines if e not in ENGINES]
+        if unknown:
+            raise CommandError(f'未知的引擎: {", ".join(unknown)}')
+
+        html_cache = HtmlCache(options['cache_dir']) if options['cache_dir'] else None
+
+        results = []
+        for engine in engines:
+            # 每個引擎使用新的伺服器，錯誤注入的隨機序列相同
+            server = ReplayServer(latency=options['latency'], jitter=options['jitter'],
+                                  error_rate=options['error_rate'], challenge_rate=options['challenge_rate'],
+                                  html_cache=html_cache, seed=options['seed'])
+            with server:
+                self.stdout.write(f'評估 {engine} 引擎 ({server.base_url}) ...')
+                try:
+                    result = self.run_engine(engine, server, options)
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'{engine} 引擎評估失敗: {e}'))
+                    result = {'engine': engine, 'error': str(e)}
+                result['server'] = dict(server.stats)
+            results.append(result)
+
+        self.print_report(results)
+
+        if options['json_output']:
+            with open(options['json_output'], 'w', encoding='utf-8') as f:
+                json.dump({'options': {k: v for k, v in options.items() if k in (
+                    'articles', 'categories', 'workers', 'async_concurrency', 'async_rate', 'latency', 'jitter',
+                    'error_rate', 'challenge_rate', 'adaptive', 'adaptive_max', 'full_browser', 'seed')}, 'results': results}, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'結果已保存到 {options["json_output"]}'))
+
+    def build_tasks(self, scraper, server, options):
+        """不經列表頁，直接產生文章任務，只評估文章抓取階段"""
+        categories = list(scraper.base_urls)[:max(1, options['categories'])]
+        per_category = -(-options['articles'] // len(categories))
+        tasks = []
+        for category in categories:
+            category_path = urlparse(scraper.base_urls[category]).path.strip('/')
+            for serial_no, url in enumerate(server.article_urls(category_path, per_category), start=1):
+                tasks.append((url, category, serial_no))
+        return tasks[:options['articles']]
+
+    def run_engine(self, engine, server, options):
+        workers = options['workers']
+        fetch_mode = {'selenium': 'selenium', 'pooled': 'selenium', 'http': 'http', 'async': 'async'}[engine]
+        scraper = CTSimpleScraper(headless=True, fetch_mode=fetch_mode, site_root=server.base_url,
+                                  async_concurrency=options['async_concurrency'], async_rate=options['async_rate'],
+                                  lean_browser=not options['full_browser'])
+        scraper.logger = logging.getLogger('scraper.benchmark')
+        scraper.logger.setLevel(logging.WARNING)
+        scraper.output_dir = tempfile.mkdtemp(prefix=f'benchmark_{engine}_')
+        scraper.open_result_writer()
+
+        tasks = self.build_tasks(scraper, server, options)
+        slots = workers
+        if options['adaptive'] and engine != 'async':
+            scraper.concurrency = AdaptiveConcurrency(initial=workers, maximum=max(workers, options['adaptive_max']),
+                                                      logger=scraper.logger)
+            slots = scraper.concurrency.maximum
+        if engine != 'selenium':
+            # selenium 引擎每篇文章各自啟動瀏覽器；其他引擎以池提供瀏覽器 (HTTP 引擎用於備援)
+            scraper.browser_pool = BrowserPool(scraper.create_article_driver, size=slots,
+                                               max_pages_per_driver=scraper.driver_max_pages,
+                                               logger=scraper.logger)
+        if engine == 'http':
+            scraper.setup_http_session(pool_size=slots)
+
+        try:
+            with RssSampler() as sampler:
+                started = time.monotonic()
+                if engine == 'async':
+                    scraper.scrape_articles_async(tasks, use_threading=True, max_workers=workers)
+                else:
+                    scraper._scrape_tasks(tasks, scraper.scrape_article, use_threading=True, max_workers=workers)
+                elapsed = time.monotonic() - started
+        finally:
+            if scraper.browser_pool:
+                scraper.browser_pool.close()
+            if scraper.http_session:
+                scraper.http_session.close()
+            scraper.result_writer.close()
+            shutil.rmtree(scraper.output_dir, ignore_errors=True)
+
+        latencies = scraper.fetch_latencies
+        return {
+            'engine': engine,
+            'articles': scraper.result_count,
+            'tasks': len(tasks),
+            'seconds': round(elapsed, 3),
+            'articles_per_second': round(scraper.result_count / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+            'peak_rss_mb': round(sampler.peak / 1024 / 1024, 1),
+            'fetch_stats': dict(scraper.fetch_stats),
+            'concurrency_history': scraper.concurrency.history if scraper.concurrency else None,
+        }
+
+    def print_report(self, results):
+        header = f"{'引擎':<10}{'文章數':>8}{'秒數':>10}{'篇/秒':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'尖峰RSS(MB)':>14}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for r in results:
+            if 'error' in r:
+                self.stdout.write(f"{r['engine']:<10}失敗: {r['error']}")
+                continue
+            self.stdout.write(
+                f"{r['engine']:<10}{r['articles']:>8}{r['seconds']:>10.2f}{r['articles_per_second']:>10.2f}"
+                f"{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['peak_rss_mb']:>14.1f}")
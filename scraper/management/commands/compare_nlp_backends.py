@@ -0,0 +1,131 @@
+import json
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.utils.nlp_backends import BACKENDS
+from scraper.utils.nlp_models import get_ckip_models, loaded_backend
+from scraper.utils.result_store import iter_articles
+from scraper.utils.scraper_utils import CTTextProcessor
+
+# 未指定語料時使用的固定語料，涵蓋人名、地名、機構與數字
+FIXED_CORPUS = [
+    '行政院長今天在立法院答詢時表示，政府將持續推動能源轉型，並在明年編列預算補助再生能源發展。',
+    '台積電董事長在股東會上指出，先進製程需求強勁，高雄廠預計明年第三季開始量產。',
+    '中央氣象署發布豪雨特報，台北市、新北市及基隆市山區今晚可能出現局部大雨，民眾應注意坍方與落石。',
+    '美國聯準會宣布維持利率不變，主席鮑爾在記者會上強調，通膨仍高於目標，降息時點將視數據而定。',
+    '中華職棒總冠軍賽第七戰在台中洲際棒球場開打，兩隊先發投手表現穩定，比賽進入延長賽。',
+    '衛福部疾管署統計，上週國內新增流感併發重症病例三十二例，其中多數未接種疫苗。',
+    '日本首相訪問東南亞三國，與印尼、越南及菲律賓領袖會談，討論供應鏈合作與區域安全議題。',
+    '新竹科學園區管理局表示，今年前三季園區營業額較去年同期成長百分之十二，創歷史新高。',
+]
+
+
+def _f1(expected, actual):
+    """兩個多重集合的 F1，兩者皆為空時視為完全一致"""
+    if not expected and not actual:
+        return 1.0
+    overlap = sum((Counter(expected) & Counter(actual)).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / len(actual)
+    recall = overlap / len(expected)
+    return 2 * precision * recall / (precision + recall)
+
+
+class Command(BaseCommand):
+    help = ('在固定語料上比較 NLP 推論後端與原始 PyTorch 模型的斷詞、詞性與命名實體結果是否一致，'
+            '並量測每秒處理的字數')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=[b for b in BACKENDS if b != 'torch'], required=True,
+                            help='要比較的推論後端')
+        parser.add_argument('--corpus', type=str,
+                            help='語料檔案：爬蟲結果 (.jsonl/.json) 或每行一段文字的文字檔，預設使用內建的固定語料')
+        parser.add_argument('--limit', type=int, default=200, help='最多使用的文章數')
+        parser.add_argument('--repeat', type=int, default=3, help='量測速度時重複執行的次數')
+        parser.add_argument('--min-f1', type=float, default=0.98,
+                            help='關鍵詞與命名實體 F1 低於此值時視為不一致並返回錯誤')
+        parser.add_argument('--json', action='store_true', help='以 JSON 格式輸出')
+
+    def _load_corpus(self, path, limit):
+        if not path:
+            texts = FIXED_CORPUS
+        elif path.endswith(('.jsonl', '.json')):
+            texts = [article.get('content', '') for article in iter_articles(path)]
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                texts = [line.strip() for line in f]
+        articles = [{'title': str(index), 'category': '語料', 'content': text}
+                    for index, text in enumerate(texts) if text]
+        return articles[:limit]
+
+    def _run(self, processor, models, articles, repeat):
+        processor.ws, processor.pos, processor.ner = models
+        # 第一次執行包含模型初始化與 ONNX 圖最佳化，不計入速度
+        analyses = processor.analyze_article_batch(articles)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            processor.analyze_article_batch(articles)
+        return analyses, (time.perf_counter() - started) / repeat
+
+    def handle(self, *args, **options):
+        articles = self._load_corpus(options['corpus'], options['limit'])
+        if not articles:
+            raise CommandError('語料中沒有可分析的文字')
+
+        baseline_models = get_ckip_models(backend='torch')
+        if baseline_models is None:
+            raise CommandError('未安裝中研院斷詞套件 ckip_transformers')
+        candidate_models = get_ckip_models(backend=options['backend'])
+        # 後端無法使用時會退回 torch，比較結果沒有意義
+        applied = loaded_backend(backend=options['backend'])
+        if applied != options['backend']:
+            raise CommandError(f'無法使用 {options["backend"]} 後端 (實際使用 {applied})，請查看警告訊息')
+
+        # 不使用 NLP 結果快取，確保每個後端都實際執行模型
+        processor = CTTextProcessor(output_dir='.', result_cache=False)
+        baseline, baseline_seconds = self._run(processor, baseline_models, articles, options['repeat'])
+        candidate, candidate_seconds = self._run(processor, candidate_models, articles, options['repeat'])
+
+        chars = sum(len(article['content']) for article in articles)
+        keyword_f1 = []
+        entity_f1 = []
+        identical = 0
+        for expected, actual in zip(baseline, candidate):
+            expected_entities = [(e['entity'], e['entity_type']) for e in expected['named_entities']]
+            actual_entities = [(e['entity'], e['entity_type']) for e in actual['named_entities']]
+            keyword_f1.append(_f1(expected['words_with_pos'], actual['words_with_pos']))
+            entity_f1.append(_f1(expected_entities, actual_entities))
+            if expected['words_with_pos'] == actual['words_with_pos'] and expected_entities == actual_entities:
+                identical += 1
+
+        result = {
+            'backend': options['backend'],
+            'articles': len(articles),
+            'chars': chars,
+            'identical_articles': identical,
+            'keyword_f1': round(sum(keyword_f1) / len(keyword_f1), 4),
+            'entity_f1': round(sum(entity_f1) / len(entity_f1), 4),
+            'min_keyword_f1': round(min(keyword_f1), 4),
+            'min_entity_f1': round(min(entity_f1), 4),
+            'torch_chars_per_second': round(chars / baseline_seconds, 1),
+            'backend_chars_per_second': round(chars / candidate_seconds, 1),
+            'speedup': round(baseline_seconds / candidate_seconds, 2),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            self.stdout.write(f'後端 {result["backend"]}: {result["articles"]} 篇文章, {chars} 字')
+            self.stdout.write(f'完全一致的文章: {identical}/{len(articles)}')
+            self.stdout.write(f'關鍵詞 F1: 平均 {result["keyword_f1"]}, 最低 {result["min_keyword_f1"]}')
+            self.stdout.write(f'命名實體 F1: 平均 {result["entity_f1"]}, 最低 {result["min_entity_f1"]}')
+            self.stdout.write(f'速度: torch {result["torch_chars_per_second"]} 字/秒, '
+                              f'{result["backend"]} {result["backend_chars_per_second"]} 字/秒 '
+                              f'({result["speedup"]}x)')
+
+        if result['keyword_f1'] < options['min_f1'] or result['entity_f1'] < options['min_f1']:
+            raise CommandError(f'{options["backend"]} 後端的結果與 torch 不一致 (F1 低於 {options["min_f1"]})')
+        self.stdout.write(self.style.SUCCESS(f'{options["backend"]} 後端的結果與 torch 一致'))
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.models import Article, ScrapeJob
+from scraper.utils.near_duplicate import SimHashIndex, simhash, format_fingerprint, parse_fingerprint
+
+
+class Command(BaseCommand):
+    help = '以 SimHash 找出資料庫中內容近似重複的文章，標記其來源文章以跳過後續情感與摘要分析'
+
+    def add_arguments(self, parser):
+        scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+        parser.add_argument('--job', type=int, action='append', dest='job_ids',
+                            help='只處理指定的爬蟲任務 ID，可重複指定；預設處理所有任務')
+        parser.add_argument('--threshold', type=int,
+                            default=scraper_settings.get('NEAR_DUPLICATE_THRESHOLD', 3),
+                            help='SimHash 漢明距離不超過此值視為近似重複')
+        parser.add_argument('--batch-size', type=int, default=500, help='每批寫回資料庫的文章數')
+        parser.add_argument('--dry-run', action='store_true', help='只統計結果，不寫回資料庫')
+
+    def handle(self, *args, **options):
+        jobs = ScrapeJob.objects.order_by('id')
+        if options['job_ids']:
+            jobs = jobs.filter(id__in=options['job_ids'])
+            missing = set(options['job_ids']) - set(jobs.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f'找不到爬蟲任務: {", ".join(map(str, sorted(missing)))}')
+
+        total_articles = total_duplicates = 0
+        for job_id in jobs.values_list('id', flat=True):
+            articles, duplicates = self.process_job(job_id, options)
+            total_articles += articles
+            total_duplicates += duplicates
+            if articles:
+                self.stdout.write(f'任務 {job_id}: {articles} 篇文章, 近似重複 {duplicates} 篇')
+
+        action = ' (試執行，未寫回資料庫)' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'近似重複偵測完成: 共 {total_articles} 篇文章, 近似重複 {total_duplicates} 篇{action}'))
+
+    def process_job(self, job_id, options):
+        """在單一任務內偵測近似重複，與爬取時相同，以較早寫入的文章作為來源
+
+        Returns:
+            tuple: (文章數, 近似重複文章數)
+        """
+        index = SimHashIndex(threshold=options['threshold'])
+        pending = []
+        articles = duplicates = 0
+
+        queryset = Article.objects.filter(job_id=job_id).order_by('id').only(
+            'id', 'content', 'simhash', 'duplicate_of')
+        for article in queryset.iterator(chunk_size=options['batch_size']):
+            articles += 1
+            fingerprint = parse_fingerprint(article.simhash)
+            if fingerprint is None:
+                if not article.content:
+                    continue
+                fingerprint = simhash(article.content)
+
+            match = index.check_and_add(article.id, fingerprint)
+            original_id = match[0] if match else None
+            if original_id:
+                duplicates += 1
+
+            simhash_value = format_fingerprint(fingerprint)
+            if article.simhash != simhash_value or article.duplicate_of_id != original_id:
+                article.simhash = simhash_value
+                article.duplicate_of_id = original_id
+                pending.append(article)
+            if len(pending) >= options['batch_size']:
+                self.flush(pending, options)
+                pending = []
+
+        self.flush(pending, options)
+        return articles, duplicates
+
+    @staticmethod
+    def flush(articles, options):
+        if articles and not options['dry_run']:
+            Article.objects.bulk_update(articles, ['simhash', 'duplicate_of'])
@@ -0,0 +1,73 @@
+import json
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraper.models import Article
+from scraper.utils.article_parser import parse_article_html, content_hash
+from scraper.utils.html_cache import HtmlCache
+from scraper.utils.result_store import JsonlResultWriter
+
+
+class Command(BaseCommand):
+    help = '從 HTML 快取離線重新解析所有文章，不需連網'
+
+    def add_arguments(self, parser):
+        scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+        parser.add_argument('--cache-dir',
+                            default=scraper_settings.get('HTML_CACHE_DIR',
+                                                         os.path.join(settings.MEDIA_ROOT, 'html_cache')),
+                            help='HTML 快取目錄')
+        parser.add_argument('--output', help='解析結果輸出的 JSONL 檔案路徑')
+        parser.add_argument('--update-db', action='store_true',
+                            help='以重新解析的內容更新資料庫中相同連結的文章')
+        parser.add_argument('--limit', type=int, default=0, help='最多處理的快取頁面數，0 表示全部')
+
+    def handle(self, *args, **options):
+        cache_dir = options['cache_dir']
+        if not os.path.isdir(cache_dir):
+            raise CommandError(f'HTML 快取目錄不存在: {cache_dir}')
+
+        cache = HtmlCache(cache_dir)
+        output = options['output'] or os.path.join(
+            settings.MEDIA_ROOT, 'reextract', f"reextract_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+
+        parsed = failed = updated = 0
+        with JsonlResultWriter(output) as writer:
+            for entry in cache.iter_entries():
+                if options['limit'] and parsed + failed >= options['limit']:
+                    break
+
+                try:
+                    html = cache.read(entry)
+                except OSError:
+                    failed += 1
+                    continue
+
+                fields = parse_article_html(html)
+                if fields is None:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"解析失敗: {entry['url']}"))
+                    continue
+
+                parsed += 1
+                fields['link'] = entry['url']
+                fields['content_hash'] = content_hash(fields['content'])
+                writer.write(fields)
+
+                if options['update_db']:
+                    updated += Article.objects.filter(link=entry['url']).update(
+                        title=fields['title'][:255],
+                        content=fields['content'],
+                        author=','.join(fields['author'])[:100],
+                        photo_links=json.dumps(fields['photo_links']),
+                        content_hash=fields['content_hash'],
+                    )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'重新解析完成: 成功 {parsed} 篇, 失敗 {failed} 篇, 結果已保存到 {output}'))
+        if options['update_db']:
+            self.stdout.write(self.style.SUCCESS(f'已更新資料庫中 {updated} 筆文章'))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from scraper.services.shard_service import claim_shard, run_shard, worker_name
+
+
+class Command(BaseCommand):
+    help = ('領取並執行分片爬蟲任務的分片。可在多台主機上執行，'
+            '各主機需連線到同一個資料庫 (SQLite 只適用於單機)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, help='只執行指定爬蟲任務的分片，預設領取任何任務的分片')
+        parser.add_argument('--loop', action='store_true', help='沒有可領取的分片時持續等待新的分片')
+        parser.add_argument('--poll-interval', type=float, default=10.0, help='持續等待時的輪詢間隔(秒)')
+        parser.add_argument('--max-shards', type=int, default=0, help='最多執行的分片數，0 表示不限')
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        completed = failed = 0
+        self.stdout.write(f'分片工作程序 {worker} 已啟動')
+
+        while not options['max_shards'] or completed + failed < options['max_shards']:
+            shard = claim_shard(job_id=options['job'], worker=worker)
+            if shard is None:
+                if not options['loop']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.stdout.write(f'執行爬蟲任務 {shard.job_id} 分片 {shard.shard_index} ({len(shard.frontier)} 篇文章)')
+            if run_shard(shard, worker=worker):
+                completed += 1
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f'爬蟲任務 {shard.job_id} 分片 {shard.shard_index} 執行失敗'))
+
+        self.stdout.write(self.style.SUCCESS(f'分片工作程序 {worker} 結束: 完成 {completed} 個, 失敗 {failed} 個'))
@@ -0,0 +1,70 @@
+import time
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from scraper.services.queue_service import TASK_TYPES, claim_task, run_task, worker_name
+
+
+class Command(BaseCommand):
+    help = ('執行背景任務佇列中的任務 (爬蟲、情感分析、摘要與 AI 報告)。'
+            '網頁程序只負責加入任務，任務在此獨立的工作程序中執行，工作程序中斷後任務會在租約到期時由其他工作程序接手')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--types', type=str, default='',
+                            help=f'只執行指定類型的任務，以逗號分隔 ({", ".join(TASK_TYPES)})，預設全部')
+        parser.add_argument('--concurrency', type=int, default=1, help='同時執行的任務數 (線程數)')
+        parser.add_argument('--burst', action='store_true', help='佇列中沒有可執行的任務時結束，而非持續等待')
+        parser.add_argument('--poll-interval', type=float, default=None, help='佇列為空時的輪詢間隔(秒)')
+        parser.add_argument('--max-tasks', type=int, default=0, help='每個線程最多執行的任務數，0 表示不限')
+
+    def handle(self, *args, **options):
+        task_types = [t.strip() for t in options['types'].split(',') if t.strip()] or None
+        unknown = [t for t in task_types or [] if t not in TASK_TYPES]
+        if unknown:
+            self.stdout.write(self.style.ERROR(f'未知的任務類型: {", ".join(unknown)}'))
+            return
+
+        poll_interval = options['poll_interval'] or getattr(settings, 'TASK_QUEUE_SETTINGS', {}).get('POLL_INTERVAL', 2.0)
+        counts = {'completed': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def work():
+            worker = worker_name()
+            executed = 0
+            try:
+                while not options['max_tasks'] or executed < options['max_tasks']:
+                    task = claim_task(worker=worker, task_types=task_types)
+                    if task is None:
+                        if options['burst']:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+
+                    success = run_task(task, worker=worker)
+                    executed += 1
+                    with lock:
+                        counts['completed' if success else 'failed'] += 1
+            finally:
+                connection.close()
+
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(f'背景任務工作程序已啟動，{concurrency} 個線程'
+                          f'{"，任務類型: " + ", ".join(task_types) if task_types else ""}')
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(1)
+        except KeyboardInterrupt:
+            # 執行中的任務租約到期後會由其他工作程序接手
+            self.stdout.write(self.style.WARNING('收到中斷信號，工作程序結束'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'背景任務工作程序結束: 完成 {counts["completed"]} 個, 失敗 {counts["failed"]} 個'))
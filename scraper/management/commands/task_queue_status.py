@@ -0,0 +1,37 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from scraper.services.queue_service import queue_stats
+
+
+class Command(BaseCommand):
+    help = '顯示背景任務佇列各階段的佇列深度、等待時間與資源用量'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='計算平均等待時間的時間範圍(小時)')
+        parser.add_argument('--json', action='store_true', help='以 JSON 格式輸出')
+
+    def handle(self, *args, **options):
+        stats = queue_stats(window_hours=options['hours'])
+        if options['json']:
+            self.stdout.write(json.dumps(stats, ensure_ascii=False, indent=2))
+            return
+
+        def seconds(value):
+            return '-' if value is None else f'{value:.1f}s'
+
+        self.stdout.write(f'{"階段":<12}{"等待":>6}{"延後":>6}{"執行":>6}{"完成":>6}{"失敗":>6}'
+                          f'{"最久等待":>10}{"平均等待":>10}{"最大等待":>10}')
+        for task_type, stage in stats['stages'].items():
+            self.stdout.write(f'{task_type:<12}{stage["pending"]:>6}{stage["delayed"]:>6}{stage["running"]:>6}'
+                              f'{stage["completed"]:>6}{stage["failed"]:>6}'
+                              f'{seconds(stage["oldest_wait_seconds"]):>10}'
+                              f'{seconds(stage["avg_wait_seconds"]):>10}{seconds(stage["max_wait_seconds"]):>10}')
+
+        self.stdout.write('')
+        for resource, usage in stats['resources'].items():
+            self.stdout.write(f'資源 {resource}: {usage["used"]}/{usage["capacity"]}')
+        if stats['pending_by_user']:
+            self.stdout.write('等待中任務 (依用戶): ' + ', '.join(
+                f'{user}={count}' for user, count in sorted(stats['pending_by_user'].items())))
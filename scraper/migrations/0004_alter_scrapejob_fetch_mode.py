@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0003_scrapejob_fetch_mode'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='scrapejob',
+            name='fetch_mode',
+            field=models.CharField(choices=[('selenium', 'Selenium 瀏覽器'), ('http', 'HTTP 優先 (Selenium 備援)'), ('async', 'Asyncio 高並行 HTTP (Selenium 備援)')], default='selenium', max_length=20, verbose_name='文章抓取模式'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0004_alter_scrapejob_fetch_mode'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapejob',
+            name='output_dir',
+            field=models.CharField(blank=True, max_length=255, null=True, verbose_name='輸出目錄'),
+        ),
+    ]
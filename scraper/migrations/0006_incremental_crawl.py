@@ -0,0 +1,28 @@
+# Generated by Django 4.2.20 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_scrapejob_output_dir'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapejob',
+            name='incremental',
+            field=models.BooleanField(default=False, verbose_name='增量爬取'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='內容雜湊'),
+        ),
+        migrations.AlterField(
+            model_name='article',
+            name='link',
+            field=models.URLField(db_index=True, verbose_name='原始連結'),
+        ),
+    ]
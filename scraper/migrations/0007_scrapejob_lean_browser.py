@@ -0,0 +1,18 @@
+# Generated by Django 4.2.20 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_incremental_crawl'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapejob',
+            name='lean_browser',
+            field=models.BooleanField(default=True, verbose_name='精簡瀏覽模式'),
+        ),
+    ]
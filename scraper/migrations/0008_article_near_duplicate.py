@@ -0,0 +1,24 @@
+# Generated by Django 4.2.20 on 2026-10-18 14:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_scrapejob_lean_browser'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='simhash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=16, verbose_name='內容 SimHash 指紋'),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='scraper.article', verbose_name='近似重複來源'),
+        ),
+    ]
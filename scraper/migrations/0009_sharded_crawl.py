@@ -0,0 +1,51 @@
+# Generated by Django 4.2.20 on 2026-10-18 15:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_article_near_duplicate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapejob',
+            name='shard_count',
+            field=models.PositiveIntegerField(default=1, verbose_name='分片數'),
+        ),
+        migrations.AddField(
+            model_name='scrapejob',
+            name='shard_strategy',
+            field=models.CharField(choices=[('hash', '依網址雜湊平均分配'), ('category', '依類別分配')], default='hash', max_length=20, verbose_name='分片方式'),
+        ),
+        migrations.CreateModel(
+            name='CrawlShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard_index', models.IntegerField(verbose_name='分片編號')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '執行中'), ('completed', '已完成'), ('failed', '失敗')], db_index=True, default='pending', max_length=20, verbose_name='狀態')),
+                ('frontier', models.JSONField(default=list, verbose_name='待爬任務')),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='工作程序')),
+                ('attempts', models.IntegerField(default=0, verbose_name='執行次數')),
+                ('output_dir', models.CharField(blank=True, max_length=255, null=True, verbose_name='輸出目錄')),
+                ('result_file_path', models.CharField(blank=True, max_length=255, null=True, verbose_name='結果檔案路徑')),
+                ('article_count', models.IntegerField(default=0, verbose_name='文章數')),
+                ('keyword_stats', models.JSONField(blank=True, default=list, verbose_name='關鍵詞統計')),
+                ('entity_stats', models.JSONField(blank=True, default=list, verbose_name='命名實體統計')),
+                ('error_message', models.TextField(blank=True, default='', verbose_name='錯誤訊息')),
+                ('claimed_at', models.DateTimeField(blank=True, null=True, verbose_name='領取時間')),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True, verbose_name='最後心跳時間')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成時間')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='scraper.scrapejob', verbose_name='爬蟲任務')),
+            ],
+            options={
+                'verbose_name': '爬取分片',
+                'verbose_name_plural': '爬取分片',
+                'ordering': ['job', 'shard_index'],
+                'unique_together': {('job', 'shard_index')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.20 on 2026-10-18 16:05
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_sharded_crawl'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(db_index=True, max_length=50, verbose_name='任務類型')),
+                ('payload', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='任務參數')),
+                ('dedupe_key', models.CharField(blank=True, db_index=True, default='', max_length=100, verbose_name='去重鍵')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '執行中'), ('completed', '已完成'), ('failed', '失敗')], db_index=True, default='pending', max_length=20, verbose_name='狀態')),
+                ('priority', models.IntegerField(default=0, verbose_name='優先順序')),
+                ('attempts', models.IntegerField(default=0, verbose_name='執行次數')),
+                ('max_attempts', models.IntegerField(default=3, verbose_name='最大執行次數')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='最早執行時間')),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='工作程序')),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True, verbose_name='租約到期時間')),
+                ('last_error', models.TextField(blank=True, default='', verbose_name='最後錯誤訊息')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='創建時間')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='開始時間')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成時間')),
+            ],
+            options={
+                'verbose_name': '背景任務',
+                'verbose_name_plural': '背景任務',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'priority', 'run_after'], name='scraper_bac_status_62ed1a_idx')],
+            },
+        ),
+    ]
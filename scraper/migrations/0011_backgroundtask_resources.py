@@ -0,0 +1,26 @@
+# Generated by Django 4.2.20 on 2026-10-18 17:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('scraper', '0010_backgroundtask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='resources',
+            field=models.JSONField(blank=True, default=dict, verbose_name='所需資源'),
+        ),
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='background_tasks', to=settings.AUTH_USER_MODEL, verbose_name='用戶'),
+        ),
+    ]
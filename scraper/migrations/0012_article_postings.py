@@ -0,0 +1,48 @@
+# Generated by Django 4.2.20 on 2026-10-18 19:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0011_backgroundtask_resources'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleKeyword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=100, verbose_name='關鍵詞')),
+                ('pos', models.CharField(max_length=10, verbose_name='詞性')),
+                ('count', models.IntegerField(verbose_name='出現次數')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='keyword_postings', to='scraper.article', verbose_name='文章')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_keywords', to='scraper.scrapejob', verbose_name='爬蟲任務')),
+            ],
+            options={
+                'verbose_name': '文章關鍵詞',
+                'verbose_name_plural': '文章關鍵詞',
+                'indexes': [models.Index(fields=['job', 'word'], name='scraper_art_job_id_02ef04_idx')],
+                'unique_together': {('article', 'word', 'pos')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ArticleEntity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(max_length=100, verbose_name='實體')),
+                ('entity_type', models.CharField(max_length=20, verbose_name='實體類型')),
+                ('count', models.IntegerField(verbose_name='出現次數')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entity_postings', to='scraper.article', verbose_name='文章')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_entities', to='scraper.scrapejob', verbose_name='爬蟲任務')),
+            ],
+            options={
+                'verbose_name': '文章命名實體',
+                'verbose_name_plural': '文章命名實體',
+                'indexes': [models.Index(fields=['job', 'entity'], name='scraper_art_job_id_4dda26_idx'), models.Index(fields=['job', 'entity_type'], name='scraper_art_job_id_5c89c8_idx')],
+                'unique_together': {('article', 'entity', 'entity_type')},
+            },
+        ),
+    ]
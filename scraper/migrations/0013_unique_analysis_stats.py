@@ -0,0 +1,37 @@
+# Generated by Django 4.2.20 on 2026-10-19 10:02
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_stats(apps, schema_editor):
+    """加入唯一限制前，將同一任務、類別中重複的統計合併為一筆並加總頻率"""
+    for model_name, term_field, type_field in (('KeywordAnalysis', 'word', 'pos'),
+                                               ('NamedEntityAnalysis', 'entity', 'entity_type')):
+        model = apps.get_model('scraper', model_name)
+        duplicates = model.objects.values('job_id', term_field, type_field, 'category').annotate(
+            rows=Count('id'), keep_id=Min('id'), total=Sum('frequency')).filter(rows__gt=1)
+        for duplicate in duplicates:
+            rows = model.objects.filter(job_id=duplicate['job_id'], category=duplicate['category'],
+                                        **{term_field: duplicate[term_field], type_field: duplicate[type_field]})
+            rows.exclude(id=duplicate['keep_id']).delete()
+            rows.update(frequency=duplicate['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0012_article_postings'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_stats, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='keywordanalysis',
+            constraint=models.UniqueConstraint(fields=('job', 'word', 'pos', 'category'), name='unique_keyword_analysis'),
+        ),
+        migrations.AddConstraint(
+            model_name='namedentityanalysis',
+            constraint=models.UniqueConstraint(fields=('job', 'entity', 'entity_type', 'category'), name='unique_named_entity_analysis'),
+        ),
+    ]
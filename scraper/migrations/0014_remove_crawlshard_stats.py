@@ -0,0 +1,21 @@
+# Generated by Django 4.2.20 on 2026-10-19 10:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0013_unique_analysis_stats'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='crawlshard',
+            name='entity_stats',
+        ),
+        migrations.RemoveField(
+            model_name='crawlshard',
+            name='keyword_stats',
+        ),
+    ]
@@ -1,6 +1,8 @@
 import os
 import logging
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 from django.urls import reverse
 from django.conf import settings
 from django.contrib.auth.models import User
@@ -17,6 +19,17 @@ class ScrapeJob(models.Model):
         ('failed', '失敗')
     ]
 
+    FETCH_MODE_CHOICES = [
+        ('selenium', 'Selenium 瀏覽器'),
+        ('http', 'HTTP 優先 (Selenium 備援)'),
+        ('async', 'Asyncio 高並行 HTTP (Selenium 備援)')
+    ]
+
+    SHARD_STRATEGY_CHOICES = [
+        ('hash', '依網址雜湊平均分配'),
+        ('category', '依類別分配')
+    ]
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='scrape_jobs', verbose_name='用戶')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新時間')
@@ -25,7 +38,15 @@ class ScrapeJob(models.Model):
     limit_per_category = models.IntegerField(default=5, verbose_name='每類別文章數')
     use_threading = models.BooleanField(default=False, verbose_name='使用多線程')
     max_workers = models.IntegerField(default=4, verbose_name='最大線程數')
+    fetch_mode = models.CharField(max_length=20, choices=FETCH_MODE_CHOICES, default='selenium',
+                                  verbose_name='文章抓取模式')
     result_file_path = models.CharField(max_length=255, blank=True, null=True, verbose_name='結果檔案路徑')
+    output_dir = models.CharField(max_length=255, blank=True, null=True, verbose_name='輸出目錄')
+    incremental = models.BooleanField(default=False, verbose_name='增量爬取')
+    lean_browser = models.BooleanField(default=True, verbose_name='精簡瀏覽模式')
+    shard_count = models.PositiveIntegerField(default=1, verbose_name='分片數')
+    shard_strategy = models.CharField(max_length=20, choices=SHARD_STRATEGY_CHOICES, default='hash',
+                                      verbose_name='分片方式')
     sentiment_analyzed = models.BooleanField(default=False, verbose_name='情感分析完成')
 
     def __str__(self):
@@ -37,6 +58,38 @@ class ScrapeJob(models.Model):
         ordering = ['-created_at']
 
 
+class CrawlShard(models.Model):
+    """分片爬取的工作單元
+
+    協調端收集列表頁後將待爬連結分配到各分片，工作程序 (可在其他主機上，共用同一個資料庫)
+    領取分片後爬取並將文章寫回同一個爬蟲任務
+    """
+
+    job = models.ForeignKey(ScrapeJob, on_delete=models.CASCADE, related_name='shards', verbose_name='爬蟲任務')
+    shard_index = models.IntegerField(verbose_name='分片編號')
+    status = models.CharField(max_length=20, choices=ScrapeJob.STATUS_CHOICES, default='pending',
+                              db_index=True, verbose_name='狀態')
+    frontier = models.JSONField(default=list, verbose_name='待爬任務')
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name='工作程序')
+    attempts = models.IntegerField(default=0, verbose_name='執行次數')
+    output_dir = models.CharField(max_length=255, blank=True, null=True, verbose_name='輸出目錄')
+    result_file_path = models.CharField(max_length=255, blank=True, null=True, verbose_name='結果檔案路徑')
+    article_count = models.IntegerField(default=0, verbose_name='文章數')
+    error_message = models.TextField(blank=True, default='', verbose_name='錯誤訊息')
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name='領取時間')
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name='最後心跳時間')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成時間')
+
+    def __str__(self):
+        return f"爬蟲任務 {self.job_id} 分片 {self.shard_index} - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = '爬取分片'
+        verbose_name_plural = '爬取分片'
+        ordering = ['job', 'shard_index']
+        unique_together = ('job', 'shard_index')
+
+
 class Article(models.Model):
     """文章模型"""
 
@@ -47,8 +100,12 @@ class Article(models.Model):
     content = models.TextField(verbose_name='內容')
     date = models.DateTimeField(verbose_name='發布日期')
     author = models.CharField(max_length=100, verbose_name='作者')
-    link = models.URLField(verbose_name='原始連結')
+    link = models.URLField(db_index=True, verbose_name='原始連結')
     photo_links = models.TextField(blank=True, null=True, verbose_name='圖片連結')
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name='內容雜湊')
+    simhash = models.CharField(max_length=16, blank=True, default='', db_index=True, verbose_name='內容 SimHash 指紋')
+    duplicate_of = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True,
+                                     related_name='near_duplicates', verbose_name='近似重複來源')
 
     def __str__(self):
         return self.title
@@ -81,6 +138,10 @@ class KeywordAnalysis(models.Model):
             models.Index(fields=['job', 'category']),
             models.Index(fields=['job', 'frequency']),
         ]
+        # 每個任務、類別的詞與詞性只有一筆統計，增量更新時以此避免重複建立
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'word', 'pos', 'category'], name='unique_keyword_analysis'),
+        ]
 
 
 class NamedEntityAnalysis(models.Model):
@@ -105,6 +166,61 @@ class NamedEntityAnalysis(models.Model):
             models.Index(fields=['job', 'entity_type']),
             models.Index(fields=['job', 'frequency']),
         ]
+        # 每個任務、類別的實體與類型只有一筆統計，增量更新時以此避免重複建立
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'entity', 'entity_type', 'category'],
+                                    name='unique_named_entity_analysis'),
+        ]
+
+
+class ArticleKeyword(models.Model):
+    """單篇文章的關鍵詞出現次數
+
+    NLP 階段逐篇保存，搜尋、共現與人物分析可直接查詢，不需再掃描文章內容
+    """
+
+    job = models.ForeignKey(ScrapeJob, on_delete=models.CASCADE, related_name='article_keywords',
+                            verbose_name='爬蟲任務')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='keyword_postings',
+                                verbose_name='文章')
+    word = models.CharField(max_length=100, verbose_name='關鍵詞')
+    pos = models.CharField(max_length=10, verbose_name='詞性')
+    count = models.IntegerField(verbose_name='出現次數')
+
+    def __str__(self):
+        return f"{self.word} ({self.pos}) x{self.count}"
+
+    class Meta:
+        verbose_name = '文章關鍵詞'
+        verbose_name_plural = '文章關鍵詞'
+        unique_together = ('article', 'word', 'pos')
+        indexes = [
+            models.Index(fields=['job', 'word']),
+        ]
+
+
+class ArticleEntity(models.Model):
+    """單篇文章的命名實體出現次數"""
+
+    job = models.ForeignKey(ScrapeJob, on_delete=models.CASCADE, related_name='article_entities',
+                            verbose_name='爬蟲任務')
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name='entity_postings',
+                                verbose_name='文章')
+    entity = models.CharField(max_length=100, verbose_name='實體')
+    entity_type = models.CharField(max_length=20, verbose_name='實體類型')
+    count = models.IntegerField(verbose_name='出現次數')
+
+    def __str__(self):
+        return f"{self.entity} ({self.entity_type}) x{self.count}"
+
+    class Meta:
+        verbose_name = '文章命名實體'
+        verbose_name_plural = '文章命名實體'
+        unique_together = ('article', 'entity', 'entity_type')
+        indexes = [
+            models.Index(fields=['job', 'entity']),
+            models.Index(fields=['job', 'entity_type']),
+        ]
 
 
 class SentimentAnalysis(models.Model):
@@ -286,4 +402,53 @@ class ArticleSummary(models.Model):
 
     def is_available(self):
         """檢查摘要是否可用"""
-        return self.status == 'completed' and self.summary_text
\ No newline at end of file
+        return self.status == 'completed' and self.summary_text
+
+
+class BackgroundTask(models.Model):
+    """背景任務佇列
+
+    爬蟲、情感分析、摘要與 AI 報告等耗時工作存入資料庫，由獨立的 `manage.py run_task_worker`
+    工作程序以租約方式領取執行，不佔用網頁程序的資源；工作程序中斷時租約到期後可由其他程序接手重試
+
+    每個任務記錄所需的資源 (瀏覽器、模型、LLM 名額)，排程器只在資源足夠時領取，
+    並優先執行目前執行中任務較少的用戶的任務
+    """
+
+    STATUS_CHOICES = [
+        ('pending', '等待中'),
+        ('running', '執行中'),
+        ('completed', '已完成'),
+        ('failed', '失敗')
+    ]
+
+    task_type = models.CharField(max_length=50, db_index=True, verbose_name='任務類型')
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='任務參數')
+    dedupe_key = models.CharField(max_length=100, blank=True, default='', db_index=True,
+                                  verbose_name='去重鍵')
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True,
+                             related_name='background_tasks', verbose_name='用戶')
+    resources = models.JSONField(default=dict, blank=True, verbose_name='所需資源')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True,
+                              verbose_name='狀態')
+    priority = models.IntegerField(default=0, verbose_name='優先順序')
+    attempts = models.IntegerField(default=0, verbose_name='執行次數')
+    max_attempts = models.IntegerField(default=3, verbose_name='最大執行次數')
+    run_after = models.DateTimeField(default=timezone.now, verbose_name='最早執行時間')
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name='工作程序')
+    lease_expires_at = models.DateTimeField(null=True, blank=True, verbose_name='租約到期時間')
+    last_error = models.TextField(blank=True, default='', verbose_name='最後錯誤訊息')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='創建時間')
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name='開始時間')
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name='完成時間')
+
+    def __str__(self):
+        return f"{self.task_type} #{self.id} - {self.get_status_display()}"
+
+    class Meta:
+        verbose_name = '背景任務'
+        verbose_name_plural = '背景任務'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'priority', 'run_after']),
+        ]
@@ -1,14 +1,18 @@
 import os
 import json
 import logging
-import threading
 import time
 import requests
 from django.conf import settings
+from django.db.models import QuerySet
 from ..models import AIReport
+from .queue_service import enqueue
 
 logger = logging.getLogger(__name__)
 
+# 報告提示詞使用的文章數
+REPORT_ARTICLE_LIMIT = 10
+
 
 class OllamaClient:
     """Ollama API 客戶端"""
@@ -75,13 +79,14 @@ class OllamaClient:
             raise
 
 
-def _prepare_report_prompt(search_params, search_results, language='zh-TW'):
+def _prepare_report_prompt(search_params, search_results, language='zh-TW', result_count=None):
     """準備報告生成的提示詞
 
     Args:
         search_params: 搜索參數
         search_results: 搜索結果
         language: 報告語言
+        result_count: 搜索結果總數，search_results 只包含部分文章時提供
 
     Returns:
         str: 格式化的提示詞
@@ -101,7 +106,7 @@ def _prepare_report_prompt(search_params, search_results, language='zh-TW'):
 
     # 準備文章摘要
     article_summaries = []
-    for i, article in enumerate(search_results[:10]):  # 限制使用前10篇文章
+    for i, article in enumerate(search_results[:REPORT_ARTICLE_LIMIT]):  # 限制使用前10篇文章
         # 判斷 article 是否為字典還是 Article 模型實例
         if isinstance(article, dict):
             # 如果是字典，使用 .get() 方法
@@ -138,7 +143,7 @@ def _prepare_report_prompt(search_params, search_results, language='zh-TW'):
 搜索關鍵詞: {', '.join(search_terms)}
 類別: {', '.join(categories)}
 時間範圍: {date_range}
-相關文章數量: {len(search_results)}
+相關文章數量: {len(search_results) if result_count is None else result_count}
 
 以下是部分相關文章的摘要:
 {article_data}
@@ -160,37 +165,59 @@ def _prepare_report_prompt(search_params, search_results, language='zh-TW'):
     return prompt
 
 
+def _serialize_search_results(search_results):
+    """取出提示詞使用的文章欄位，轉為可存入背景任務佇列的字典"""
+    articles = []
+    for article in search_results[:REPORT_ARTICLE_LIMIT]:
+        if isinstance(article, dict):
+            fields = {key: article.get(key, '') for key in ('title', 'category', 'date', 'content')}
+        else:
+            fields = {key: getattr(article, key, '') for key in ('title', 'category', 'date', 'content')}
+        fields['date'] = str(fields['date'] or '')
+        fields['content'] = str(fields['content'] or '')[:200]
+        articles.append(fields)
+    return articles
+
+
 def generate_report_async(report_id, search_params, search_results):
-    """非同步生成報告
+    """將報告生成加入背景任務佇列，由 run_task_worker 工作程序執行
 
     Args:
         report_id: AIReport模型的ID
         search_params: 搜索參數
-        search_results: 搜索結果列表
+        search_results: 搜索結果列表或文章查詢集
+
+    Returns:
+        BackgroundTask: 背景任務
     """
-    thread = threading.Thread(
-        target=_generate_report_task,
-        args=(report_id, search_params, search_results)
-    )
-    thread.daemon = True
-    thread.start()
-    return thread
+    result_count = search_results.count() if isinstance(search_results, QuerySet) else len(search_results)
+    return enqueue('ai_report', {
+        'report_id': report_id,
+        'search_params': search_params,
+        'search_results': _serialize_search_results(search_results),
+        'result_count': result_count,
+    }, dedupe_key=f"ai_report:{report_id}",
+        user_id=AIReport.objects.filter(id=report_id).values_list('job__user_id', flat=True).first())
 
 
-def _generate_report_task(report_id, search_params, search_results):
+def _generate_report_task(report_id, search_params, search_results, result_count=None):
     """報告生成任務
 
     Args:
         report_id: AIReport模型的ID
         search_params: 搜索參數
         search_results: 搜索結果列表
+        result_count: 搜索結果總數
+
+    Raises:
+        Exception: 生成失敗時將報告標記為失敗後重新拋出，由背景任務佇列依設定重試
     """
     try:
         # 獲取報告記錄
         report = AIReport.objects.get(id=report_id)
 
-        # 防止重複生成
-        if report.status != 'pending':
+        # 防止重複生成，失敗的報告由背景任務佇列重試
+        if report.status not in ('pending', 'failed'):
             logger.warning(f"報告 {report_id} 狀態為 {report.status}，跳過生成")
             return
 
@@ -202,7 +229,8 @@ def _generate_report_task(report_id, search_params, search_results):
         prompt = _prepare_report_prompt(
             search_params,
             search_results,
-            language=report.language
+            language=report.language,
+            result_count=result_count
         )
 
         # 初始化Ollama客戶端
@@ -234,5 +262,6 @@ def _generate_report_task(report_id, search_params, search_results):
             report.status = 'failed'
             report.error_message = str(e)
             report.save()
-        except:
-            pass
\ No newline at end of file
+        except Exception:
+            pass
+        raise
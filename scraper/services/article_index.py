@@ -0,0 +1,80 @@
+import json
+import logging
+
+from django.utils import timezone
+
+from ..models import Article
+from ..utils.article_parser import content_hash
+
+logger = logging.getLogger(__name__)
+
+
+class ArticleIndex:
+    """跨任務的文章 URL 索引
+
+    啟動時只載入資料庫中所有文章的連結與內容雜湊，爬蟲在抓取前查詢，
+    命中時才從資料庫讀取該篇文章的完整內容，供增量爬取沿用先前任務已保存的文章。
+    讀出的內容需與索引中的內容雜湊相符且不為空，否則視為未命中，由爬蟲重新抓取
+    """
+
+    def __init__(self, exclude_job_id=None):
+        """
+        Args:
+            exclude_job_id (int, optional): 排除的任務 ID，通常為目前執行中的任務本身
+        """
+        queryset = Article.objects.all()
+        if exclude_job_id is not None:
+            queryset = queryset.exclude(job_id=exclude_job_id)
+        self._queryset = queryset
+
+        # 依 id 排序，同一連結出現在多個任務時保留最新的一筆
+        self._hashes = dict(queryset.order_by('id').values_list('link', 'content_hash'))
+        logger.info(f"文章索引已載入 {len(self._hashes)} 個連結")
+
+    def __contains__(self, url):
+        return url in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def lookup(self, url):
+        """查詢已保存的文章
+
+        Args:
+            url (str): 文章連結
+
+        Returns:
+            dict: 包含 title、date、author、content、photo_links、content_hash 的字典，
+                  連結不在索引中、內容為空或與索引的內容雜湊不符時返回 None
+        """
+        if url not in self._hashes:
+            return None
+
+        article = self._queryset.filter(link=url).order_by('-id').first()
+        if article is None or not article.content.strip():
+            return None
+
+        # 索引載入後文章被重新寫入，或保存的內容不完整時，雜湊不會相符，改為重新抓取；
+        # 舊資料沒有保存雜湊，只能直接沿用
+        digest = content_hash(article.content)
+        expected = self._hashes[url]
+        if expected and expected != digest:
+            logger.info(f"文章 {url} 的內容與索引的內容雜湊不符，重新抓取")
+            return None
+
+        try:
+            photo_links = json.loads(article.photo_links) if article.photo_links else []
+        except json.JSONDecodeError:
+            photo_links = []
+
+        # 結果檔案中的日期為不含時區的本地時間，與爬取時的格式一致
+        date = timezone.localtime(article.date).replace(tzinfo=None).isoformat()
+
+        return {
+            "title": article.title,
+            "date": date,
+            "author": article.author.split(',') if article.author else [],
+            "content": article.content,
+            "photo_links": photo_links,
+            "content_hash": digest,
+        }
@@ -0,0 +1,422 @@
+import os
+import time
+import random
+import socket
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ..models import BackgroundTask, ScrapeJob
+
+logger = logging.getLogger(__name__)
+
+# 任務類型：處理函數 (以 payload 作為關鍵字參數呼叫)、預設優先順序、最大執行次數與所需資源
+# 使用者等待結果的任務優先順序較高；爬蟲失敗時以檢查點接續，因此只重試一次
+# 爬蟲與摘要的實際資源用量依線程數而定，由加入任務的函數指定；
+# 爬蟲的 CKIP 模型名額只在 NLP 階段以 hold_resources 取得，不在整個爬取期間佔用
+TASK_TYPES = {
+    'scrape': {
+        'handler': 'scraper.services.task_service.run_scrape_job',
+        'priority': 0,
+        'max_attempts': 2,
+        'resources': {'browser': 1},
+    },
+    'sentiment': {
+        'handler': 'scraper.services.sentiment_service.analyze_job_sentiment',
+        'priority': 0,
+        'max_attempts': 3,
+        'resources': {'model': 1},
+    },
+    'summaries': {
+        'handler': 'scraper.services.summary_service.analyze_job_summaries',
+        'priority': -5,
+        'max_attempts': 3,
+        'resources': {'llm': 1},
+    },
+    'ai_report': {
+        'handler': 'scraper.services.ai_service._generate_report_task',
+        'priority': 10,
+        'max_attempts': 2,
+        'resources': {'llm': 1},
+    },
+}
+
+ACTIVE_STATUSES = ('pending', 'running')
+
+# 目前線程正在執行的背景任務 (任務 ID, 工作程序名稱)，由 run_task 設定
+_current = threading.local()
+
+
+def _queue_settings():
+    queue_settings = getattr(settings, 'TASK_QUEUE_SETTINGS', {})
+    return {
+        'LEASE_SECONDS': queue_settings.get('LEASE_SECONDS', 120),
+        'HEARTBEAT_INTERVAL': queue_settings.get('HEARTBEAT_INTERVAL', 30),
+        'RETRY_BACKOFF': queue_settings.get('RETRY_BACKOFF', 30),
+        'POLL_INTERVAL': queue_settings.get('POLL_INTERVAL', 2.0),
+        'RESOURCE_CAPACITY': queue_settings.get('RESOURCE_CAPACITY', {}),
+    }
+
+
+def resource_capacity(resource):
+    """資源的總容量，未設定的資源視為不限制"""
+    return _queue_settings()['RESOURCE_CAPACITY'].get(resource)
+
+
+def _clamp_resources(resources):
+    """將所需資源限制在容量以內，避免單一任務因超過總容量而永遠無法執行"""
+    clamped = {}
+    for resource, amount in resources.items():
+        capacity = resource_capacity(resource)
+        amount = max(0, int(amount))
+        clamped[resource] = min(amount, capacity) if capacity is not None else amount
+    return {resource: amount for resource, amount in clamped.items() if amount}
+
+
+def _resource_usage(running_tasks):
+    """加總執行中任務的資源用量與各用戶的執行中任務數"""
+    usage = Counter()
+    running_per_user = Counter()
+    for user_id, resources in running_tasks:
+        usage.update(resources or {})
+        running_per_user[user_id] += 1
+    return usage, running_per_user
+
+
+def _short_resources(resources, usage):
+    """剩餘容量不足的資源"""
+    short = set()
+    for resource, amount in resources.items():
+        capacity = resource_capacity(resource)
+        if capacity is not None and usage[resource] + amount > capacity:
+            short.add(resource)
+    return short
+
+
+def _fits(resources, usage):
+    return not _short_resources(resources, usage)
+
+
+def worker_name():
+    """工作程序名稱，以主機名稱、程序 ID 與線程 ID 區分"""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def enqueue(task_type, payload=None, priority=None, max_attempts=None, dedupe_key='', user_id=None,
+            resources=None):
+    """
+    將任務加入佇列
+
+    Args:
+        task_type: TASK_TYPES 中的任務類型
+        payload: 傳給處理函數的關鍵字參數，需可序列化為 JSON
+        priority: 優先順序，數字大者先執行，預設使用任務類型的設定
+        max_attempts: 最大執行次數，預設使用任務類型的設定
+        dedupe_key: 去重鍵，已有相同去重鍵的任務在等待或執行中時不重複加入
+        user_id: 提交任務的用戶，排程時依用戶公平分配
+        resources: 所需資源，如 {'browser': 4}，預設使用任務類型的設定
+
+    Returns:
+        BackgroundTask: 新加入或已存在的任務
+    """
+    if task_type not in TASK_TYPES:
+        raise ValueError(f"未知的任務類型: {task_type}")
+    config = TASK_TYPES[task_type]
+
+    if dedupe_key:
+        existing = BackgroundTask.objects.filter(dedupe_key=dedupe_key, status__in=ACTIVE_STATUSES).first()
+        if existing is not None:
+            logger.info(f"任務 {dedupe_key} 已在佇列中 (#{existing.id})，不重複加入")
+            return existing
+
+    task = BackgroundTask.objects.create(
+        task_type=task_type,
+        payload=payload or {},
+        priority=config['priority'] if priority is None else priority,
+        max_attempts=config['max_attempts'] if max_attempts is None else max_attempts,
+        dedupe_key=dedupe_key,
+        user_id=user_id,
+        resources=_clamp_resources(config['resources'] if resources is None else resources)
+    )
+    logger.info(f"已加入背景任務 {task_type} #{task.id}")
+    return task
+
+
+def job_owner_id(job_id):
+    """爬蟲任務所屬用戶的 ID，作為背景任務公平排程的依據"""
+    return ScrapeJob.objects.filter(id=job_id).values_list('user_id', flat=True).first()
+
+
+def is_task_active(dedupe_key):
+    """檢查指定去重鍵的任務是否在等待或執行中"""
+    return BackgroundTask.objects.filter(dedupe_key=dedupe_key, status__in=ACTIVE_STATUSES).exists()
+
+
+def claim_task(worker=None, task_types=None):
+    """
+    依優先順序與資源容量領取一個可執行的任務
+
+    等待中且已到執行時間的任務，以及租約已到期的執行中任務 (工作程序中斷) 皆可領取。
+    相同優先順序的任務中，目前執行中任務較少的用戶優先；所需資源超過剩餘容量的任務留在佇列中，
+    並為其保留該資源，避免需要較多資源的任務一直被較小的任務插隊。
+    以條件式 UPDATE 確保同一任務只會被一個工作程序領取
+
+    Args:
+        worker: 工作程序名稱
+        task_types: 只領取指定類型的任務，None 表示全部
+
+    Returns:
+        BackgroundTask: 領取的任務，沒有可執行的任務時返回 None
+    """
+    worker = worker or worker_name()
+    lease_seconds = _queue_settings()['LEASE_SECONDS']
+
+    now = timezone.now()
+    claimable = Q(status='pending', run_after__lte=now) | Q(status='running', lease_expires_at__lt=now)
+    candidates = BackgroundTask.objects.filter(claimable)
+    if task_types:
+        candidates = candidates.filter(task_type__in=task_types)
+
+    candidates = list(candidates.order_by('-priority', 'run_after', 'id').values(
+        'id', 'user_id', 'priority', 'resources')[:100])
+    if not candidates:
+        return None
+
+    usage, running_per_user = _resource_usage(BackgroundTask.objects.filter(
+        status='running', lease_expires_at__gte=now).values_list('user_id', 'resources'))
+    # 穩定排序：同優先順序內依用戶的執行中任務數，再依原本的等待順序
+    candidates.sort(key=lambda c: (-c['priority'], running_per_user[c['user_id']]))
+
+    reserved = set()
+    for candidate in candidates:
+        resources = candidate['resources'] or {}
+        if reserved & resources.keys():
+            continue
+        short = _short_resources(resources, usage)
+        if short:
+            # 只保留不足的資源，只需要其他資源的任務仍可執行
+            reserved.update(short)
+            continue
+
+        claimed = BackgroundTask.objects.filter(claimable, id=candidate['id']).update(
+            status='running', worker=worker, attempts=F('attempts') + 1, started_at=now,
+            lease_expires_at=now + timedelta(seconds=lease_seconds))
+        if not claimed:
+            continue
+
+        task = BackgroundTask.objects.get(id=candidate['id'])
+        short = _admission_shortfall(task)
+        if short:
+            # 其他工作程序同時領取了相同資源的任務，先領取者優先，此任務放回佇列並繼續檢查其他任務
+            BackgroundTask.objects.filter(id=task.id, worker=worker).update(
+                status='pending', worker='', attempts=F('attempts') - 1, started_at=None, lease_expires_at=None)
+            reserved.update(short)
+            continue
+        if task.attempts > task.max_attempts:
+            # 租約到期被重新領取，但已超過最大執行次數
+            _finish(task, worker, 'failed', last_error=task.last_error or '工作程序中斷且已超過最大執行次數')
+            continue
+        return task
+    return None
+
+
+def _admission_shortfall(task):
+    """確認領取任務後的資源用量未超過容量，只計算比此任務早領取的執行中任務，返回不足的資源"""
+    earlier = BackgroundTask.objects.filter(
+        Q(started_at__lt=task.started_at) | Q(started_at=task.started_at, id__lt=task.id),
+        status='running', lease_expires_at__gte=timezone.now()
+    ).exclude(id=task.id).values_list('user_id', 'resources')
+    usage, _ = _resource_usage(earlier)
+    return _short_resources(task.resources or {}, usage)
+
+
+def _task_resources(task_id):
+    return BackgroundTask.objects.filter(id=task_id).values_list('resources', flat=True).first() or {}
+
+
+def _other_usage(task_id):
+    """其他執行中任務的資源用量"""
+    usage, _ = _resource_usage(BackgroundTask.objects.filter(
+        status='running', lease_expires_at__gte=timezone.now()).exclude(id=task_id).values_list(
+        'user_id', 'resources'))
+    return usage
+
+
+@contextmanager
+def hold_resources(task, resources, poll_interval=None):
+    """
+    在執行中的任務內暫時取得額外資源，容量不足時等待，離開時歸還
+
+    用於只在部分階段需要的資源 (如爬蟲的 NLP 階段才需要 CKIP 模型名額)。
+    取得後再確認一次總用量，與其他工作程序同時取得而超過容量時歸還並稍後重試
+
+    Args:
+        task: (任務 ID, 工作程序名稱)，為 None 時 (不在背景任務中執行) 不做任何限制
+        resources: 所需資源
+        poll_interval: 等待容量時的檢查間隔(秒)，預設使用 TASK_QUEUE_SETTINGS['POLL_INTERVAL']
+    """
+    resources = _clamp_resources(resources)
+    if task is None or not resources:
+        yield
+        return
+
+    task_id, worker = task
+    interval = poll_interval or _queue_settings()['POLL_INTERVAL']
+    base = _task_resources(task_id)
+    combined = dict(Counter(base) + Counter(resources))
+    waited = False
+    while True:
+        usage = _other_usage(task_id)
+        if _fits(combined, usage):
+            BackgroundTask.objects.filter(id=task_id, worker=worker).update(resources=combined)
+            if _fits(combined, _other_usage(task_id)):
+                break
+            BackgroundTask.objects.filter(id=task_id, worker=worker).update(resources=base)
+        if not waited:
+            logger.info(f"背景任務 #{task_id} 等待資源 {resources}")
+            waited = True
+        time.sleep(interval * random.uniform(0.5, 1.5))
+
+    try:
+        yield
+    finally:
+        BackgroundTask.objects.filter(id=task_id, worker=worker).update(resources=base)
+
+
+def resource_holder(resources):
+    """
+    建立取得資源的 context manager 工廠，綁定目前線程正在執行的背景任務
+
+    爬蟲的 NLP 工作線程不是執行背景任務的線程，需在任務線程中先建立工廠再交給爬蟲
+
+    Args:
+        resources: 所需資源
+
+    Returns:
+        callable: 每次呼叫返回一個取得資源的 context manager；不在背景任務中時不做任何限制
+    """
+    task = getattr(_current, 'task', None)
+    if task is None:
+        return nullcontext
+    return lambda: hold_resources(task, resources)
+
+
+def _empty_stage():
+    return {'pending': 0, 'delayed': 0, 'running': 0, 'completed': 0, 'failed': 0,
+            'oldest_wait_seconds': 0.0, 'avg_wait_seconds': None, 'max_wait_seconds': None}
+
+
+def queue_stats(window_hours=24):
+    """
+    各任務類型的佇列深度與等待時間，以及各資源的用量
+
+    等待時間為任務可執行 (run_after) 到開始執行的時間，不包含失敗重試的退避時間
+
+    Args:
+        window_hours: 計算平均等待時間的時間範圍(小時)
+
+    Returns:
+        dict: {'stages': {任務類型: 統計}, 'resources': {資源: {'used', 'capacity'}}, 'pending_by_user': {...}}
+    """
+    now = timezone.now()
+    stages = {task_type: _empty_stage() for task_type in TASK_TYPES}
+    pending_by_user = Counter()
+
+    active = BackgroundTask.objects.filter(status__in=ACTIVE_STATUSES).values_list(
+        'task_type', 'status', 'run_after', 'lease_expires_at', 'user__username', 'resources')
+    running = []
+    for task_type, status, run_after, lease_expires_at, username, resources in active:
+        stage = stages.setdefault(task_type, _empty_stage())
+        if status == 'running' and lease_expires_at and lease_expires_at >= now:
+            stage['running'] += 1
+            running.append((username, resources))
+        elif status == 'pending' and run_after > now:
+            stage['delayed'] += 1
+        else:
+            # 等待中或租約到期待接手的任務
+            stage['pending'] += 1
+            pending_by_user[username or '-'] += 1
+            stage['oldest_wait_seconds'] = max(stage['oldest_wait_seconds'], (now - run_after).total_seconds())
+
+    for stage in stages.values():
+        stage['oldest_wait_seconds'] = round(stage['oldest_wait_seconds'], 1)
+
+    waits = defaultdict(list)
+    recent = BackgroundTask.objects.filter(started_at__gte=now - timedelta(hours=window_hours))
+    for task_type, status, run_after, started_at in recent.values_list('task_type', 'status', 'run_after',
+                                                                       'started_at'):
+        waits[task_type].append(max(0.0, (started_at - run_after).total_seconds()))
+        if status in ('completed', 'failed'):
+            stages.setdefault(task_type, _empty_stage())[status] += 1
+    for task_type, values in waits.items():
+        stage = stages.setdefault(task_type, _empty_stage())
+        stage['avg_wait_seconds'] = round(sum(values) / len(values), 1)
+        stage['max_wait_seconds'] = round(max(values), 1)
+
+    usage, _ = _resource_usage(running)
+    resources = {resource: {'used': usage[resource], 'capacity': capacity}
+                 for resource, capacity in _queue_settings()['RESOURCE_CAPACITY'].items()}
+
+    return {'stages': stages, 'resources': resources, 'pending_by_user': dict(pending_by_user)}
+
+
+def _finish(task, worker, status, **fields):
+    """更新由本工作程序持有的任務狀態"""
+    return BackgroundTask.objects.filter(id=task.id, worker=worker).update(
+        status=status, lease_expires_at=None, **fields)
+
+
+def _heartbeat(task_id, worker, stop_event):
+    """定期延長執行中任務的租約"""
+    queue_settings = _queue_settings()
+    try:
+        while not stop_event.wait(queue_settings['HEARTBEAT_INTERVAL']):
+            BackgroundTask.objects.filter(id=task_id, worker=worker, status='running').update(
+                lease_expires_at=timezone.now() + timedelta(seconds=queue_settings['LEASE_SECONDS']))
+    except Exception as e:
+        logger.error(f"延長背景任務 #{task_id} 租約時發生錯誤: {e}")
+    finally:
+        connection.close()
+
+
+def run_task(task, worker=None):
+    """
+    執行已領取的任務，失敗時依指數退避重新排入佇列，超過最大執行次數則標記為失敗
+
+    Returns:
+        bool: 任務是否成功完成
+    """
+    worker = worker or task.worker
+    _current.task = (task.id, worker)
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(task.id, worker, stop_event), daemon=True)
+    heartbeat.start()
+
+    logger.info(f"工作程序 {worker} 開始執行背景任務 {task.task_type} #{task.id} (第 {task.attempts} 次)")
+    try:
+        handler = import_string(TASK_TYPES[task.task_type]['handler'])
+        handler(**task.payload)
+    except Exception as e:
+        logger.error(f"背景任務 {task.task_type} #{task.id} 執行失敗: {e}", exc_info=True)
+        if task.attempts < task.max_attempts:
+            delay = _queue_settings()['RETRY_BACKOFF'] * 2 ** (task.attempts - 1)
+            _finish(task, worker, 'pending', last_error=str(e), run_after=timezone.now() + timedelta(seconds=delay))
+            logger.info(f"背景任務 #{task.id} 將在 {delay} 秒後重試")
+        else:
+            _finish(task, worker, 'failed', last_error=str(e), finished_at=timezone.now())
+        return False
+    finally:
+        _current.task = None
+        stop_event.set()
+        heartbeat.join()
+
+    _finish(task, worker, 'completed', finished_at=timezone.now())
+    logger.info(f"背景任務 {task.task_type} #{task.id} 完成")
+    return True
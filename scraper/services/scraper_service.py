@@ -1,25 +1,162 @@
 import os
 import json
+import time
 import logging
+from collections import defaultdict
 from datetime import datetime
 from django.conf import settings
+from django.db import OperationalError, transaction
 from django.utils import timezone
 import importlib
-import threading
 
-from ..models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis
-from ..services.sentiment_service import analyze_job_sentiment
+from ..models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, ArticleKeyword, ArticleEntity
+from ..services.sentiment_service import analyze_job_sentiment_async
+from ..utils.result_store import iter_articles, ARTICLE_TERMS_FILE
+from ..utils.article_parser import content_hash
+from ..utils.html_cache import HtmlCache
+from .article_index import ArticleIndex
+from .queue_service import resource_capacity, resource_holder
+from .stats_service import postings_delta, apply_stats_delta
 
 logger = logging.getLogger(__name__)
 
 
+def load_scraper_module():
+    """導入爬蟲模組"""
+    # 假設爬蟲代碼已複製到專案中，需要調整路徑
+    scraper_module_path = os.path.join(settings.BASE_DIR, 'scraper', 'utils', 'scraper_utils.py')
+    spec = importlib.util.spec_from_file_location("scraper_utils", scraper_module_path)
+    scraper_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(scraper_module)
+    return scraper_module
 
-def run_scraper(job_id):
+
+def browser_share(job):
+    """
+    每個爬蟲程序分得的瀏覽器容量
+
+    TASK_QUEUE_SETTINGS 的瀏覽器容量由分片任務的各分片平分
+
+    Args:
+        job: ScrapeJob 實例
+
+    Returns:
+        int: 瀏覽器數，未設定瀏覽器容量時為 None (不限制)
+    """
+    capacity = resource_capacity('browser')
+    if capacity is None:
+        return None
+    if job.shard_count > 1:
+        capacity //= job.shard_count
+    return max(1, capacity)
+
+
+def browser_budget(job):
+    """
+    爬蟲每個程序各階段使用的瀏覽器數，加總即為程序最多同時執行的 Chrome 數
+
+    多線程模式下列表頁以瀏覽器池並行爬取 (最多佔分得容量的四分之一)，並與文章爬取同時進行，不啟動主瀏覽器；
+    單線程模式以主瀏覽器爬取列表頁，文章另用一個瀏覽器。
+    分片工作程序使用協調端分配的待爬清單，不爬取列表頁，文章爬取可使用分得的全部容量。
+
+    文章爬取的並行數上限為分得容量扣除列表頁後的剩餘數量，自動調整並行數時由使用者設定的線程數起逐步增加至上限
+
+    Args:
+        job: ScrapeJob 實例
+
+    Returns:
+        dict: listing 列表頁瀏覽器池大小、driver 主瀏覽器數、
+            initial 文章爬取的初始線程數、maximum 文章爬取的線程數上限
+    """
+    if not job.use_threading:
+        return {'listing': 0, 'driver': 0 if job.shard_count > 1 else 1, 'initial': 1, 'maximum': 1}
+
+    scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+    share = browser_share(job)
+    listing = scraper_settings.get('LISTING_MAX_WORKERS', 9)
+    if job.categories:
+        listing = min(listing, len(job.categories.split(',')))
+    if share is not None:
+        listing = min(listing, max(1, share // 4))
+
+    maximum = job.max_workers
+    if scraper_settings.get('ADAPTIVE_CONCURRENCY', True):
+        maximum = scraper_settings.get('ADAPTIVE_MAX_WORKERS', 32)
+    if share is not None:
+        maximum = min(maximum, share if job.shard_count > 1 else share - listing)
+    maximum = max(1, maximum)
+    return {'listing': listing, 'driver': 0, 'initial': min(job.max_workers, maximum), 'maximum': maximum}
+
+
+def scrape_max_workers(job):
+    """
+    爬蟲每個程序文章爬取的初始線程數
+
+    Args:
+        job: ScrapeJob 實例
+
+    Returns:
+        int: 線程數
+    """
+    return browser_budget(job)['initial']
+
+
+def build_scraper(job, scraper_module=None):
+    """
+    依任務與 SCRAPER_SETTINGS 建立爬蟲實例
+
+    Args:
+        job: ScrapeJob 實例
+        scraper_module: 已導入的爬蟲模組，未提供時重新導入
+
+    Returns:
+        CTSimpleScraper: 爬蟲實例
+    """
+    if scraper_module is None:
+        scraper_module = load_scraper_module()
+
+    # 增量爬取：載入先前任務已保存文章的連結索引
+    article_index = ArticleIndex(exclude_job_id=job.id) if job.incremental else None
+
+    scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+    # 列表頁與文章爬取的瀏覽器數合計不超過排程器分配的瀏覽器數
+    budget = browser_budget(job)
+
+    html_cache = None
+    if scraper_settings.get('HTML_CACHE', True):
+        html_cache = HtmlCache(scraper_settings.get('HTML_CACHE_DIR',
+                                                    os.path.join(settings.MEDIA_ROOT, 'html_cache')))
+    return scraper_module.CTSimpleScraper(
+        headless=True,
+        driver_max_pages=scraper_settings.get('DRIVER_MAX_PAGES', 50),
+        fetch_mode=job.fetch_mode,
+        http_timeout=scraper_settings.get('HTTP_TIMEOUT', 10),
+        async_concurrency=scraper_settings.get('ASYNC_MAX_CONCURRENCY', 200),
+        async_per_host=scraper_settings.get('ASYNC_PER_HOST_LIMIT', 64),
+        async_rate=scraper_settings.get('ASYNC_RATE_PER_HOST', 20.0),
+        listing_max_workers=budget['listing'],
+        pipeline_queue_size=scraper_settings.get('PIPELINE_QUEUE_SIZE', 100),
+        nlp_workers=scraper_settings.get('NLP_WORKERS', 1),
+        # 在背景任務中執行時，NLP 階段才取得 CKIP 模型名額
+        nlp_resource=resource_holder({'model': 1}),
+        checkpoint_interval=scraper_settings.get('CHECKPOINT_INTERVAL', 20),
+        article_index=article_index,
+        html_cache=html_cache,
+        lean_browser=job.lean_browser,
+        adaptive_concurrency=scraper_settings.get('ADAPTIVE_CONCURRENCY', True),
+        adaptive_max_workers=budget['maximum'],
+        near_duplicate=scraper_settings.get('NEAR_DUPLICATE', 'flag'),
+        near_duplicate_threshold=scraper_settings.get('NEAR_DUPLICATE_THRESHOLD', 3)
+    )
+
+
+def run_scraper(job_id, resume=False):
     """
     運行爬蟲的服務函數
 
     Args:
         job_id: ScrapeJob 模型的 ID
+        resume: 是否從任務輸出目錄中的檢查點接續先前中斷的執行
 
     Returns:
         bool: 爬蟲是否成功完成
@@ -27,29 +164,36 @@ def run_scraper(job_id):
     try:
         # 獲取任務記錄
         job = ScrapeJob.objects.get(id=job_id)
+        resume_requested = resume
+
+        # 設置輸出目錄，接續執行時沿用原本的目錄以讀取檢查點與既有結果
+        resume = resume and bool(job.output_dir) and os.path.isdir(job.output_dir)
+        if resume:
+            output_dir = job.output_dir
+            logger.info(f"爬蟲任務 {job_id} 從 {output_dir} 接續執行")
+        else:
+            current_date = datetime.now().strftime('%Y%m%d_%H%M_%S')
+            output_dir = os.path.join(settings.MEDIA_ROOT, 'scraper_output', f'job_{job_id}_{current_date}')
+            os.makedirs(output_dir, exist_ok=True)
+
         job.status = 'running'
+        job.output_dir = output_dir
         job.save()
 
-        # 設置輸出目錄
-        current_date = datetime.now().strftime('%Y%m%d_%H%M_%S')
-        output_dir = os.path.join(settings.MEDIA_ROOT, 'scraper_output', f'job_{job_id}_{current_date}')
-        os.makedirs(output_dir, exist_ok=True)
-
-        # 導入爬蟲模組
-        # 假設爬蟲代碼已複製到專案中，需要調整路徑
-        scraper_module_path = os.path.join(settings.BASE_DIR, 'scraper', 'utils', 'scraper_utils.py')
-        spec = importlib.util.spec_from_file_location("scraper_utils", scraper_module_path)
-        scraper_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(scraper_module)
+        # 分片任務：由協調端收集列表頁並分配給多個工作程序
+        if job.shard_count > 1:
+            from .shard_service import run_sharded_scraper
+            return run_sharded_scraper(job, resume=resume_requested)
 
         # 獲取爬蟲參數
         categories = job.categories.split(',') if job.categories else None
         limit_per_category = job.limit_per_category
         use_threading = job.use_threading
-        max_workers = job.max_workers
+        max_workers = scrape_max_workers(job)
 
         # 初始化爬蟲
-        scraper = scraper_module.CTSimpleScraper(headless=True)
+        scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+        scraper = build_scraper(job)
 
         # 執行爬蟲
         success = scraper.run(
@@ -57,20 +201,23 @@ def run_scraper(job_id):
             limit_per_category=limit_per_category,
             use_threading=use_threading,
             max_workers=max_workers,
-            output_dir=output_dir
+            output_dir=output_dir,
+            pipeline=scraper_settings.get('PIPELINE', True),
+            resume=resume
         )
 
         # 處理爬蟲結果
         if success:
-            # 找到結果 JSON 文件
-            json_files = [f for f in os.listdir(output_dir) if f.endswith('.json') and f.startswith('ct_articles_')]
+            # 找到結果文件，新版為 JSON Lines，舊版為 JSON 陣列
+            json_files = [f for f in os.listdir(output_dir)
+                          if f.startswith('ct_articles_') and f.endswith(('.jsonl', '.json'))]
             if json_files:
                 result_file = os.path.join(output_dir, sorted(json_files)[-1])  # 取最新的文件
                 job.result_file_path = result_file
                 job.status = 'completed'
 
                 # 解析JSON並存入資料庫
-                process_scraper_results(job, result_file)
+                process_scraper_results(job, result_file, replace_existing=resume)
             else:
                 job.status = 'failed'
                 logger.error(f"爬蟲任務 {job_id} 未生成結果文件")
@@ -93,38 +240,243 @@ def run_scraper(job_id):
         return False
 
 
-def process_scraper_results(job, result_file_path):
+def resume_scraper(job_id):
+    """
+    接續執行中斷的爬蟲任務，已完成的文章不會重新抓取
+
+    Args:
+        job_id: ScrapeJob 模型的 ID
+
+    Returns:
+        bool: 爬蟲是否成功完成
+    """
+    job = ScrapeJob.objects.get(id=job_id)
+    if job.status not in ('running', 'failed'):
+        logger.warning(f"爬蟲任務 {job_id} 狀態為 {job.status}，無需接續執行")
+        return False
+    return run_scraper(job_id, resume=True)
+
+
+def upsert_articles(job, result_file_path, batch_size=100):
+    """
+    逐篇讀取結果文件，以 (job, item_id) 為鍵分批寫入文章
+
+    已存在的文章以新內容覆蓋，重複寫入同一份結果不會產生重複資料，
+    分片工作程序重試或多個程序寫入同一任務時也不會衝突
+
+    Args:
+        job: ScrapeJob 實例
+        result_file_path: 結果文件路徑 (.jsonl 或舊版 .json)
+        batch_size: 每批寫入的文章數
+
+    Returns:
+        int: 寫入的文章數
+    """
+    def flush(objects):
+        Article.objects.bulk_create(
+            objects,
+            update_conflicts=True,
+            unique_fields=['job', 'item_id'],
+            update_fields=['category', 'title', 'content', 'date', 'author', 'link', 'photo_links',
+                           'content_hash', 'simhash']
+        )
+
+    count = 0
+    article_objects = []
+    duplicate_pairs = []  # (文章 item_id, 近似重複來源 item_id)，全部寫入後才能對應到資料庫 ID
+    for article_data in iter_articles(result_file_path):
+        # 創建 Article 記錄
+        date_str = article_data.get('date', datetime.now().isoformat())
+        date_obj = datetime.fromisoformat(date_str)
+        aware_date = timezone.make_aware(date_obj)
+
+        article_objects.append(Article(
+            job=job,
+            item_id=article_data.get('item_id', ''),
+            category=article_data.get('category', ''),
+            title=article_data.get('title', ''),
+            content=article_data.get('content', ''),
+            date=aware_date,
+            author=','.join(article_data.get('author', [])),
+            link=article_data.get('link', ''),
+            photo_links=json.dumps(article_data.get('photo_links', [])),
+            content_hash=article_data.get('content_hash') or content_hash(article_data.get('content', '')),
+            simhash=article_data.get('simhash', '')
+        ))
+        if article_data.get('duplicate_of'):
+            duplicate_pairs.append((article_data.get('item_id', ''), article_data['duplicate_of']))
+        if len(article_objects) >= batch_size:
+            flush(article_objects)
+            count += len(article_objects)
+            article_objects = []
+    if article_objects:
+        flush(article_objects)
+        count += len(article_objects)
+
+    # 回填近似重複文章的來源
+    if duplicate_pairs:
+        id_map = dict(Article.objects.filter(job=job).values_list('item_id', 'id'))
+        duplicates = [
+            Article(id=id_map[item_id], duplicate_of_id=id_map[original_id])
+            for item_id, original_id in duplicate_pairs
+            if item_id in id_map and original_id in id_map
+        ]
+        Article.objects.bulk_update(duplicates, ['duplicate_of'], batch_size=batch_size)
+        logger.info(f"爬蟲任務 {job.id} 共 {len(duplicates)} 篇近似重複文章，將不進行情感與摘要分析")
+
+    return count
+
+
+def import_article_terms(job, output_dir, batch_size=200, update_stats=False):
+    """
+    將 NLP 階段輸出的 article_terms.jsonl 匯入文章關鍵詞與命名實體表
+
+    逐篇讀取並分批寫入，每批先刪除這些文章已有的記錄，重複匯入不會產生重複資料
+
+    Args:
+        job: ScrapeJob 實例
+        output_dir: 爬蟲輸出目錄
+        batch_size: 每批處理的文章數
+        update_stats: 是否同時以新舊記錄的差異增量更新任務的類別關鍵詞與命名實體統計，
+            用於在已有統計的任務中新增或重新分析部分文章
+
+    Returns:
+        int: 匯入的文章數
+    """
+    terms_file = os.path.join(output_dir, ARTICLE_TERMS_FILE)
+    if not os.path.exists(terms_file):
+        return 0
+
+    id_map = {}
+    category_map = {}
+    for item_id, article_id, category in Article.objects.filter(job=job).values_list('item_id', 'id', 'category'):
+        id_map[item_id] = article_id
+        category_map[article_id] = category
+
+    def flush(batch):
+        _retry_locked(job, write, batch)
+
+    def write(batch):
+        article_ids = [article_id for article_id, _ in batch]
+        with transaction.atomic():
+            if update_stats:
+                apply_stats_delta(job, *postings_delta(article_ids, category_map, batch))
+            ArticleKeyword.objects.filter(article_id__in=article_ids).delete()
+            ArticleEntity.objects.filter(article_id__in=article_ids).delete()
+            ArticleKeyword.objects.bulk_create([
+                ArticleKeyword(job=job, article_id=article_id, word=word[:100], pos=pos[:10], count=count)
+                for article_id, terms in batch for word, pos, count in terms.get('keywords', [])
+            ], batch_size=1000, ignore_conflicts=True)
+            ArticleEntity.objects.bulk_create([
+                ArticleEntity(job=job, article_id=article_id, entity=entity[:100], entity_type=entity_type[:20],
+                              count=count)
+                for article_id, terms in batch for entity, entity_type, count in terms.get('entities', [])
+            ], batch_size=1000, ignore_conflicts=True)
+
+    count = 0
+    batch = []
+    imported = set()
+    for terms in iter_articles(terms_file):
+        article_id = id_map.get(terms.get('item_id'))
+        if article_id is None:
+            continue
+        batch.append((article_id, terms))
+        imported.add(article_id)
+        if len(batch) >= batch_size:
+            flush(batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        flush(batch)
+        count += len(batch)
+
+    logger.info(f"爬蟲任務 {job.id} 已匯入 {count} 篇文章的關鍵詞與命名實體")
+    copy_duplicate_terms(job, skip_ids=imported, batch_size=batch_size)
+    return count
+
+
+def copy_duplicate_terms(job, skip_ids=(), batch_size=200):
+    """
+    將來源文章的關鍵詞與命名實體記錄複製給近似重複文章
+
+    近似重複文章不經 NLP 分析，沒有自己的記錄，複製後搜尋與人物分析也能找到這些文章。
+    每次都以來源文章目前的記錄重建，分片任務中來源文章較晚匯入時，之後的匯入會補上；
+    類別統計只計入實際分析的文章，複製的記錄不更新統計
+
+    Args:
+        job: ScrapeJob 實例
+        skip_ids: 已有自己分析記錄的文章 ID (如事後才標記為近似重複的文章)
+        batch_size: 每批處理的文章數
+
+    Returns:
+        int: 複製記錄的近似重複文章數
+    """
+    pairs = [(article_id, original_id) for article_id, original_id in Article.objects.filter(
+        job=job, duplicate_of__isnull=False).values_list('id', 'duplicate_of_id') if article_id not in skip_ids]
+
+    def write(chunk):
+        duplicates = defaultdict(list)
+        for article_id, original_id in chunk:
+            duplicates[original_id].append(article_id)
+        article_ids = [article_id for article_id, _ in chunk]
+        with transaction.atomic():
+            ArticleKeyword.objects.filter(article_id__in=article_ids).delete()
+            ArticleEntity.objects.filter(article_id__in=article_ids).delete()
+            ArticleKeyword.objects.bulk_create([
+                ArticleKeyword(job=job, article_id=article_id, word=word, pos=pos, count=count)
+                for original_id, word, pos, count in ArticleKeyword.objects.filter(
+                    article_id__in=duplicates).values_list('article_id', 'word', 'pos', 'count')
+                for article_id in duplicates[original_id]
+            ], batch_size=1000, ignore_conflicts=True)
+            ArticleEntity.objects.bulk_create([
+                ArticleEntity(job=job, article_id=article_id, entity=entity, entity_type=entity_type, count=count)
+                for original_id, entity, entity_type, count in ArticleEntity.objects.filter(
+                    article_id__in=duplicates).values_list('article_id', 'entity', 'entity_type', 'count')
+                for article_id in duplicates[original_id]
+            ], batch_size=1000, ignore_conflicts=True)
+
+    for start in range(0, len(pairs), batch_size):
+        _retry_locked(job, write, pairs[start:start + batch_size])
+
+    if pairs:
+        logger.info(f"爬蟲任務 {job.id} 已為 {len(pairs)} 篇近似重複文章複製來源文章的關鍵詞與命名實體")
+    return len(pairs)
+
+
+def _retry_locked(job, write, batch, attempts=3):
+    """寫入一批記錄，資料庫已鎖定時稍後整批重試
+
+    SQLite 同時只允許一個寫入交易，多個分片同時寫入時可能回報資料庫已鎖定
+    """
+    for attempt in range(attempts):
+        try:
+            write(batch)
+            return
+        except OperationalError as e:
+            if 'locked' not in str(e) or attempt == attempts - 1:
+                raise
+            logger.warning(f"爬蟲任務 {job.id} 寫入文章關鍵詞時資料庫已鎖定，稍後重試: {e}")
+            time.sleep(0.5 * 2 ** attempt)
+
+
+def process_scraper_results(job, result_file_path, replace_existing=False):
     """
     處理爬蟲結果，將文章、關鍵詞和命名實體寫入資料庫
 
     Args:
         job: ScrapeJob 實例
-        result_file_path: 結果JSON文件路徑
+        result_file_path: 結果文件路徑 (.jsonl 或舊版 .json)
+        replace_existing: 是否先刪除此任務已寫入的資料，接續執行時避免與中斷前寫入的部分資料重複
     """
     try:
-        # 讀取 JSON 文件
-        with open(result_file_path, 'r', encoding='utf-8') as f:
-            articles_data = json.load(f)
-
-        # 保存文章
-        for article_data in articles_data:
-            # 創建 Article 記錄
-            date_str = article_data.get('date', datetime.now().isoformat())
-            date_obj = datetime.fromisoformat(date_str)
-            aware_date = timezone.make_aware(date_obj)
-
-            article = Article(
-                job=job,
-                item_id=article_data.get('item_id', ''),
-                category=article_data.get('category', ''),
-                title=article_data.get('title', ''),
-                content=article_data.get('content', ''),
-                date=aware_date,
-                author=','.join(article_data.get('author', [])),
-                link=article_data.get('link', ''),
-                photo_links=json.dumps(article_data.get('photo_links', []))
-            )
-            article.save()
+        if replace_existing:
+            Article.objects.filter(job=job).delete()
+            KeywordAnalysis.objects.filter(job=job).delete()
+            NamedEntityAnalysis.objects.filter(job=job).delete()
+
+        # 逐篇讀取結果文件並分批寫入，不需把整份結果載入記憶體
+        upsert_articles(job, result_file_path)
+        import_article_terms(job, os.path.dirname(result_file_path))
 
         # 處理 category_keywords_stats.json 文件
         keywords_file = os.path.join(os.path.dirname(result_file_path), 'category_keywords_stats.json')
@@ -172,11 +524,7 @@ def process_scraper_results(job, result_file_path):
 
         # 數據處理完成後，自動啟動情感分析
         logger.info(f"爬蟲任務 {job.id} 數據處理完成，自動啟動情感分析...")
-        # 使用線程執行情感分析，避免阻塞主流程
-        sentiment_thread = threading.Thread(target=analyze_job_sentiment, args=(job.id,))
-        sentiment_thread.daemon = True
-        sentiment_thread.start()
-        logger.info(f"情感分析線程已啟動，任務ID: {job.id}")
+        analyze_job_sentiment_async(job.id)
 
     except Exception as e:
         logger.error(f"處理爬蟲結果時發生錯誤: {e}", exc_info=True)
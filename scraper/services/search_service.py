@@ -3,12 +3,12 @@ import json
 import logging
 import datetime
 from collections import defaultdict, Counter
-from django.db.models import Q, Count, Case, When, Value, IntegerField, Sum
+from django.db.models import Q, Count, Case, When, Value, IntegerField, Sum, Exists
 from django.utils import timezone
 from django.core.cache import cache
 import hashlib
 
-from ..models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis
+from ..models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, ArticleKeyword, ArticleEntity
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +25,8 @@ class SearchAnalysisService:
         """
         self.job = job
         self.cache_timeout = 60 * 60  # 缓存超时时间（1小时）
+        # 任務是否已有文章層級的記錄，每種記錄只查詢一次
+        self._postings = {}
 
     def search(self, search_criteria):
         """
@@ -189,7 +191,22 @@ class SearchAnalysisService:
         # 搜索关键词或两者
         if search_type in ['keyword', 'both']:
             # 如果有指定詞性，先檢查該詞是否符合要求的詞性
-            if pos_types:
+            if pos_types and include_content and self._has_postings(ArticleKeyword):
+                # 有文章關鍵詞記錄時，直接找出內容含有該詞性關鍵詞的文章
+                keyword_articles = ArticleKeyword.objects.filter(
+                    job=self.job,
+                    word__icontains=term,
+                    pos__in=pos_types
+                ).values('article_id')
+                filters |= Q(id__in=keyword_articles)
+                # 文章關鍵詞記錄只涵蓋內容，標題仍以文字比對，條件與沒有記錄時相同
+                if include_title:
+                    filters |= Q(title__icontains=term) & Q(Exists(KeywordAnalysis.objects.filter(
+                        job=self.job,
+                        word__icontains=term,
+                        pos__in=pos_types
+                    )))
+            elif pos_types:
                 keyword_query = KeywordAnalysis.objects.filter(
                     job=self.job,
                     word__icontains=term,
@@ -211,24 +228,51 @@ class SearchAnalysisService:
         # 搜索命名实体或两者
         if search_type in ['entity', 'both']:
             # 获取包含指定实体的文章ID
-            entity_articles = self._get_articles_with_entity(term, entity_types)
+            entity_articles = self._get_articles_with_entity(term, entity_types, include_title, include_content)
             if entity_articles:
                 filters |= Q(id__in=entity_articles)
 
         return filters
 
-    def _get_articles_with_entity(self, entity_term, entity_types):
+    def _has_postings(self, model):
+        """任務是否已有文章層級的關鍵詞或命名實體記錄 (舊任務沒有，需使用全文掃描)"""
+        if model not in self._postings:
+            self._postings[model] = model.objects.filter(job=self.job).exists()
+        return self._postings[model]
+
+    def _get_articles_with_entity(self, entity_term, entity_types, include_title=True, include_content=True):
         """
         獲取包含指定實體的文章ID
 
         Args:
             entity_term: 實體搜尋詞
             entity_types: 要搜尋的實體類型列表
+            include_title: 是否比對標題
+            include_content: 是否比對內容
 
         Returns:
             list: 文章ID列表
         """
         try:
+            if include_content and self._has_postings(ArticleEntity):
+                # 直接查詢文章命名實體表，不需逐篇掃描文章內容
+                query = ArticleEntity.objects.filter(job=self.job, entity__icontains=entity_term)
+                if entity_types:
+                    query = query.filter(entity_type__in=entity_types)
+                article_ids = set(query.values_list('article_id', flat=True))
+
+                # 文章命名實體記錄只涵蓋內容，標題仍以文字比對，條件與沒有記錄時相同
+                if include_title:
+                    entities = NamedEntityAnalysis.objects.filter(job=self.job, entity__icontains=entity_term)
+                    if entity_types:
+                        entities = entities.filter(entity_type__in=entity_types)
+                    article_ids.update(Article.objects.filter(
+                        job=self.job,
+                        title__icontains=entity_term,
+                        category__in=entities.values('category')
+                    ).values_list('id', flat=True))
+                return list(article_ids)
+
             # 查詢符合條件的命名實體
             query = NamedEntityAnalysis.objects.filter(
                 job=self.job,
@@ -245,8 +289,9 @@ class SearchAnalysisService:
             # 這裡我們使用聯合查詢查找匹配的文章
             article_ids = []
             for article in Article.objects.filter(job=self.job, category__in=categories):
-                # 檢查文章內容是否包含該實體詞
-                if entity_term.lower() in article.title.lower() or entity_term.lower() in article.content.lower():
+                # 檢查文章標題或內容是否包含該實體詞
+                if (include_title and entity_term.lower() in article.title.lower()) or \
+                        (include_content and entity_term.lower() in article.content.lower()):
                     article_ids.append(article.id)
 
             return article_ids
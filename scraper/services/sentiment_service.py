@@ -8,6 +8,7 @@ from django.db.models import Count, Avg, F, Q
 
 from ..models import ScrapeJob, Article, SentimentAnalysis, CategorySentimentSummary
 from ..utils.sentiment_analyzer import SentimentAnalyzer
+from .queue_service import enqueue, job_owner_id
 
 logger = logging.getLogger(__name__)
 
@@ -78,7 +79,7 @@ class SentimentAnalysisService:
             # 檢查是否已經完成情感分析 - 增加嚴格檢查
             if job.sentiment_analyzed:
                 # 額外確認是否所有文章都已分析
-                total_articles = Article.objects.filter(job=job).count()
+                total_articles = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
                 analyzed_articles = SentimentAnalysis.objects.filter(job=job).count()
 
                 if total_articles == analyzed_articles:
@@ -93,7 +94,7 @@ class SentimentAnalysisService:
                     job.save(update_fields=['sentiment_analyzed'])
 
             # 記錄總文章數
-            total_articles_count = Article.objects.filter(job=job).count()
+            total_articles_count = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
             self.logger.info(f"任務 {job_id} 共有 {total_articles_count} 篇文章需要分析")
 
             # 初始化失敗列表
@@ -104,9 +105,10 @@ class SentimentAnalysisService:
             all_processed = False
 
             while check_attempts < max_check_attempts and not all_processed:
-                # 獲取尚未分析情感的文章
+                # 獲取尚未分析情感的文章（近似重複的文章不重複分析）
                 articles = Article.objects.filter(
-                    job=job
+                    job=job,
+                    duplicate_of__isnull=True
                 ).exclude(
                     sentiment__isnull=False
                 ).order_by('id')
@@ -173,7 +175,7 @@ class SentimentAnalysisService:
                 # 如果本次沒有失敗的文章，或者已經達到最大嘗試次數
                 if not current_batch_failed or check_attempts >= max_check_attempts:
                     # 檢查是否所有文章都已處理完成
-                    unprocessed = Article.objects.filter(job=job).exclude(sentiment__isnull=False).count()
+                    unprocessed = Article.objects.filter(job=job, duplicate_of__isnull=True).exclude(sentiment__isnull=False).count()
                     if unprocessed == 0:
                         all_processed = True
                         self.logger.info(f"任務 {job_id} 所有文章都已成功分析")
@@ -184,7 +186,7 @@ class SentimentAnalysisService:
             self.generate_category_sentiment_summary(job)
 
             # 最終確認是否所有文章都已分析
-            total_articles = Article.objects.filter(job=job).count()
+            total_articles = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
             analyzed_articles = SentimentAnalysis.objects.filter(job=job).count()
 
             # 只有當所有文章都分析完成時，才將任務標記為已完成
@@ -441,7 +443,8 @@ class SentimentAnalysisService:
 
             # 尋找未分析的文章
             unanalyzed = Article.objects.filter(
-                job=job
+                job=job,
+                duplicate_of__isnull=True
             ).exclude(
                 sentiment__isnull=False
             ).order_by('-date')[:limit]
@@ -466,6 +469,27 @@ def analyze_job_sentiment(job_id, batch_size=20, max_workers=4, max_check_attemp
 
     Returns:
         bool: 是否成功完成分析
+
+    Raises:
+        RuntimeError: 分析失敗，由背景任務佇列記錄並依設定重試
     """
     service = SentimentAnalysisService()
-    return service.analyze_job_articles(job_id, batch_size, max_workers, max_check_attempts)
\ No newline at end of file
+    if not service.analyze_job_articles(job_id, batch_size, max_workers, max_check_attempts):
+        raise RuntimeError(f"任務 {job_id} 的情感分析失敗")
+    return True
+
+
+def analyze_job_sentiment_async(job_id):
+    """
+    將情感分析任務加入背景任務佇列，由 run_task_worker 工作程序執行
+
+    Args:
+        job_id: ScrapeJob的ID
+
+    Returns:
+        BackgroundTask: 背景任務，同一任務的情感分析已在佇列中時返回既有的任務
+    """
+    task = enqueue('sentiment', {'job_id': job_id}, dedupe_key=f"sentiment:{job_id}",
+                   user_id=job_owner_id(job_id))
+    logger.info(f"情感分析任務 {job_id} 已加入背景任務佇列")
+    return task
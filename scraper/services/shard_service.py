@@ -0,0 +1,292 @@
+import os
+import sys
+import socket
+import hashlib
+import logging
+import subprocess
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import ScrapeJob, CrawlShard
+from .scraper_service import build_scraper, upsert_articles, import_article_terms, scrape_max_workers
+from .sentiment_service import analyze_job_sentiment_async
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ('completed', 'failed')
+
+
+def _shard_settings():
+    scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+    return (scraper_settings.get('SHARD_HEARTBEAT_INTERVAL', 30),
+            scraper_settings.get('SHARD_STALE_SECONDS', 300))
+
+
+def worker_name():
+    """工作程序名稱，以主機名稱與程序 ID 區分不同主機上的程序"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def partition_frontier(tasks, shard_count, strategy='hash'):
+    """
+    將文章任務分配到各分片
+
+    Args:
+        tasks: (連結, 類別, 序號) 任務列表
+        shard_count: 分片數
+        strategy: hash 依網址雜湊平均分配；category 整個類別分配到同一分片
+
+    Returns:
+        list: 每個分片的任務列表，不含空的分片
+    """
+    shards = [[] for _ in range(max(1, shard_count))]
+    if strategy == 'category':
+        by_category = defaultdict(list)
+        for task in tasks:
+            by_category[task[1]].append(task)
+        # 文章數多的類別先分配，每次分給目前任務最少的分片
+        for _, category_tasks in sorted(by_category.items(), key=lambda item: len(item[1]), reverse=True):
+            min(shards, key=len).extend(category_tasks)
+    else:
+        # 使用固定的雜湊函數，不同程序與主機上的分配結果一致
+        for task in tasks:
+            digest = hashlib.sha1(task[0].encode('utf-8')).hexdigest()
+            shards[int(digest, 16) % len(shards)].append(task)
+    return [shard for shard in shards if shard]
+
+
+def create_shards(job, shard_tasks):
+    """
+    建立任務的分片，取代先前的分片
+
+    Returns:
+        int: 建立的分片數
+    """
+    with transaction.atomic():
+        CrawlShard.objects.filter(job=job).delete()
+        CrawlShard.objects.bulk_create([
+            CrawlShard(job=job, shard_index=index, frontier=[list(task) for task in tasks])
+            for index, tasks in enumerate(shard_tasks)
+        ])
+    return len(shard_tasks)
+
+
+def claim_shard(job_id=None, worker=None):
+    """
+    領取一個待執行的分片；執行中但心跳逾時的分片視為工作程序已中斷，可由其他程序接手
+
+    以條件式 UPDATE 確保同一分片只會被一個工作程序領取
+
+    Args:
+        job_id: 只領取指定任務的分片，None 表示任何任務
+        worker: 工作程序名稱
+
+    Returns:
+        CrawlShard: 領取的分片，沒有可領取的分片時返回 None
+    """
+    worker = worker or worker_name()
+    _, stale_seconds = _shard_settings()
+    claimable = Q(status='pending') | Q(status='running',
+                                        heartbeat_at__lt=timezone.now() - timedelta(seconds=stale_seconds))
+
+    candidates = CrawlShard.objects.filter(claimable)
+    if job_id is not None:
+        candidates = candidates.filter(job_id=job_id)
+
+    for shard_id in candidates.order_by('job_id', 'shard_index').values_list('id', flat=True)[:50]:
+        now = timezone.now()
+        claimed = CrawlShard.objects.filter(claimable, id=shard_id).update(
+            status='running', worker=worker, claimed_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1, error_message='', finished_at=None)
+        if claimed:
+            return CrawlShard.objects.select_related('job').get(id=shard_id)
+    return None
+
+
+def _heartbeat(shard_id, worker, stop_event, interval):
+    """定期更新分片的心跳時間，讓其他程序知道此分片仍在執行"""
+    try:
+        while not stop_event.wait(interval):
+            CrawlShard.objects.filter(id=shard_id, worker=worker).update(heartbeat_at=timezone.now())
+    except Exception as e:
+        logger.error(f"更新分片 {shard_id} 心跳時發生錯誤: {e}")
+    finally:
+        connection.close()
+
+
+def run_shard(shard, worker=None):
+    """
+    執行一個已領取的分片：爬取分配的文章，寫入資料庫並增量更新任務的關鍵詞與命名實體統計
+
+    同一主機上重新領取的分片會從輸出目錄中的檢查點接續；
+    所有分片結束後由最後完成的工作程序彙整任務
+
+    Args:
+        shard: claim_shard 領取的 CrawlShard
+        worker: 工作程序名稱
+
+    Returns:
+        bool: 分片是否成功完成
+    """
+    worker = worker or worker_name()
+    job = shard.job
+    heartbeat_interval, _ = _shard_settings()
+    scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+    owned = CrawlShard.objects.filter(id=shard.id, worker=worker)
+
+    stop_event = threading.Event()
+    heartbeat = threading.Thread(target=_heartbeat, args=(shard.id, worker, stop_event, heartbeat_interval),
+                                 daemon=True)
+    heartbeat.start()
+
+    success = False
+    try:
+        resume = bool(shard.output_dir) and os.path.isdir(shard.output_dir)
+        if resume:
+            output_dir = shard.output_dir
+            logger.info(f"爬蟲任務 {job.id} 分片 {shard.shard_index} 從 {output_dir} 接續執行")
+        else:
+            current_date = datetime.now().strftime('%Y%m%d_%H%M_%S')
+            output_dir = os.path.join(settings.MEDIA_ROOT, 'scraper_output',
+                                      f'job_{job.id}_shard_{shard.shard_index}_{current_date}')
+            owned.update(output_dir=output_dir)
+
+        logger.info(f"工作程序 {worker} 開始執行爬蟲任務 {job.id} 分片 {shard.shard_index}，"
+                    f"共 {len(shard.frontier)} 篇文章")
+        scraper = build_scraper(job)
+        if not scraper.run(
+                limit_per_category=job.limit_per_category,
+                use_threading=job.use_threading,
+                max_workers=scrape_max_workers(job),
+                output_dir=output_dir,
+                pipeline=scraper_settings.get('PIPELINE', True),
+                resume=resume,
+                frontier=shard.frontier
+        ) or not scraper.result_file:
+            raise RuntimeError("分片爬取失敗")
+
+        # 以 (job, item_id) 寫入文章，重試或被其他程序接手時不會產生重複資料
+        article_count = upsert_articles(job, scraper.result_file)
+        # 分片完成時即以增減值更新任務的類別統計，爬取期間的分析結果隨各分片完成保持最新
+        import_article_terms(job, output_dir, update_stats=True)
+        owned.update(
+            status='completed',
+            result_file_path=scraper.result_file,
+            article_count=article_count,
+            finished_at=timezone.now()
+        )
+        logger.info(f"爬蟲任務 {job.id} 分片 {shard.shard_index} 完成，寫入 {article_count} 篇文章")
+        success = True
+    except Exception as e:
+        logger.error(f"執行爬蟲任務 {job.id} 分片 {shard.shard_index} 時發生錯誤: {e}", exc_info=True)
+        owned.update(status='failed', error_message=str(e), finished_at=timezone.now())
+    finally:
+        stop_event.set()
+        heartbeat.join()
+
+    finalize_sharded_job(job.id)
+    return success
+
+
+def finalize_sharded_job(job_id):
+    """
+    所有分片結束後彙整任務：更新任務狀態並啟動情感分析
+
+    類別關鍵詞與命名實體統計已在各分片完成時增量更新，不需再合併各分片的結果
+
+    多個工作程序可能同時完成最後的分片，以條件式 UPDATE 確保只有一個程序進行彙整
+
+    Returns:
+        bool: 是否由本程序完成彙整
+    """
+    shards = CrawlShard.objects.filter(job_id=job_id)
+    if not shards.exists() or shards.exclude(status__in=FINISHED_STATUSES).exists():
+        return False
+
+    status = 'failed' if shards.filter(status='failed').exists() else 'completed'
+    if not ScrapeJob.objects.filter(id=job_id, status='running').update(status=status, updated_at=timezone.now()):
+        return False
+
+    job = ScrapeJob.objects.get(id=job_id)
+    logger.info(f"爬蟲任務 {job_id} 所有分片已結束，狀態 {status}，"
+                f"共 {job.keywords.count()} 筆關鍵詞與 {job.named_entities.count()} 筆命名實體統計")
+
+    if status == 'completed':
+        logger.info(f"爬蟲任務 {job_id} 數據處理完成，自動啟動情感分析...")
+        analyze_job_sentiment_async(job_id)
+    return True
+
+
+def spawn_shard_workers(job_id, count):
+    """
+    在本機啟動分片工作程序，每個程序有獨立的 GIL、瀏覽器與 cookies
+
+    Returns:
+        list: 啟動的 subprocess.Popen 實例
+    """
+    manage_py = os.path.join(settings.BASE_DIR, 'manage.py')
+    return [
+        subprocess.Popen([sys.executable, manage_py, 'run_scrape_shard', '--job', str(job_id)])
+        for _ in range(count)
+    ]
+
+
+def run_sharded_scraper(job, resume=False):
+    """
+    以分片方式執行爬蟲任務
+
+    協調端收集列表頁後將待爬連結分配到各分片，並在本機啟動工作程序執行；
+    其他主機可執行 `manage.py run_scrape_shard` 領取同一任務的分片。
+    接續執行時保留已完成的分片，只重新執行失敗的分片
+
+    Args:
+        job: ScrapeJob 實例，狀態已設為 running
+        resume: 是否接續先前中斷的分片任務
+
+    Returns:
+        bool: 任務是否成功完成 (其他主機上的分片仍在執行時返回 True)
+    """
+    scraper_settings = getattr(settings, 'SCRAPER_SETTINGS', {})
+    try:
+        if resume and job.shards.exists():
+            requeued = job.shards.filter(status='failed').update(status='pending', finished_at=None)
+            logger.info(f"爬蟲任務 {job.id} 接續分片執行，重新排入 {requeued} 個失敗的分片")
+        else:
+            # 由協調端統一收集列表頁並分配序號，各分片產生的 item_id 不會重複
+            scraper = build_scraper(job)
+            tasks = scraper.discover_frontier(
+                categories=job.categories.split(',') if job.categories else None,
+                limit_per_category=job.limit_per_category,
+                parallel=job.use_threading,
+                output_dir=job.output_dir
+            )
+            if not tasks:
+                logger.error(f"爬蟲任務 {job.id} 未收集到任何文章連結")
+                ScrapeJob.objects.filter(id=job.id).update(status='failed', updated_at=timezone.now())
+                return False
+
+            shard_count = create_shards(job, partition_frontier(tasks, job.shard_count, job.shard_strategy))
+            logger.info(f"爬蟲任務 {job.id} 共 {len(tasks)} 篇文章，依{job.get_shard_strategy_display()}"
+                        f"分成 {shard_count} 個分片")
+
+        local_workers = scraper_settings.get('SHARD_LOCAL_WORKERS')
+        if local_workers is None:
+            local_workers = min(job.shard_count, os.cpu_count() or 1)
+        processes = spawn_shard_workers(job.id, local_workers)
+        logger.info(f"爬蟲任務 {job.id} 已在本機啟動 {len(processes)} 個分片工作程序")
+        for process in processes:
+            process.wait()
+
+        # 本機工作程序結束時其他主機上的分片可能仍在執行，任務由最後完成分片的程序彙整
+        finalize_sharded_job(job.id)
+        job.refresh_from_db(fields=['status'])
+        return job.status != 'failed'
+    except Exception as e:
+        logger.error(f"執行分片爬蟲任務 {job.id} 時發生錯誤: {e}", exc_info=True)
+        ScrapeJob.objects.filter(id=job.id).update(status='failed', updated_at=timezone.now())
+        return False
@@ -0,0 +1,105 @@
+import logging
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import F
+
+from ..models import KeywordAnalysis, NamedEntityAnalysis, ArticleKeyword, ArticleEntity
+
+logger = logging.getLogger(__name__)
+
+# 每次查詢既有統計的鍵數，避免 IN 條件過長
+DELTA_CHUNK_SIZE = 500
+
+
+def postings_delta(article_ids, category_map=None, new_terms=None):
+    """
+    計算文章的關鍵詞與命名實體記錄改變時，類別統計需要增減的頻率
+
+    舊的文章記錄 (ArticleKeyword、ArticleEntity) 以負值計入，新的記錄以正值計入，
+    新增文章只有正值，重新分析的文章只留下前後不同的部分
+
+    Args:
+        article_ids (list): 文章 ID
+        category_map (dict, optional): {文章 ID: 類別}，new_terms 不為空時需要
+        new_terms (list, optional): [(文章 ID, article_terms.jsonl 記錄), ...]
+
+    Returns:
+        tuple: (關鍵詞增減 Counter {(詞, 詞性, 類別): 增減}, 命名實體增減 Counter {(實體, 類型, 類別): 增減})
+    """
+    keyword_delta = Counter()
+    entity_delta = Counter()
+
+    for category, word, pos, count in ArticleKeyword.objects.filter(article_id__in=article_ids).values_list(
+            'article__category', 'word', 'pos', 'count'):
+        keyword_delta[(word, pos, category)] -= count
+    for category, entity, entity_type, count in ArticleEntity.objects.filter(
+            article_id__in=article_ids).values_list('article__category', 'entity', 'entity_type', 'count'):
+        entity_delta[(entity, entity_type, category)] -= count
+
+    for article_id, terms in new_terms or []:
+        category = category_map[article_id]
+        for word, pos, count in terms.get('keywords', []):
+            keyword_delta[(word[:100], pos[:10], category)] += count
+        for entity, entity_type, count in terms.get('entities', []):
+            entity_delta[(entity[:100], entity_type[:20], category)] += count
+
+    return keyword_delta, entity_delta
+
+
+def _apply_delta(model, job, delta, term_field, type_field):
+    """將頻率增減寫入單一統計表，返回受影響的統計數"""
+    delta = {key: value for key, value in delta.items() if value}
+    keys = list(delta)
+    for start in range(0, len(keys), DELTA_CHUNK_SIZE):
+        chunk = keys[start:start + DELTA_CHUNK_SIZE]
+
+        # 先以頻率 0 建立尚不存在的統計，已存在 (包括其他程序同時建立) 的由唯一限制略過，
+        # 之後所有增減都以 frequency = frequency + delta 套用，同時寫入的增減不會互相覆蓋
+        model.objects.bulk_create([
+            model(job=job, category=category, frequency=0, **{term_field: term, type_field: term_type})
+            for term, term_type, category in chunk if delta[(term, term_type, category)] > 0
+        ], batch_size=100, ignore_conflicts=True)
+
+        ids = {}
+        for row_id, term, term_type, category in model.objects.filter(
+                job=job,
+                category__in={key[2] for key in chunk},
+                **{f'{term_field}__in': {key[0] for key in chunk}}
+        ).values_list('id', term_field, type_field, 'category'):
+            ids[(term, term_type, category)] = row_id
+
+        # 相同增減值的統計以一次 UPDATE 處理，查詢數只與不同的增減值數量有關
+        updates = defaultdict(list)
+        for key in chunk:
+            if key in ids:
+                updates[delta[key]].append(ids[key])
+        for value, row_ids in updates.items():
+            model.objects.filter(id__in=row_ids).update(frequency=F('frequency') + value)
+
+        # 頻率減為 0 的統計 (如重新分析後不再出現的詞) 直接刪除
+        decreased = [row_id for value, row_ids in updates.items() if value < 0 for row_id in row_ids]
+        if decreased:
+            model.objects.filter(id__in=decreased, frequency__lte=0).delete()
+    return len(keys)
+
+
+def apply_stats_delta(job, keyword_delta=None, entity_delta=None):
+    """
+    以增減值更新任務的類別關鍵詞與命名實體統計 (frequency = frequency + delta)
+
+    新增或重新分析部分文章時只更新受影響的統計，不需重新計算整個任務。
+    統計表對 (任務, 詞, 詞性, 類別) 有唯一限制，缺少的統計先以頻率 0 建立再累加，
+    多個分片同時寫入同一筆統計時不會重複建立，也不會覆蓋彼此的增減
+
+    Args:
+        job: ScrapeJob 實例
+        keyword_delta (Counter, optional): {(詞, 詞性, 類別): 增減}
+        entity_delta (Counter, optional): {(實體, 類型, 類別): 增減}
+
+    Returns:
+        tuple: (更新的關鍵詞統計數, 更新的命名實體統計數)
+    """
+    with transaction.atomic():
+        keyword_count = _apply_delta(KeywordAnalysis, job, keyword_delta or {}, 'word', 'pos')
+        entity_count = _apply_delta(NamedEntityAnalysis, job, entity_delta or {}, 'entity', 'entity_type')
+    return keyword_count, entity_count
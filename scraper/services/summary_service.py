@@ -1,6 +1,5 @@
 import logging
 import time
-import threading
 from concurrent.futures import ThreadPoolExecutor
 from django.db import transaction
 from django.conf import settings
@@ -9,6 +8,7 @@ from django.db import models
 
 from ..models import ScrapeJob, Article, ArticleSummary
 from .ai_service import OllamaClient
+from .queue_service import enqueue, job_owner_id, resource_capacity
 
 logger = logging.getLogger(__name__)
 
@@ -113,7 +113,7 @@ class SummaryAnalysisService:
             job = ScrapeJob.objects.get(id=job_id)
 
             # 檢查是否已經完成摘要分析
-            total_articles = Article.objects.filter(job=job).count()
+            total_articles = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
             analyzed_articles = ArticleSummary.objects.filter(job=job, status='completed').count()
 
             if total_articles == analyzed_articles and total_articles > 0:
@@ -130,9 +130,10 @@ class SummaryAnalysisService:
             all_processed = False
 
             while check_attempts < max_check_attempts and not all_processed:
-                # 獲取尚未分析摘要的文章
+                # 獲取尚未分析摘要的文章（近似重複的文章不重複呼叫 LLM）
                 articles = Article.objects.filter(
-                    job=job
+                    job=job,
+                    duplicate_of__isnull=True
                 ).exclude(
                     summary__status='completed'
                 ).order_by('id')
@@ -201,7 +202,7 @@ class SummaryAnalysisService:
                 # 如果本次沒有失敗的文章，或者已經達到最大嘗試次數
                 if not current_batch_failed or check_attempts >= max_check_attempts:
                     # 檢查是否所有文章都已處理完成
-                    unprocessed = Article.objects.filter(job=job).exclude(
+                    unprocessed = Article.objects.filter(job=job, duplicate_of__isnull=True).exclude(
                         summary__status='completed'
                     ).count()
                     if unprocessed == 0:
@@ -211,7 +212,7 @@ class SummaryAnalysisService:
                         self.logger.warning(f"任務 {job_id} 還有 {unprocessed} 篇文章摘要未能成功分析")
 
             # 最終確認是否所有文章都已分析
-            total_articles = Article.objects.filter(job=job).count()
+            total_articles = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
             analyzed_articles = ArticleSummary.objects.filter(job=job, status='completed').count()
 
             self.logger.info(f"任務 {job_id} 的摘要分析完成，{analyzed_articles}/{total_articles} 篇文章已分析")
@@ -235,7 +236,7 @@ class SummaryAnalysisService:
             job = ScrapeJob.objects.get(id=job_id)
 
             # 獲取統計數據
-            total_articles = Article.objects.filter(job=job).count()
+            total_articles = Article.objects.filter(job=job, duplicate_of__isnull=True).count()
             analyzed_summaries = ArticleSummary.objects.filter(job=job, status='completed').count()
             failed_summaries = ArticleSummary.objects.filter(job=job, status='failed').count()
             pending_summaries = total_articles - analyzed_summaries - failed_summaries
@@ -281,7 +282,8 @@ class SummaryAnalysisService:
 
             # 尋找未分析摘要的文章
             unanalyzed = Article.objects.filter(
-                job=job
+                job=job,
+                duplicate_of__isnull=True
             ).exclude(
                 summary__status='completed'
             ).order_by('-date')[:limit]
@@ -347,14 +349,19 @@ def analyze_job_summaries(job_id, batch_size=10, max_workers=2, max_check_attemp
 
     Returns:
         bool: 是否成功完成分析
+
+    Raises:
+        RuntimeError: 分析失敗，由背景任務佇列記錄並依設定重試
     """
     service = SummaryAnalysisService()
-    return service.analyze_job_articles(job_id, batch_size, max_workers, max_check_attempts)
+    if not service.analyze_job_articles(job_id, batch_size, max_workers, max_check_attempts):
+        raise RuntimeError(f"任務 {job_id} 的摘要分析失敗")
+    return True
 
 
 def analyze_job_summaries_async(job_id, batch_size=10, max_workers=2):
     """
-    非同步執行摘要分析任務
+    將摘要分析任務加入背景任務佇列，由 run_task_worker 工作程序執行
 
     Args:
         job_id: ScrapeJob的ID
@@ -362,13 +369,14 @@ def analyze_job_summaries_async(job_id, batch_size=10, max_workers=2):
         max_workers: 最大工作執行緒數
 
     Returns:
-        threading.Thread: 啟動的線程實例
+        BackgroundTask: 背景任務，同一任務的摘要分析已在佇列中時返回既有的任務
     """
-    thread = threading.Thread(
-        target=analyze_job_summaries,
-        args=(job_id, batch_size, max_workers)
-    )
-    thread.daemon = True
-    thread.start()
-    logger.info(f"啟動摘要分析任務 {job_id} 的執行線程")
-    return thread
\ No newline at end of file
+    # 每個線程同時進行一個 LLM 請求，線程數不超過 LLM 容量
+    llm_capacity = resource_capacity('llm')
+    if llm_capacity is not None:
+        max_workers = max(1, min(max_workers, llm_capacity))
+    task = enqueue('summaries', {'job_id': job_id, 'batch_size': batch_size, 'max_workers': max_workers},
+                   dedupe_key=f"summaries:{job_id}", user_id=job_owner_id(job_id),
+                   resources={'llm': max_workers})
+    logger.info(f"摘要分析任務 {job_id} 已加入背景任務佇列")
+    return task
\ No newline at end of file
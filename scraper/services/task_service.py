@@ -1,52 +1,108 @@
 import logging
-import threading
 from ..models import ScrapeJob
+from .queue_service import enqueue, is_task_active
 
 logger = logging.getLogger(__name__)
 
 
-def execute_scraper_task(job_id):
+def _scrape_dedupe_key(job_id):
+    return f"scrape:{job_id}"
+
+
+def is_scraper_task_active(job_id):
+    """
+    檢查爬蟲任務是否已在背景任務佇列中等待或執行
+
+    Args:
+        job_id: ScrapeJob 的 ID
+
+    Returns:
+        bool: 是否等待或執行中
+    """
+    return is_task_active(_scrape_dedupe_key(job_id))
+
+
+def scrape_resources(job):
+    """
+    爬蟲任務領取時所需的資源：列表頁瀏覽器池、文章瀏覽器池的上限與主瀏覽器
+
+    單一程序的爬蟲只在 NLP 階段才以 hold_resources 取得 CKIP 模型名額；
+    分片任務的 NLP 在各分片程序中執行，無法在執行中取得資源，因此在領取時就佔用一個模型名額
+
+    Args:
+        job: ScrapeJob 實例
+
+    Returns:
+        dict: 所需資源
     """
-    使用執行緒執行爬蟲任務的服務函數
+    from .scraper_service import browser_budget
+    budget = browser_budget(job)
+    if job.shard_count > 1:
+        # 協調端收集列表頁後才啟動分片，各分片程序只使用文章瀏覽器池
+        return {'browser': budget['maximum'] * job.shard_count, 'model': 1}
+    return {'browser': budget['listing'] + budget['maximum'] + budget['driver']}
+
+
+def execute_scraper_task(job_id, resume=False):
+    """
+    將爬蟲任務加入背景任務佇列，由 run_task_worker 工作程序執行
 
     Args:
         job_id: ScrapeJob 的 ID
+        resume: 是否從檢查點接續先前中斷的執行
 
     Returns:
-        thread: 啟動的線程實例
+        BackgroundTask: 背景任務，同一爬蟲任務已在佇列中時返回既有的任務
     """
-    thread = threading.Thread(target=_scraper_thread, args=(job_id,))
-    thread.daemon = True  # 設置為守護線程，主程序結束時會自動退出
-    thread.start()
-    logger.info(f"啟動爬蟲任務 {job_id} 的執行線程")
-    return thread
+    job = ScrapeJob.objects.get(id=job_id)
+    task = enqueue('scrape', {'job_id': job_id, 'resume': resume}, dedupe_key=_scrape_dedupe_key(job_id),
+                   user_id=job.user_id, resources=scrape_resources(job))
+    logger.info(f"爬蟲任務 {job_id} 已加入背景任務佇列{'（接續執行）' if resume else ''}")
+    return task
 
 
-def _scraper_thread(job_id):
+def execute_resume_task(job_id):
     """
-    爬蟲執行緒函數
+    將接續執行中斷的爬蟲任務加入背景任務佇列
 
     Args:
         job_id: ScrapeJob 的 ID
+
+    Returns:
+        BackgroundTask: 背景任務，任務已在佇列中時返回 None
+    """
+    if is_scraper_task_active(job_id):
+        logger.warning(f"爬蟲任務 {job_id} 仍在執行中，不重複啟動")
+        return None
+    return execute_scraper_task(job_id, resume=True)
+
+
+def run_scrape_job(job_id, resume=False):
+    """
+    背景任務佇列的爬蟲處理函數
+
+    任務狀態已是執行中表示上一次執行的工作程序中斷，狀態為失敗表示佇列正在重試失敗的執行，
+    兩者皆從檢查點接續而非重新開始。爬蟲失敗時拋出例外，由背景任務佇列記錄失敗並依設定重試
+
+    Args:
+        job_id: ScrapeJob 的 ID
+        resume: 是否從檢查點接續先前中斷的執行
+
+    Raises:
+        RuntimeError: 爬蟲未成功完成
     """
     logger.info(f"開始執行爬蟲任務 {job_id}")
-    try:
-        # 使用非交互式matplotlib後端
-        import matplotlib
-        matplotlib.use('Agg')
-
-        # 導入 run_scraper 函數
-        from ..services.scraper_service import run_scraper
-        run_scraper(job_id)
-
-        logger.info(f"爬蟲任務 {job_id} 完成")
-    except Exception as e:
-        logger.error(f"爬蟲任務 {job_id} 失敗: {e}", exc_info=True)
-
-        try:
-            # 更新任務狀態為失敗
-            job = ScrapeJob.objects.get(id=job_id)
-            job.status = 'failed'
-            job.save()
-        except:
-            pass
\ No newline at end of file
+
+    # 使用非交互式matplotlib後端
+    import matplotlib
+    matplotlib.use('Agg')
+
+    from ..services.scraper_service import run_scraper, resume_scraper
+    if resume or ScrapeJob.objects.filter(id=job_id, status__in=('running', 'failed')).exists():
+        success = resume_scraper(job_id)
+    else:
+        success = run_scraper(job_id)
+
+    if not success:
+        raise RuntimeError(f"爬蟲任務 {job_id} 執行失敗")
+    logger.info(f"爬蟲任務 {job_id} 完成")
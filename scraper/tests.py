@@ -1,3 +1,861 @@
-from django.test import TestCase
+import logging
+import os
+import random
+import shutil
+import tempfile
+import threading
+from collections import Counter, namedtuple
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import (ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, ArticleKeyword, ArticleEntity,
+                     BackgroundTask, CrawlShard)
+from .services.article_index import ArticleIndex
+from .services.queue_service import (claim_task, hold_resources, resource_holder, run_task, _admission_shortfall,
+                                     _heartbeat)
+from .services.scraper_service import import_article_terms, browser_budget, build_scraper
+from .services.task_service import scrape_resources
+from .services.search_service import SearchAnalysisService
+from .services.shard_service import partition_frontier, claim_shard
+from .services.stats_service import postings_delta, apply_stats_delta
+from .utils.article_parser import content_hash
+from .utils.concurrency import AdaptiveConcurrency
+from .utils.html_cache import HtmlCache
+from .utils.near_duplicate import SimHashIndex, simhash, hamming
+from .utils.nlp_models import get_ckip_models, ckip_model_version, clear_models
+from .utils.nlp_pool import AnalysisCounters
+from .utils.result_store import JsonlResultWriter, ARTICLE_TERMS_FILE
+from .utils import scraper_utils
+from .utils.scraper_utils import CTSimpleScraper, CTTextProcessor, TimeoutException
+from .utils.text_chunker import chunk_text, to_source_offset
+
+
+def create_job(username='tester', **kwargs):
+    """建立測試用的爬蟲任務"""
+    user, _ = User.objects.get_or_create(username=username)
+    return ScrapeJob.objects.create(user=user, categories='財經', **kwargs)
+
+
+def create_article(job, item_id, category='財經', title='標題', content='內容', **kwargs):
+    """建立測試用的文章"""
+    return Article.objects.create(
+        job=job, item_id=item_id, category=category, title=title, content=content, date=timezone.now(),
+        author='記者', link=kwargs.pop('link', f'https://www.chinatimes.com/realtimenews/20250101{item_id}'),
+        content_hash=kwargs.pop('content_hash', content_hash(content)), **kwargs)
+
+
+def create_scraper(**kwargs):
+    """建立不啟動瀏覽器的爬蟲，只設定執行時才建立的日誌記錄器"""
+    scraper = CTSimpleScraper(**kwargs)
+    scraper.logger = logging.getLogger('scraper.tests')
+    return scraper
+
+
+class TempDirMixin:
+    """每個測試使用獨立的暫存目錄"""
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+
+
+class CookieDomainTests(TestCase):
+    """HTTP 模式的 cookies 網域"""
+
+    def cookie_sent(self, site_root, url):
+        scraper = create_scraper(site_root=site_root)
+        scraper.cookies = {'session': 'abc'}
+        session = scraper.setup_http_session()
+        prepared = session.prepare_request(requests.Request('GET', url))
+        return prepared.headers.get('Cookie')
+
+    def test_default_site_keeps_chinatimes_domain(self):
+        self.assertEqual(create_scraper().cookie_domain(), '.chinatimes.com')
+        self.assertEqual(self.cookie_sent(None, 'https://www.chinatimes.com/a'), 'session=abc')
+
+    def test_replay_server_receives_cookies(self):
+        self.assertEqual(self.cookie_sent('http://127.0.0.1:8000', 'http://127.0.0.1:8000/a'), 'session=abc')
+        self.assertEqual(self.cookie_sent('http://localhost:8000', 'http://localhost:8000/a'), 'session=abc')
+        self.assertIsNone(self.cookie_sent('http://localhost:8000', 'https://www.chinatimes.com/a'))
+
+
+class SaveCookiesTests(TempDirMixin, TestCase):
+    """列表頁取得的 cookies 同步到已建立的 session 並合併寫入文件"""
+
+    def driver(self, **cookies):
+        return mock.Mock(get_cookies=mock.Mock(return_value=[
+            {'name': name, 'value': value, 'domain': '.chinatimes.com'} for name, value in cookies.items()]))
+
+    def test_cookies_saved_after_session_setup_are_sent(self):
+        scraper = create_scraper()
+        scraper.output_dir = self.temp_dir
+        session = scraper.setup_http_session()
+        scraper.save_cookies(self.driver(session='abc'))
+        prepared = session.prepare_request(requests.Request('GET', 'https://www.chinatimes.com/a'))
+        self.assertEqual(prepared.headers.get('Cookie'), 'session=abc')
+
+    def test_cookies_from_several_browsers_are_merged(self):
+        scraper = create_scraper()
+        scraper.output_dir = self.temp_dir
+        scraper.save_cookies(self.driver(a='1'))
+        scraper.save_cookies(self.driver(b='2'))
+        self.assertEqual(scraper.cookies, {'a': '1', 'b': '2'})
+
+        reloaded = create_scraper()
+        reloaded.output_dir = self.temp_dir
+        self.assertTrue(reloaded.load_recent_cookies())
+        self.assertEqual(reloaded.cookies, {'a': '1', 'b': '2'})
+
+
+E = namedtuple('E', 'word ner idx')
+
+
+def fake_ws(texts, **kwargs):
+    return [[text[i:i + 2] for i in range(0, len(text), 2)] for text in texts]
+
+
+def fake_pos(words, **kwargs):
+    return [['Na'] * len(chunk_words) for chunk_words in words]
+
+
+def fake_ner(texts, **kwargs):
+    return [[E(text.strip()[:2], 'ORG', (len(text) - len(text.lstrip()), len(text) - len(text.lstrip()) + 2))]
+            for text in texts]
+
+
+@override_settings(NLP_SETTINGS={'PROCESS_WORKERS': 0, 'RESULT_CACHE': False})
+class PipelineTests(TempDirMixin, TestCase):
+    """管線模式的 NLP 工作線程與模型名額"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('scraper.utils.scraper_utils.get_ckip_models',
+                             return_value=(fake_ws, fake_pos, fake_ner))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.events = []
+
+        def nlp_resource():
+            test = self
+
+            class Hold:
+                def __enter__(self):
+                    test.events.append('acquire')
+
+                def __exit__(self, *exc):
+                    test.events.append('release')
+
+            return Hold()
+
+        self.scraper = create_scraper(nlp_resource=nlp_resource, nlp_workers=2)
+        self.scraper.output_dir = self.temp_dir
+        self.scraper.article_links = {'財經': ['x']}
+        self.scraper.discover_links = lambda *args, **kwargs: None
+        self.scraper.save_results = lambda: None
+
+    def run_pipeline(self, success):
+        def scrape_articles(*args, **kwargs):
+            for i in range(5):
+                self.scraper.article_sink({'item_id': str(i), 'title': '標題', 'category': '財經',
+                                           'content': '台北市政府今天宣布新的交通政策'})
+            return success
+
+        self.scraper.scrape_articles = scrape_articles
+        threads = threading.active_count()
+        result = self.scraper.run_pipeline()
+        self.assertEqual(threading.active_count(), threads)
+        return result
+
+    def test_successful_run_streams_analyses(self):
+        self.assertTrue(self.run_pipeline(True))
+        self.assertEqual(self.events, ['acquire', 'release'])
+        self.assertEqual(sorted(os.listdir(self.temp_dir)),
+                         [ARTICLE_TERMS_FILE, 'category_entities_stats.json', 'category_keywords_stats.json'])
+        with open(os.path.join(self.temp_dir, ARTICLE_TERMS_FILE), encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 5)
+
+    def test_failed_scrape_still_stops_nlp_threads(self):
+        self.assertFalse(self.run_pipeline(False))
+        self.assertEqual(self.events, ['acquire', 'release'])
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+class ReuseIndexedArticleTests(TransactionTestCase):
+    """增量爬取沿用跨任務文章索引"""
+
+    url = 'https://www.chinatimes.com/realtimenews/20250101000001-260410'
+
+    def setUp(self):
+        self.old_job = create_job()
+        self.article = create_article(self.old_job, '1', title='舊文章', content='已保存的內容', link=self.url)
+        self.job = create_job()
+
+    def test_lookup_verifies_content_hash(self):
+        index = ArticleIndex(exclude_job_id=self.job.id)
+        self.assertEqual(index.lookup(self.url)['content'], '已保存的內容')
+
+        Article.objects.filter(id=self.article.id).update(content='被截斷')
+        self.assertIsNone(index.lookup(self.url))
+
+    def test_concurrent_reuse_claims_url_once(self):
+        scraper = create_scraper(article_index=ArticleIndex(exclude_job_id=self.job.id))
+        barrier = threading.Barrier(8)
+        results = []
+
+        def reuse():
+            barrier.wait()
+            results.append(scraper.reuse_indexed_article(self.url, '財經', 1))
+
+        threads = [threading.Thread(target=reuse) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len([result for result in results if result]), 1)
+        self.assertEqual(scraper.fetch_stats['index'], 1)
+
+    def test_index_miss_releases_url(self):
+        Article.objects.filter(id=self.article.id).update(content='')
+        scraper = create_scraper(article_index=ArticleIndex(exclude_job_id=self.job.id))
+        self.assertIsNone(scraper.reuse_indexed_article(self.url, '財經', 1))
+        self.assertNotIn(self.url, scraper.processed_urls)
+
+
+class HtmlCacheTests(TempDirMixin, TestCase):
+    """內容定址的 HTML 快取"""
+
+    def setUp(self):
+        super().setUp()
+        self.cache = HtmlCache(self.temp_dir)
+
+    def test_store_and_conditional_headers(self):
+        self.assertEqual(self.cache.conditional_headers('https://a'), {})
+        self.cache.store('https://a', '<html>甲</html>', {'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025'})
+        self.assertEqual(self.cache.get_html('https://a'), '<html>甲</html>')
+        self.assertEqual(self.cache.conditional_headers('https://a'),
+                         {'If-None-Match': '"v1"', 'If-Modified-Since': 'Wed, 01 Jan 2025'})
+
+    def test_identical_content_is_stored_once(self):
+        self.cache.store('https://a', '<html>相同</html>')
+        self.cache.store('https://b', '<html>相同</html>')
+        objects = [name for _, _, names in os.walk(self.cache.objects_dir) for name in names]
+        self.assertEqual(len(objects), 1)
+        self.assertEqual(sorted(entry['url'] for entry in self.cache.iter_entries()), ['https://a', 'https://b'])
+
+    def test_missing_object_is_a_miss(self):
+        entry = self.cache.store('https://a', '<html>甲</html>')
+        os.remove(self.cache._object_path(entry['digest']))
+        self.assertIsNone(self.cache.get('https://a'))
+        self.assertIsNone(self.cache.touch('https://a'))
+
+    def test_refetch_error_after_not_modified(self):
+        scraper = create_scraper(fetch_mode='http', html_cache=self.cache)
+        scraper.http_session = mock.Mock()
+        scraper.http_session.get.side_effect = [mock.Mock(status_code=304), requests.ConnectionError('reset')]
+        self.assertEqual(scraper.fetch_article_http('https://www.chinatimes.com/a'), (None, 'error'))
+        self.assertEqual(scraper.http_session.get.call_count, 2)
+
+
+class AdaptiveConcurrencyTests(TestCase):
+    """AIMD 並行數控制"""
+
+    def complete(self, controller, count, latency=1.0):
+        for _ in range(count):
+            controller.acquire()
+            controller.release(latency)
+
+    def test_single_timeout_is_an_ordinary_failure(self):
+        controller = AdaptiveConcurrency(initial=8, window=10, cooldown=0)
+        controller.signal('timeout')
+        self.assertEqual(controller.limit, 8)
+        self.complete(controller, 10)
+        self.assertEqual(controller.limit, 8)
+
+    def test_high_timeout_rate_halves_limit(self):
+        controller = AdaptiveConcurrency(initial=8, window=10, cooldown=0)
+        for _ in range(3):
+            controller.signal('timeout')
+        self.complete(controller, 10)
+        self.assertEqual(controller.limit, 4)
+
+    def test_throttling_halves_immediately_with_cooldown(self):
+        controller = AdaptiveConcurrency(initial=8, cooldown=60)
+        controller.signal('throttled')
+        controller.signal('throttled')
+        self.assertEqual(controller.limit, 4)
+
+    def test_saturated_healthy_window_increases_limit(self):
+        controller = AdaptiveConcurrency(initial=1, maximum=3, window=5)
+        self.complete(controller, 5)
+        self.assertEqual(controller.limit, 2)
+
+    def test_latency_regression_decreases_limit(self):
+        controller = AdaptiveConcurrency(initial=4, window=5, cooldown=0)
+        self.complete(controller, 5, latency=1.0)
+        self.complete(controller, 5, latency=5.0)
+        self.assertEqual(controller.limit, 2)
+
+    def test_in_flight_never_exceeds_limit(self):
+        controller = AdaptiveConcurrency(initial=3, maximum=3)
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            controller.acquire()
+            with lock:
+                peak.append(controller.in_flight)
+            controller.release(0.01)
+
+        threads = [threading.Thread(target=work) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(max(peak), 3)
+        self.assertEqual(controller.in_flight, 0)
+
+
+class FetchSignalTests(TestCase):
+    """抓取異常回報給自適應並行數控制器的訊號"""
+
+    def selenium_signal(self, page_source):
+        scraper = create_scraper()
+        scraper.concurrency = mock.Mock()
+        driver = mock.Mock(page_source=page_source)
+        driver.get.side_effect = TimeoutException()
+        with mock.patch.object(scraper, 'create_article_driver', return_value=driver):
+            self.assertIsNone(scraper.scrape_article_selenium('https://www.chinatimes.com/a', '財經', 1))
+        return scraper.concurrency.signal.call_args.args[0]
+
+    def test_selenium_timeout_on_cloudflare_page_is_throttled(self):
+        self.assertEqual(self.selenium_signal('<title>Just a moment...</title>'), 'throttled')
+        self.assertEqual(self.selenium_signal('<h1 class="article-title">標題</h1>'), 'timeout')
+
+    def test_http_403_is_throttled(self):
+        scraper = create_scraper()
+        scraper.concurrency = mock.Mock()
+        scraper.http_session = mock.Mock()
+        scraper.http_session.get.return_value = mock.Mock(status_code=403, text='<h1 class="article-title">標題</h1>')
+        self.assertEqual(scraper.fetch_article_http('https://www.chinatimes.com/a'), (None, 'error'))
+        scraper.concurrency.signal.assert_called_once_with('throttled')
+
+
+class SimHashIndexTests(TestCase):
+    """SimHash 近似重複索引"""
+
+    def test_near_duplicate_content(self):
+        text = '行政院今日召開記者會，說明明年度的總預算編列方向與重大建設計畫。' * 3
+        index = SimHashIndex(threshold=3)
+        self.assertIsNone(index.check_and_add('a', simhash(text)))
+        self.assertIsNone(index.check_and_add('b', simhash('颱風今晚接近台灣東部海面，氣象署發布海上警報。' * 3)))
+        match = index.check_and_add('c', simhash(text + '。'))
+        self.assertEqual(match[0], 'a')
+        self.assertNotIn('c', index)
+
+    def test_bands_never_miss_within_threshold(self):
+        rng = random.Random(0)
+        index = SimHashIndex(threshold=3)
+        fingerprints = [rng.getrandbits(64) for _ in range(200)]
+        for key, fingerprint in enumerate(fingerprints):
+            index.add(key, fingerprint)
+        for key, fingerprint in enumerate(fingerprints):
+            flipped = fingerprint
+            for bit in rng.sample(range(64), 3):
+                flipped ^= 1 << bit
+            match = index.query(flipped)
+            self.assertIsNotNone(match)
+            self.assertLessEqual(match[1], 3)
+            self.assertEqual(hamming(flipped, fingerprints[match[0]]), match[1])
+
+    def test_concurrent_check_and_add_keeps_one_original(self):
+        index = SimHashIndex(threshold=3)
+        barrier = threading.Barrier(8)
+        matches = []
+
+        def check(key):
+            barrier.wait()
+            matches.append(index.check_and_add(key, 0x1234))
+
+        threads = [threading.Thread(target=check, args=(key,)) for key in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(matches.count(None), 1)
+        self.assertEqual(len(index), 1)
+
+
+class ShardTests(TestCase):
+    """分片分配與領取"""
+
+    tasks = [(f'https://www.chinatimes.com/a/{i}', ['財經', '政治', '社會'][i % 3], i) for i in range(30)]
+
+    def test_hash_partition_is_complete_and_stable(self):
+        shards = partition_frontier(self.tasks, 4)
+        self.assertEqual(sorted(task for shard in shards for task in shard), sorted(self.tasks))
+        # 分配只與網址有關，與任務順序無關
+        reordered = partition_frontier(list(reversed(self.tasks)), 4)
+        self.assertEqual([set(shard) for shard in shards], [set(shard) for shard in reordered])
+
+    def test_category_partition_keeps_categories_together(self):
+        shards = partition_frontier(self.tasks, 2, strategy='category')
+        self.assertEqual(sum(len(shard) for shard in shards), len(self.tasks))
+        owners = Counter(category for shard in shards for category in {task[1] for task in shard})
+        self.assertEqual(set(owners.values()), {1})
+
+    def test_empty_shards_are_dropped(self):
+        self.assertEqual(len(partition_frontier(self.tasks[:1], 4)), 1)
+
+    def test_claim_shard_once_and_reclaim_stale(self):
+        job = create_job()
+        for index in range(2):
+            CrawlShard.objects.create(job=job, shard_index=index)
+
+        first = claim_shard(worker='w1')
+        second = claim_shard(worker='w2')
+        self.assertEqual((first.shard_index, second.shard_index), (0, 1))
+        self.assertIsNone(claim_shard(worker='w3'))
+
+        CrawlShard.objects.filter(id=first.id).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        reclaimed = claim_shard(worker='w3')
+        self.assertEqual(reclaimed.id, first.id)
+        self.assertEqual((reclaimed.worker, reclaimed.attempts), ('w3', 2))
+
+    def test_claim_shard_filters_by_job(self):
+        job, other = create_job(), create_job()
+        CrawlShard.objects.create(job=other, shard_index=0)
+        self.assertIsNone(claim_shard(job_id=job.id, worker='w1'))
+        self.assertEqual(claim_shard(job_id=other.id, worker='w1').job_id, other.id)
+
+
+class BrowserBudgetTests(TestCase):
+    """爬蟲瀏覽器數與排程器預留的瀏覽器容量 (使用預設設定)"""
+
+    def test_reservation_covers_listing_and_article_pools(self):
+        job = create_job(use_threading=True, max_workers=4)
+        self.assertEqual(browser_budget(job), {'listing': 1, 'driver': 0, 'initial': 4, 'maximum': 7})
+        # 未指定類別時爬取全部類別，列表頁瀏覽器池最多佔容量的四分之一
+        job.categories = ''
+        self.assertEqual(browser_budget(job), {'listing': 2, 'driver': 0, 'initial': 4, 'maximum': 6})
+        self.assertEqual(scrape_resources(job), {'browser': 8})
+
+    def test_single_thread_reserves_main_driver(self):
+        job = create_job()
+        self.assertEqual(browser_budget(job)['driver'], 1)
+        self.assertEqual(scrape_resources(job), {'browser': 2})
+
+    def test_shards_split_capacity_without_listing(self):
+        job = create_job(use_threading=True, max_workers=8, shard_count=2)
+        self.assertEqual(browser_budget(job)['maximum'], 4)
+        self.assertEqual(browser_budget(job)['initial'], 4)
+        self.assertEqual(scrape_resources(job), {'browser': 8, 'model': 1})
+
+    def test_adaptive_controller_can_grow(self):
+        job = create_job(use_threading=True, max_workers=4)
+        with mock.patch('scraper.services.scraper_service.HtmlCache'):
+            scraper = build_scraper(job, scraper_module=scraper_utils)
+        scraper.logger = logging.getLogger('scraper.tests')
+
+        controllers = []
+
+        def track(**kwargs):
+            controllers.append(AdaptiveConcurrency(**kwargs))
+            return controllers[-1]
+
+        with mock.patch.object(scraper_utils, 'AdaptiveConcurrency', side_effect=track):
+            scraper.scrape_articles(use_threading=True, max_workers=browser_budget(job)['initial'])
+        controller = controllers[0]
+        self.assertEqual(controller.limit, 4)
+        self.assertGreater(controller.maximum, controller.limit)
+
+        # 並行數用滿且延遲與錯誤率正常時，由初始值逐步增加
+        while controller.limit == 4:
+            for _ in range(controller.limit):
+                controller.acquire()
+            for _ in range(controller.limit):
+                controller.release(1.0)
+        self.assertEqual(controller.limit, 5)
+
+
+@override_settings(TASK_QUEUE_SETTINGS={'RESOURCE_CAPACITY': {'browser': 2, 'model': 1}, 'POLL_INTERVAL': 0.01})
+class ClaimTaskTests(TestCase):
+    """背景任務的資源容量與領取"""
+
+    def create_task(self, resources, status='pending', priority=0, **kwargs):
+        if status == 'running':
+            kwargs.setdefault('started_at', timezone.now())
+            kwargs.setdefault('lease_expires_at', timezone.now() + timedelta(minutes=5))
+        return BackgroundTask.objects.create(task_type='sentiment', resources=resources, status=status,
+                                             priority=priority, **kwargs)
+
+    def test_blocked_task_reserves_only_short_resources(self):
+        self.create_task({'browser': 1}, status='running')
+        self.create_task({'browser': 2, 'model': 1}, priority=10)
+        browser_task = self.create_task({'browser': 1})
+        model_task = self.create_task({'model': 1})
+
+        claimed = claim_task(worker='w1')
+        self.assertEqual(claimed.id, model_task.id)
+        self.assertIsNone(claim_task(worker='w1'))
+        self.assertEqual(BackgroundTask.objects.get(id=browser_task.id).status, 'pending')
+
+    def test_failed_admission_moves_to_next_candidate(self):
+        first = self.create_task({'model': 1}, priority=10)
+        second = self.create_task({'model': 1}, priority=5)
+        browser_task = self.create_task({'browser': 1})
+
+        with mock.patch('scraper.services.queue_service._admission_shortfall',
+                        side_effect=[{'model'}, set()]):
+            claimed = claim_task(worker='w1')
+
+        self.assertEqual(claimed.id, browser_task.id)
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts, first.worker), ('pending', 0, ''))
+        self.assertEqual(BackgroundTask.objects.get(id=second.id).status, 'pending')
+
+    def test_admission_counts_only_earlier_tasks(self):
+        task = self.create_task({'model': 1})
+        claimed = claim_task(worker='w1')
+        self.assertEqual(claimed.id, task.id)
+        later = self.create_task({'model': 1}, status='running', started_at=timezone.now() + timedelta(seconds=1))
+        self.assertEqual(_admission_shortfall(claimed), set())
+        self.assertEqual(_admission_shortfall(later), {'model'})
+
+    def test_hold_resources_accounts_model_slot(self):
+        running = self.create_task({'browser': 1}, status='running', worker='w1')
+        waiting = self.create_task({'model': 1})
+
+        with hold_resources((running.id, 'w1'), {'model': 1}):
+            self.assertEqual(BackgroundTask.objects.get(id=running.id).resources, {'browser': 1, 'model': 1})
+            self.assertIsNone(claim_task(worker='w2'))
+
+        self.assertEqual(BackgroundTask.objects.get(id=running.id).resources, {'browser': 1})
+        self.assertEqual(claim_task(worker='w2').id, waiting.id)
+
+    def test_hold_resources_waits_for_capacity(self):
+        holder = self.create_task({'model': 1}, status='running', worker='w1')
+        running = self.create_task({'browser': 1}, status='running', worker='w2')
+
+        def finish_holder(seconds):
+            # 等待期間名額未被佔用，另一個任務結束後才取得
+            self.assertEqual(BackgroundTask.objects.get(id=running.id).resources, {'browser': 1})
+            BackgroundTask.objects.filter(id=holder.id).update(status='completed')
+
+        with mock.patch('scraper.services.queue_service.time.sleep', side_effect=finish_holder) as sleep:
+            with hold_resources((running.id, 'w2'), {'model': 1}):
+                self.assertEqual(BackgroundTask.objects.get(id=running.id).resources, {'browser': 1, 'model': 1})
+        self.assertEqual(sleep.call_count, 1)
+        self.assertEqual(BackgroundTask.objects.get(id=running.id).resources, {'browser': 1})
+
+    def test_resource_holder_outside_task_is_unlimited(self):
+        with resource_holder({'model': 1})():
+            pass
+        self.assertFalse(BackgroundTask.objects.exists())
+
+    def test_priority_then_fewer_running_tasks_first(self):
+        busy, idle = User.objects.create(username='busy'), User.objects.create(username='idle')
+        self.create_task({}, status='running', user=busy)
+        low = self.create_task({}, user=idle)
+        busy_task = self.create_task({}, priority=5, user=busy)
+        idle_task = self.create_task({}, priority=5, user=idle)
+
+        # 相同優先順序中執行中任務較少的用戶優先，即使其任務較晚加入
+        self.assertEqual(claim_task(worker='w1').id, idle_task.id)
+        self.assertEqual(claim_task(worker='w1').id, busy_task.id)
+        self.assertEqual(claim_task(worker='w1').id, low.id)
+
+    def test_expired_lease_is_reclaimed(self):
+        expired = self.create_task({}, status='running', worker='dead', attempts=1,
+                                   lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.create_task({}, status='running', worker='alive', attempts=1)
+
+        claimed = claim_task(worker='w2')
+        self.assertEqual(claimed.id, expired.id)
+        self.assertEqual((claimed.worker, claimed.attempts), ('w2', 2))
+        self.assertGreater(claimed.lease_expires_at, timezone.now())
+        self.assertIsNone(claim_task(worker='w3'))
+
+    def test_expired_lease_past_max_attempts_fails(self):
+        task = self.create_task({}, status='running', worker='dead', attempts=3, max_attempts=3,
+                                lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(claim_task(worker='w2'))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.lease_expires_at), ('failed', None))
+
+
+@override_settings(TASK_QUEUE_SETTINGS={'LEASE_SECONDS': 60, 'HEARTBEAT_INTERVAL': 1, 'RETRY_BACKOFF': 10})
+@mock.patch('scraper.services.queue_service.connection')
+class RunTaskTests(TestCase):
+    """背景任務的執行、重試與租約延長"""
+
+    def setUp(self):
+        BackgroundTask.objects.create(task_type='sentiment', payload={'job_id': 1}, max_attempts=2)
+
+    def run_claimed(self, handler):
+        """領取並執行任務，處理函數以 handler 取代"""
+        task = claim_task(worker='w1')
+        with mock.patch('scraper.services.queue_service.import_string', return_value=handler), \
+                mock.patch('scraper.services.queue_service._heartbeat'), \
+                self.assertLogs('scraper.services.queue_service'):
+            result = run_task(task)
+        task.refresh_from_db()
+        return result, task
+
+    def test_success_completes_task(self, connection):
+        handler = mock.Mock()
+        result, task = self.run_claimed(handler)
+        self.assertTrue(result)
+        handler.assert_called_once_with(job_id=1)
+        self.assertEqual((task.status, task.lease_expires_at), ('completed', None))
+
+    def test_failure_retries_with_backoff_then_fails(self, connection):
+        result, task = self.run_claimed(mock.Mock(side_effect=RuntimeError('boom')))
+        self.assertFalse(result)
+        self.assertEqual((task.status, task.attempts, task.last_error), ('pending', 1, 'boom'))
+        delay = (task.run_after - timezone.now()).total_seconds()
+        self.assertTrue(8 < delay <= 10, delay)
+        # 退避時間未到前不會被領取
+        self.assertIsNone(claim_task(worker='w1'))
+
+        BackgroundTask.objects.filter(id=task.id).update(run_after=timezone.now())
+        result, task = self.run_claimed(mock.Mock(side_effect=RuntimeError('again')))
+        self.assertFalse(result)
+        self.assertEqual((task.status, task.attempts, task.last_error), ('failed', 2, 'again'))
+        self.assertIsNotNone(task.finished_at)
+
+    def test_heartbeat_extends_lease_until_stopped(self, connection):
+        task = BackgroundTask.objects.create(task_type='sentiment', status='running', worker='w1',
+                                             lease_expires_at=timezone.now() + timedelta(seconds=5))
+        stop_event = mock.Mock(wait=mock.Mock(side_effect=[False, True]))
+        _heartbeat(task.id, 'w1', stop_event)
+        task.refresh_from_db()
+        self.assertGreater(task.lease_expires_at, timezone.now() + timedelta(seconds=55))
+        stop_event.wait.assert_called_with(1)
+
+        # 租約已被其他工作程序接手時不再延長
+        BackgroundTask.objects.filter(id=task.id).update(worker='w2', lease_expires_at=timezone.now())
+        _heartbeat(task.id, 'w1', mock.Mock(wait=mock.Mock(side_effect=[False, True])))
+        task.refresh_from_db()
+        self.assertLess(task.lease_expires_at, timezone.now())
+
+
+@override_settings(NLP_SETTINGS={'PROCESS_WORKERS': 0, 'RESULT_CACHE': False})
+class TextChunkTests(TestCase):
+    """句段切分與實體位置"""
+
+    text = '　台北市政府今天宣布，明年起調整公車票價。高雄市也將跟進！' + '這是一段沒有標點的很長的句子' * 10
+
+    def test_chunks_cover_text_within_max_length(self):
+        chunks = list(chunk_text(self.text, 16))
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk.text), 16)
+            self.assertEqual(self.text[chunk.start:chunk.end], chunk.text)
+        self.assertEqual(''.join(chunk.text for chunk in chunks).strip(), self.text.strip())
+
+    def test_short_sentences_are_merged(self):
+        chunks = list(chunk_text('一。二。三。', 10))
+        self.assertEqual([chunk.text for chunk in chunks], ['一。二。三。'])
+
+    def test_to_source_offset(self):
+        chunk = list(chunk_text(self.text, 16))[1]
+        start, end = to_source_offset(chunk, (1, 3))
+        self.assertEqual(self.text[start:end], chunk.text[1:3])
+
+    def test_article_and_batch_paths_emit_same_entities(self):
+        with mock.patch('scraper.utils.scraper_utils.get_ckip_models', return_value=(fake_ws, fake_pos, fake_ner)):
+            processor = CTTextProcessor(tempfile.gettempdir(), max_length=8, result_cache=False)
+        article = {'item_id': '1', 'title': '標題', 'category': '財經', 'content': '  ' + self.text}
+        batch = processor.analyze_article_batch([article])[0]
+        single = processor.analyze_article(article)
+        self.assertEqual(single, batch)
+        for entity in single['named_entities']:
+            start, end = entity['offset']
+            self.assertEqual(article['content'][start:end], entity['entity'])
+
+
+class SearchPostingsTests(TempDirMixin, TestCase):
+    """以文章關鍵詞與命名實體記錄搜尋"""
+
+    def setUp(self):
+        super().setUp()
+        self.job = create_job()
+        self.original = create_article(self.job, '1', title='市政新聞', content='柯文哲今天出席活動')
+        self.duplicate = create_article(self.job, '2', title='市政新聞轉載', content='柯文哲今天出席活動。',
+                                        duplicate_of=self.original)
+        self.titled = create_article(self.job, '3', title='柯文哲專訪', content='專訪內容')
+        NamedEntityAnalysis.objects.create(job=self.job, entity='柯文哲', entity_type='PERSON', frequency=1,
+                                           category='財經')
+        with JsonlResultWriter(os.path.join(self.temp_dir, ARTICLE_TERMS_FILE)) as writer:
+            writer.write({'item_id': '1', 'keywords': [['活動', 'Na', 1]], 'entities': [['柯文哲', 'PERSON', 1]]})
+            writer.write({'item_id': '3', 'keywords': [['專訪', 'Na', 1]], 'entities': []})
+        import_article_terms(self.job, self.temp_dir)
+
+    def search(self, **criteria):
+        criteria.setdefault('search_terms', ['柯文哲'])
+        criteria.setdefault('search_type', 'entity')
+        query = SearchAnalysisService(self.job).build_search_query(criteria)
+        return set(query.values_list('id', flat=True))
+
+    def test_near_duplicates_receive_postings(self):
+        self.assertEqual(
+            list(ArticleEntity.objects.filter(article=self.duplicate).values_list('entity', 'count')),
+            [('柯文哲', 1)])
+        self.assertIn(self.duplicate.id, self.search())
+
+    def test_title_and_content_flags(self):
+        everything = {self.original.id, self.duplicate.id, self.titled.id}
+        self.assertEqual(self.search(), everything)
+        self.assertEqual(self.search(include_title=False), {self.original.id, self.duplicate.id})
+        self.assertEqual(self.search(include_content=False), {self.titled.id})
+
+    def test_postings_are_checked_once_per_job(self):
+        service = SearchAnalysisService(self.job)
+        with self.assertNumQueries(1):
+            service._has_postings(ArticleEntity)
+            service._has_postings(ArticleEntity)
+
+    def test_reimport_does_not_duplicate_postings(self):
+        import_article_terms(self.job, self.temp_dir)
+        self.assertEqual(ArticleEntity.objects.filter(job=self.job).count(), 2)
+        self.assertEqual(ArticleKeyword.objects.filter(job=self.job).count(), 3)
+
+
+class AnalysisCountersTests(TestCase):
+    """可合併的文章分析統計"""
+
+    analyses = [
+        {'title': f'文章{i}', 'category': ['財經', '政治'][i % 2], 'has_content': i != 3,
+         'words_with_pos': [('台北', 'Nc'), ('政府', 'Na')][:i % 3],
+         'named_entities': [{'entity': '台北', 'entity_type': 'GPE', 'offset': [0, 2]}] * (i % 2)}
+        for i in range(6)
+    ]
+
+    def counters(self, analyses):
+        counters = AnalysisCounters()
+        for analysis in analyses:
+            counters.add(analysis)
+        return counters
+
+    def test_merge_in_order_matches_single_pass(self):
+        merged = self.counters(self.analyses[:2]).merge(self.counters(self.analyses[2:5]))
+        merged.merge(self.counters(self.analyses[5:]))
+        self.assertEqual(merged.result(), self.counters(self.analyses).result())
+        self.assertEqual(merged.total_articles, 6)
+
+    def test_result_keeps_only_counts(self):
+        result = self.counters(self.analyses).result()
+        self.assertNotIn('named_entities', result)
+        self.assertNotIn('articles_analysis', result)
+        self.assertEqual(result['category_entities_stats']['政治'][0]['frequency'], 3)
+
+    def test_merge_empty(self):
+        self.assertEqual(AnalysisCounters().merge(AnalysisCounters()).result(), {'error': '沒有文章可分析'})
+        self.assertEqual(AnalysisCounters().merge(self.counters(self.analyses)).result(),
+                         self.counters(self.analyses).result())
+
+
+class NlpBackendFallbackTests(TestCase):
+    """推論後端無法使用而退回 torch"""
+
+    def setUp(self):
+        self.addCleanup(clear_models)
+        for name in ('CkipWordSegmenter', 'CkipPosTagger', 'CkipNerChunker'):
+            patcher = mock.patch(f'ckip_transformers.nlp.{name}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_model_version_uses_applied_backend(self):
+        with mock.patch('scraper.utils.nlp_models.apply_backend', return_value='torch'):
+            get_ckip_models(model='albert-tiny', device=-1, backend='onnx')
+        self.assertTrue(ckip_model_version(model='albert-tiny', backend='onnx', device=-1).endswith(
+            ':albert-tiny:torch'))
+
+    def test_compare_fails_when_backend_falls_back(self):
+        with mock.patch('scraper.utils.nlp_models.apply_backend', side_effect=lambda driver, backend, **kwargs: (
+                'torch' if backend == 'onnx' else backend)):
+            with self.assertRaisesRegex(CommandError, '無法使用 onnx 後端'):
+                call_command('compare_nlp_backends', backend='onnx', stdout=mock.Mock())
+
+
+class StatsDeltaTests(TempDirMixin, TestCase):
+    """類別關鍵詞與命名實體統計的增量更新"""
+
+    def setUp(self):
+        super().setUp()
+        self.job = create_job()
+        self.articles = [create_article(self.job, str(i), category=['財經', '政治'][i % 2]) for i in range(3)]
+
+    def write_terms(self, records):
+        path = os.path.join(self.temp_dir, ARTICLE_TERMS_FILE)
+        if os.path.exists(path):
+            os.remove(path)
+        with JsonlResultWriter(path) as writer:
+            for record in records:
+                writer.write(record)
+
+    def keyword_stats(self):
+        return {(word, pos, category): frequency for word, pos, category, frequency in
+                KeywordAnalysis.objects.filter(job=self.job).values_list('word', 'pos', 'category', 'frequency')}
+
+    def expected_stats(self):
+        """由文章關鍵詞記錄重新計算的類別統計"""
+        expected = Counter()
+        for category, word, pos, count in ArticleKeyword.objects.filter(job=self.job).values_list(
+                'article__category', 'word', 'pos', 'count'):
+            expected[(word, pos, category)] += count
+        return dict(expected)
+
+    def test_postings_delta_only_keeps_changes(self):
+        ArticleKeyword.objects.create(job=self.job, article=self.articles[0], word='台北', pos='Nc', count=2)
+        ArticleKeyword.objects.create(job=self.job, article=self.articles[0], word='政府', pos='Na', count=1)
+        keyword_delta, entity_delta = postings_delta(
+            [self.articles[0].id], {self.articles[0].id: '財經'},
+            [(self.articles[0].id, {'keywords': [['台北', 'Nc', 2], ['市長', 'Na', 1]], 'entities': []})])
+        self.assertEqual(+keyword_delta, Counter({('市長', 'Na', '財經'): 1}))
+        self.assertEqual(-keyword_delta, Counter({('政府', 'Na', '財經'): 1}))
+        self.assertEqual(keyword_delta[('台北', 'Nc', '財經')], 0)
+        self.assertFalse(entity_delta)
+
+    def test_apply_stats_delta_adds_and_removes(self):
+        apply_stats_delta(self.job, Counter({('台北', 'Nc', '財經'): 3, ('政府', 'Na', '財經'): 1}))
+        apply_stats_delta(self.job, Counter({('台北', 'Nc', '財經'): -1, ('政府', 'Na', '財經'): -1}),
+                          Counter({('台北', 'GPE', '財經'): 2}))
+        self.assertEqual(self.keyword_stats(), {('台北', 'Nc', '財經'): 2})
+        self.assertEqual(list(NamedEntityAnalysis.objects.filter(job=self.job).values_list(
+            'entity', 'frequency')), [('台北', 2)])
+
+    def test_incremental_import_matches_full_recount(self):
+        self.write_terms([
+            {'item_id': '0', 'keywords': [['台北', 'Nc', 2]], 'entities': [['台北', 'GPE', 1]]},
+            {'item_id': '1', 'keywords': [['台北', 'Nc', 1], ['政府', 'Na', 1]], 'entities': []},
+        ])
+        import_article_terms(self.job, self.temp_dir, update_stats=True)
+        self.assertEqual(self.keyword_stats(), self.expected_stats())
+
+        # 重新分析第一篇並新增第三篇，重複匯入也不會重複計算
+        self.write_terms([
+            {'item_id': '0', 'keywords': [['市長', 'Na', 1]], 'entities': []},
+            {'item_id': '2', 'keywords': [['台北', 'Nc', 4]], 'entities': []},
+        ])
+        import_article_terms(self.job, self.temp_dir, update_stats=True)
+        import_article_terms(self.job, self.temp_dir, update_stats=True)
+        self.assertEqual(self.keyword_stats(), self.expected_stats())
+        self.assertEqual(self.keyword_stats()[('台北', 'Nc', '財經')], 4)
+        self.assertFalse(NamedEntityAnalysis.objects.filter(job=self.job).exists())
+
+    def test_copied_duplicate_postings_do_not_change_stats(self):
+        Article.objects.filter(id=self.articles[2].id).update(duplicate_of=self.articles[0])
+        self.write_terms([{'item_id': '0', 'keywords': [['台北', 'Nc', 2]], 'entities': []}])
+        import_article_terms(self.job, self.temp_dir, update_stats=True)
+        self.assertEqual(ArticleKeyword.objects.filter(article=self.articles[2]).count(), 1)
+        self.assertEqual(self.keyword_stats(), {('台北', 'Nc', '財經'): 2})
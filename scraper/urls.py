@@ -10,6 +10,7 @@ urlpatterns = [
     path('jobs/', views.job_list, name='job_list'),
     path('jobs/create/', views.job_create, name='job_create'),
     path('jobs/delete/<int:job_id>/', views.job_delete, name='job_delete'),
+    path('jobs/<int:job_id>/resume/', views.job_resume, name='job_resume'),
     path('articles/<int:article_id>/', views.article_detail, name='article_detail'),
 
     path('jobs/<int:job_id>/', views.job_detail, name='job_detail'),
@@ -66,4 +67,7 @@ urlpatterns = [
     path('api/articles/<int:article_id>/summary/', api.ArticleSummaryAPIView.as_view(), name='api_article_summary'),
     path('api/articles/<int:article_id>/generate-summary/', api.generate_article_summary_api,
          name='api_generate_article_summary'),
+
+    # 背景任務佇列狀態API
+    path('api/task-queue/', api.TaskQueueStatsView.as_view(), name='api_task_queue_stats'),
 ]
\ No newline at end of file
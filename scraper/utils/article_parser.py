@@ -0,0 +1,97 @@
+import hashlib
+import re
+
+from bs4 import BeautifulSoup
+
+# Cloudflare 挑戰頁面常見特徵
+CLOUDFLARE_MARKERS = (
+    'Cloudflare',
+    'Just a moment...',
+    'cf-browser-verification',
+    'challenge-platform',
+)
+
+
+def is_cloudflare_challenge(html, status_code=None):
+    """判斷回應是否為 Cloudflare 挑戰頁面
+
+    Args:
+        html (str): 頁面 HTML
+        status_code (int, optional): HTTP 狀態碼
+
+    Returns:
+        bool: 是否為挑戰頁面
+    """
+    if not html:
+        return status_code in (403, 503)
+
+    head = html[:5000]
+    if any(marker in head for marker in CLOUDFLARE_MARKERS):
+        return True
+
+    # 403/503 且沒有文章標題，多半也是被攔截
+    return status_code in (403, 503) and 'article-title' not in html
+
+
+def content_hash(content):
+    """計算文章內文的雜湊值，忽略空白差異
+
+    Args:
+        content (str): 文章內文
+
+    Returns:
+        str: SHA-256 十六進位字串
+    """
+    normalized = re.sub(r'\s+', ' ', content or '').strip()
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def filter_photo_links(photo_links):
+    """過濾掉 GIF 和廣告圖片"""
+    return [link for link in photo_links if
+            link and not ('gif' in link.lower() or 'ad' in link.lower())]
+
+
+def parse_article_html(html):
+    """從文章頁面 HTML 解析出文章欄位
+
+    使用與 Selenium 爬取相同的 CSS 選擇器，可用於伺服器端渲染的頁面
+
+    Args:
+        html (str): 文章頁面 HTML
+
+    Returns:
+        dict: 包含 title、date、author、content、photo_links 的字典，
+              找不到標題或內文時返回 None 表示解析失敗
+    """
+    if not html:
+        return None
+
+    soup = BeautifulSoup(html, 'html.parser')
+
+    title_elem = soup.select_one('h1.article-title')
+    if not title_elem or not title_elem.get_text(strip=True):
+        return None
+    title = title_elem.get_text(strip=True)
+
+    content_elems = soup.select('div.article-body p')
+    paragraphs = [p.get_text(strip=True) for p in content_elems]
+    if not any(paragraphs):
+        return None
+    content = "\n".join(paragraphs)
+
+    date_elem = soup.select_one('div.meta-info time')
+    date = date_elem.get('datetime') if date_elem and date_elem.get('datetime') else "未找到日期"
+
+    author_elems = soup.select('div.author a')
+    author = [a.get_text(strip=True) for a in author_elems] if author_elems else ["未找到作者"]
+
+    photo_links = [img.get('src') for img in soup.select('div.article-body img') if img.get('src')]
+
+    return {
+        "title": title,
+        "date": date,
+        "author": author,
+        "content": content,
+        "photo_links": filter_photo_links(photo_links)
+    }
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+
+from scraper.utils.article_parser import is_cloudflare_challenge, parse_article_html
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class TokenBucket:
+    """非同步令牌桶限速器
+
+    以固定速率補充令牌，桶容量決定可容許的瞬間突發請求數
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        Args:
+            rate (float): 每秒補充的令牌數，<= 0 表示不限速
+            capacity (float, optional): 桶容量，預設與 rate 相同
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """取得一個令牌，令牌不足時等待補充"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncArticleFetcher:
+    """基於 asyncio 的文章抓取引擎
+
+    以協程而非線程維持大量同時進行中的請求，每個主機有獨立的並行上限與令牌桶限速，
+    解析完成的文章會在抵達時立即以串流方式輸出
+    """
+
+    def __init__(self, headers=None, cookies=None, max_concurrency=200, per_host_limit=64,
+                 rate_per_host=20.0, burst=None, timeout=10, html_cache=None, logger=None):
+        """
+        Args:
+            headers (dict, optional): 請求標頭
+            cookies (dict, optional): 請求 cookies
+            max_concurrency (int): 同時進行中的請求總數上限
+            per_host_limit (int): 每個主機同時進行中的請求上限
+            rate_per_host (float): 每個主機每秒最多發出的請求數
+            burst (float, optional): 每個主機令牌桶容量
+            timeout (float): 單一請求超時秒數
+            html_cache (HtmlCache, optional): 原始 HTML 快取，啟用時發送條件式請求
+            logger (logging.Logger, optional): 日誌記錄器
+        """
+        if aiohttp is None:
+            raise ImportError("使用 asyncio 抓取引擎需要安裝 aiohttp")
+
+        self.headers = headers or {}
+        self.cookies = cookies or {}
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_limit = max(1, int(per_host_limit))
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.timeout = timeout
+        self.html_cache = html_cache
+        self.logger = logger or logging.getLogger("scraper.async_fetcher")
+
+        self.latencies = []  # 每個請求的耗時(秒)，用於效能評估
+        self._host_semaphores = {}
+        self._host_buckets = {}
+        self._lock = threading.Lock()
+        self._loop = None  # 執行中的事件迴圈與 session，供其他線程更新 cookies
+        self._session = None
+
+    def update_cookies(self, cookies):
+        """加入新的請求 cookies，可由其他線程呼叫
+
+        執行中時交由事件迴圈更新 session 的 cookie jar，之後的請求即會帶上
+        """
+        with self._lock:
+            self.cookies = {**self.cookies, **cookies}
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._session.cookie_jar.update_cookies, cookies)
+
+    def _host_limits(self, url):
+        """取得主機對應的信號量與令牌桶，首次遇到時建立"""
+        host = urlparse(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+            self._host_buckets[host] = TokenBucket(self.rate_per_host, self.burst)
+        return self._host_semaphores[host], self._host_buckets[host]
+
+    async def fetch(self, session, url):
+        """抓取並解析單篇文章
+
+        Returns:
+            tuple: (解析結果字典或 None, 失敗原因)，成功時原因為 None
+        """
+        semaphore, bucket = self._host_limits(url)
+        cache = self.html_cache
+        request_headers = cache.conditional_headers(url) if cache else {}
+        async with semaphore:
+            await bucket.acquire()
+            started = time.monotonic()
+            try:
+                async with session.get(url, headers=request_headers) as response:
+                    html = await response.text(errors="replace")
+                    status = response.status
+                    response_headers = response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.logger.warning(f"非同步抓取文章 {url} 失敗: {e!r}")
+                return None, "error"
+            finally:
+                self.latencies.append(time.monotonic() - started)
+
+        if cache and status == 304:
+            # 內容未變更，改用快取的 HTML；快取遺失時交給 Selenium 備援
+            html = cache.get_html(url)
+            if html is None:
+                return None, "error"
+            cache.touch(url)
+            status = 200
+        elif cache and status == 200 and not is_cloudflare_challenge(html, status):
+            cache.store(url, html, response_headers)
+
+        if is_cloudflare_challenge(html, status):
+            self.logger.warning(f"非同步抓取文章 {url} 遇到 Cloudflare 挑戰頁面")
+            return None, "cloudflare"
+        if status != 200:
+            self.logger.warning(f"非同步抓取文章 {url} 返回狀態碼 {status}")
+            return None, "error"
+
+        # BeautifulSoup 解析為 CPU 工作，量小時直接在事件迴圈中執行即可
+        fields = parse_article_html(html)
+        if fields is None:
+            return None, "parse"
+        return fields, None
+
+    async def stream(self, tasks):
+        """並行抓取任務並依完成順序輸出結果
+
+        Args:
+            tasks (iterable): 任務序列，每個任務為 (url, category, serial_no)，可為阻塞的佇列迭代器
+
+        Yields:
+            tuple: (任務, 解析結果字典或 None, 失敗原因)
+        """
+        loop = asyncio.get_running_loop()
+        pending = asyncio.Queue(maxsize=self.max_concurrency)
+        results = asyncio.Queue()
+        done = object()
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_limit)
+
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout, connector=connector) as session:
+            # 與 update_cookies 互斥，登記 session 前後加入的 cookies 都不會遺漏
+            with self._lock:
+                session.cookie_jar.update_cookies(self.cookies)
+                self._loop, self._session = loop, session
+
+            async def feeder():
+                task_iter = iter(tasks)
+                # 任務來源可能是邊收集邊產生的阻塞佇列，於執行緒中取任務以免阻塞事件迴圈
+                blocking = not isinstance(tasks, (list, tuple))
+                while True:
+                    if blocking:
+                        task = await loop.run_in_executor(None, next, task_iter, done)
+                    else:
+                        task = next(task_iter, done)
+                    await pending.put(task)
+                    if task is done:
+                        break
+
+            async def worker():
+                # 協程數即為同時進行中的請求上限
+                while True:
+                    task = await pending.get()
+                    if task is done:
+                        # 把結束標記放回，讓其他協程也能結束
+                        await pending.put(done)
+                        break
+                    try:
+                        fields, reason = await self.fetch(session, task[0])
+                    except Exception as e:
+                        self.logger.error(f"非同步抓取文章 {task[0]} 時發生異常: {e}", exc_info=True)
+                        fields, reason = None, "error"
+                    await results.put((task, fields, reason))
+                await results.put(done)
+
+            feeder_task = asyncio.create_task(feeder())
+            workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+            try:
+                remaining = len(workers)
+                while remaining:
+                    item = await results.get()
+                    if item is done:
+                        remaining -= 1
+                        continue
+                    yield item
+            finally:
+                with self._lock:
+                    self._loop, self._session = None, None
+                for w in workers + [feeder_task]:
+                    w.cancel()
+                await asyncio.gather(*workers, feeder_task, return_exceptions=True)
+
+    def run(self, tasks, callback):
+        """在新的事件迴圈中執行抓取，每個結果抵達時呼叫 callback(任務, 解析結果, 失敗原因)"""
+
+        async def consume():
+            async for task, fields, reason in self.stream(tasks):
+                callback(task, fields, reason)
+
+        asyncio.run(consume())
@@ -0,0 +1,193 @@
+import logging
+import threading
+import time
+from queue import LifoQueue, Empty
+
+
+class BrowserPool:
+    """有界的 WebDriver 池
+
+    每個工作線程從池中借出一個已暖機的瀏覽器，用完後歸還，
+    避免每篇文章都重新啟動 Chrome。瀏覽器在服務指定頁數後或健康檢查失敗時會被回收重建。
+    """
+
+    def __init__(self, driver_factory, size=1, max_pages_per_driver=50, logger=None):
+        """初始化瀏覽器池
+
+        Args:
+            driver_factory (callable): 建立新 WebDriver 的函數
+            size (int): 池中最多同時存在的瀏覽器數量
+            max_pages_per_driver (int): 每個瀏覽器最多服務的頁數，超過即回收
+            logger (logging.Logger, optional): 日誌記錄器
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, int(size))
+        self.max_pages_per_driver = max_pages_per_driver
+        self.logger = logger or logging.getLogger("scraper.browser_pool")
+
+        self._idle = LifoQueue()  # 後進先出，優先使用最近歸還(最熱)的瀏覽器
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        # undetected-chromedriver 會修補驅動程式檔案，並行建立容易衝突，因此序列化建立流程
+        self._create_lock = threading.Lock()
+        self._page_counts = {}  # id(driver) -> 已服務頁數
+        self._closed = False
+
+        self.metrics = {
+            "created": 0,
+            "reused": 0,
+            "recycled": 0,
+            "discarded_unhealthy": 0,
+            "create_failures": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "checkouts": 0,
+            "pages_served": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+        }
+
+    def _is_healthy(self, driver):
+        """檢查瀏覽器是否仍可正常回應"""
+        with self._lock:
+            self.metrics["health_checks"] += 1
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception as e:
+            self.logger.warning(f"瀏覽器健康檢查失敗: {e}")
+            with self._lock:
+                self.metrics["health_check_failures"] += 1
+            return False
+
+    def _create_driver(self):
+        """建立新的瀏覽器並登記"""
+        with self._create_lock:
+            try:
+                driver = self.driver_factory()
+            except Exception:
+                with self._lock:
+                    self.metrics["create_failures"] += 1
+                raise
+        with self._lock:
+            self._page_counts[id(driver)] = 0
+            self.metrics["created"] += 1
+        return driver
+
+    def _discard(self, driver):
+        """關閉並移除瀏覽器"""
+        with self._lock:
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def checkout(self, timeout=None):
+        """借出一個瀏覽器，池已滿時等待其他線程歸還
+
+        Args:
+            timeout (float, optional): 最長等待秒數，None 表示無限等待
+
+        Returns:
+            WebDriver: 可用的瀏覽器
+        """
+        if self._closed:
+            raise RuntimeError("瀏覽器池已關閉")
+
+        start = time.monotonic()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"等待瀏覽器超過 {timeout} 秒")
+        waited = time.monotonic() - start
+
+        try:
+            driver = None
+            while driver is None:
+                try:
+                    candidate = self._idle.get_nowait()
+                except Empty:
+                    driver = self._create_driver()
+                    break
+
+                if self._is_healthy(candidate):
+                    driver = candidate
+                    with self._lock:
+                        self.metrics["reused"] += 1
+                else:
+                    with self._lock:
+                        self.metrics["discarded_unhealthy"] += 1
+                    self._discard(candidate)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.metrics["checkouts"] += 1
+            self.metrics["in_use"] += 1
+            self.metrics["peak_in_use"] = max(self.metrics["peak_in_use"], self.metrics["in_use"])
+            self.metrics["total_wait_seconds"] += waited
+            self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], waited)
+        return driver
+
+    def checkin(self, driver, failed=False):
+        """歸還瀏覽器
+
+        Args:
+            driver: 借出的瀏覽器
+            failed (bool): 本次使用是否發生錯誤，若是則先做健康檢查再決定是否放回池中
+        """
+        try:
+            with self._lock:
+                self.metrics["in_use"] -= 1
+                self.metrics["pages_served"] += 1
+                pages = self._page_counts.get(id(driver), 0) + 1
+                self._page_counts[id(driver)] = pages
+
+            if self._closed:
+                self._discard(driver)
+            elif failed and not self._is_healthy(driver):
+                with self._lock:
+                    self.metrics["discarded_unhealthy"] += 1
+                self._discard(driver)
+            elif self.max_pages_per_driver and pages >= self.max_pages_per_driver:
+                with self._lock:
+                    self.metrics["recycled"] += 1
+                self.logger.info(f"瀏覽器已服務 {pages} 頁，回收重建")
+                self._discard(driver)
+            else:
+                self._idle.put(driver)
+        finally:
+            self._slots.release()
+
+    def get_metrics(self):
+        """取得池的使用統計"""
+        with self._lock:
+            metrics = dict(self.metrics)
+        metrics["size"] = self.size
+        metrics["idle"] = self._idle.qsize()
+        metrics["avg_wait_seconds"] = (
+            metrics["total_wait_seconds"] / metrics["checkouts"] if metrics["checkouts"] else 0.0)
+        # 每個瀏覽器平均服務頁數，越高代表啟動成本攤提得越好
+        metrics["pages_per_driver"] = (
+            metrics["pages_served"] / metrics["created"] if metrics["created"] else 0.0)
+        return metrics
+
+    def log_metrics(self):
+        """將池的使用統計寫入日誌"""
+        m = self.get_metrics()
+        self.logger.info(
+            f"瀏覽器池統計: 容量 {m['size']}, 建立 {m['created']}, 重用 {m['reused']}, "
+            f"回收 {m['recycled']}, 不健康移除 {m['discarded_unhealthy']}, 服務頁數 {m['pages_served']}, "
+            f"每瀏覽器平均 {m['pages_per_driver']:.1f} 頁, 尖峰使用 {m['peak_in_use']}, "
+            f"平均等待 {m['avg_wait_seconds']:.2f} 秒")
+
+    def close(self):
+        """關閉池中所有閒置的瀏覽器，之後歸還的瀏覽器會直接關閉"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(driver)
@@ -0,0 +1,57 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class ScrapeCheckpoint:
+    """爬蟲任務的磁碟檢查點
+
+    保存 URL 待爬清單、已處理的 URL 與標題集合、已完成的文章 ID，
+    程序重啟後可由此接續未完成的任務，不需重新抓取已完成的文章
+    """
+
+    FILENAME = 'checkpoint.json'
+
+    def __init__(self, output_dir):
+        """
+        Args:
+            output_dir (str): 任務輸出目錄，檢查點檔案保存在此目錄下
+        """
+        self.path = os.path.join(output_dir, self.FILENAME)
+        self._lock = threading.Lock()
+
+    def exists(self):
+        """檢查點檔案是否存在"""
+        return os.path.exists(self.path)
+
+    def load(self):
+        """讀取檢查點
+
+        Returns:
+            dict: 檢查點內容，檔案不存在或損毀時返回 None
+        """
+        if not self.exists():
+            return None
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def save(self, state):
+        """寫入檢查點
+
+        先寫入暫存檔再以 os.replace 取代，寫到一半中斷時舊的檢查點仍然完整
+
+        Args:
+            state (dict): 檢查點內容
+        """
+        state = dict(state, updated_at=datetime.now().isoformat())
+        tmp_path = f"{self.path}.tmp"
+        with self._lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,152 @@
+import logging
+import statistics
+import threading
+import time
+
+
+class AdaptiveConcurrency:
+    """AIMD (加法增加、乘法減少) 並行數控制器
+
+    每完成一個觀察視窗的請求就評估一次：延遲與錯誤率正常且並行數已被用滿時加一；
+    錯誤率 (包含頁面載入逾時) 過高或延遲明顯高於基準時減半。只有 Cloudflare 挑戰頁面或
+    HTTP 429/403/503 等被限流的訊號會立即減半；單次逾時多半是個別頁面過慢，只計為一般失敗。
+    減少後有冷卻時間，避免同一波錯誤連續砍半。
+    """
+
+    # 收到即立即降低並行數的訊號
+    BACKOFF_SIGNALS = ('throttled',)
+
+    def __init__(self, initial=4, minimum=1, maximum=32, window=20, error_threshold=0.1,
+                 latency_tolerance=2.0, decrease_factor=0.5, cooldown=3.0, logger=None):
+        """
+        Args:
+            initial (int): 初始並行數
+            minimum (int): 並行數下限
+            maximum (int): 並行數上限
+            window (int): 每次評估所需的完成請求數
+            error_threshold (float): 視窗內錯誤率超過此值即降低並行數
+            latency_tolerance (float): 視窗延遲中位數超過基準延遲的倍數即降低並行數
+            decrease_factor (float): 降低並行數時的乘數
+            cooldown (float): 兩次降低之間至少間隔的秒數
+            logger (logging.Logger, optional): 日誌記錄器
+        """
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self.limit = min(self.maximum, max(self.minimum, int(initial)))
+        self.window = max(1, int(window))
+        self.error_threshold = error_threshold
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.logger = logger or logging.getLogger("scraper.concurrency")
+
+        self.in_flight = 0
+        self.peak_limit = self.limit
+        self.baseline_latency = None
+        self._cond = threading.Condition()
+        self._latencies = []
+        self._errors = 0
+        self._timeouts = 0
+        self._saturated = False
+        self._last_decrease = 0.0
+        self._started = time.monotonic()
+        self.history = [(0.0, self.limit, "初始值")]
+
+    def acquire(self):
+        """取得一個執行名額，並行數已達上限時等待"""
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._saturated = True
+                self._cond.wait()
+            self.in_flight += 1
+            if self.in_flight >= self.limit:
+                self._saturated = True
+
+    def release(self, latency):
+        """歸還名額並記錄此請求的耗時
+
+        Args:
+            latency (float): 請求耗時(秒)
+        """
+        with self._cond:
+            self.in_flight -= 1
+            self._latencies.append(latency)
+            if len(self._latencies) >= self.window:
+                self._evaluate()
+            self._cond.notify_all()
+
+    def signal(self, kind):
+        """回報請求的異常狀況
+
+        Args:
+            kind (str): throttled (Cloudflare / HTTP 429 / 403 / 503) 立即減少並行數；
+                timeout 與 error 計入視窗的錯誤率
+        """
+        with self._cond:
+            if kind in self.BACKOFF_SIGNALS:
+                if self._decrease(f"收到 {kind} 訊號"):
+                    self._reset_window()
+            else:
+                self._errors += 1
+                if kind == 'timeout':
+                    self._timeouts += 1
+
+    def _reset_window(self):
+        self._latencies = []
+        self._errors = 0
+        self._timeouts = 0
+        self._saturated = False
+
+    def _set_limit(self, limit, reason):
+        if limit == self.limit:
+            return
+        self.logger.info(f"自適應並行數調整: {self.limit} -> {limit} ({reason})")
+        self.limit = limit
+        self.peak_limit = max(self.peak_limit, limit)
+        self.history.append((round(time.monotonic() - self._started, 2), limit, reason))
+        self._cond.notify_all()
+
+    def _decrease(self, reason):
+        """乘法減少並行數，冷卻時間內不重複減少
+
+        Returns:
+            bool: 是否實際進行了減少
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self._set_limit(max(self.minimum, int(self.limit * self.decrease_factor)), reason)
+        return True
+
+    def _evaluate(self):
+        """評估一個觀察視窗並調整並行數"""
+        median = statistics.median(self._latencies)
+        error_rate = self._errors / len(self._latencies)
+
+        if error_rate > self.error_threshold:
+            self._decrease(f"錯誤率 {error_rate:.0%} (其中逾時 {self._timeouts} 次)")
+            self._reset_window()
+            return
+
+        if self.baseline_latency is not None and median > self.baseline_latency * self.latency_tolerance:
+            self._decrease(f"延遲中位數 {median:.2f} 秒，基準 {self.baseline_latency:.2f} 秒")
+            self._reset_window()
+            return
+
+        # 基準延遲取健康視窗的延遲，緩慢向上修正以適應網站正常的變化
+        if self.baseline_latency is None:
+            self.baseline_latency = median
+        else:
+            self.baseline_latency = min(median, self.baseline_latency * 0.9 + median * 0.1)
+
+        # 只有並行數確實被用滿時才增加，避免上游供給不足時無意義地調高
+        if self._saturated and self.limit < self.maximum:
+            self._set_limit(self.limit + 1, f"延遲與錯誤率正常 (中位數 {median:.2f} 秒)")
+        self._reset_window()
+
+    def log_summary(self):
+        """將並行數變化歷程寫入日誌"""
+        self.logger.info(
+            f"自適應並行數統計: 最終 {self.limit}, 尖峰 {self.peak_limit}, 調整 {len(self.history) - 1} 次, "
+            f"歷程(秒, 並行數) {[(t, limit) for t, limit, _ in self.history]}")
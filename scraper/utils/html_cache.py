@@ -0,0 +1,141 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class HtmlCache:
+    """以內容定址方式保存原始 HTML 的磁碟快取
+
+    目錄結構:
+        objects/ab/<內容 SHA-256>.html.gz   HTML 本體，相同內容只保存一份
+        urls/cd/<URL SHA-256>.json          每個 URL 對應的內容雜湊與 ETag / Last-Modified 標頭
+
+    重新爬取時可帶上條件式請求標頭，伺服器回應 304 時直接使用快取內容；
+    解析邏輯修改後也可離線重新解析所有文章，不需連網
+    """
+
+    def __init__(self, root):
+        """
+        Args:
+            root (str): 快取根目錄
+        """
+        self.root = str(root)
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.urls_dir = os.path.join(self.root, 'urls')
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.urls_dir, exist_ok=True)
+
+    @staticmethod
+    def _sha256(data):
+        return hashlib.sha256(data).hexdigest()
+
+    def _url_path(self, url):
+        key = self._sha256(url.encode('utf-8'))
+        return os.path.join(self.urls_dir, key[:2], f"{key}.json")
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html.gz")
+
+    @staticmethod
+    def _atomic_write(path, data):
+        """先寫入暫存檔再取代，避免並行讀取到寫到一半的檔案"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """取得 URL 的快取記錄
+
+        Returns:
+            dict: 包含 url、digest、etag、last_modified、fetched_at 的字典，不存在時返回 None
+        """
+        try:
+            with open(self._url_path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not os.path.exists(self._object_path(entry.get('digest', ''))):
+            return None
+        return entry
+
+    def read(self, entry):
+        """讀取快取記錄對應的 HTML"""
+        with gzip.open(self._object_path(entry['digest']), 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def get_html(self, url):
+        """取得 URL 快取的 HTML，不存在時返回 None"""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        try:
+            return self.read(entry)
+        except OSError:
+            return None
+
+    def conditional_headers(self, url):
+        """產生條件式請求標頭
+
+        Returns:
+            dict: If-None-Match / If-Modified-Since 標頭，沒有快取時為空字典
+        """
+        entry = self.get(url)
+        if entry is None:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, html, headers=None):
+        """保存 URL 的 HTML 與驗證標頭
+
+        Args:
+            url (str): 清理後的文章 URL
+            html (str): 頁面 HTML
+            headers (Mapping, optional): 回應標頭，用於保存 ETag 與 Last-Modified
+        """
+        data = html.encode('utf-8')
+        digest = self._sha256(data)
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            self._atomic_write(object_path, gzip.compress(data))
+
+        headers = headers or {}
+        entry = {
+            'url': url,
+            'digest': digest,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': datetime.now().isoformat(),
+        }
+        self._atomic_write(self._url_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        return entry
+
+    def touch(self, url):
+        """伺服器回應 304 時更新快取記錄的時間"""
+        entry = self.get(url)
+        if entry is None:
+            return None
+        entry['fetched_at'] = datetime.now().isoformat()
+        self._atomic_write(self._url_path(url), json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        return entry
+
+    def iter_entries(self):
+        """逐一產生所有快取記錄，供離線重新解析使用"""
+        for dirpath, _, filenames in os.walk(self.urls_dir):
+            for filename in sorted(filenames):
+                if not filename.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(dirpath, filename), 'r', encoding='utf-8') as f:
+                        yield json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    continue
@@ -0,0 +1,143 @@
+import hashlib
+import re
+import threading
+from collections import Counter
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _shingles(text, size=3):
+    """將去除空白後的文字切成字元 n-gram，中文沒有空白分詞，以字元為單位較穩定"""
+    normalized = _WHITESPACE_RE.sub('', text or '')
+    if len(normalized) <= size:
+        return [normalized] if normalized else []
+    return [normalized[i:i + size] for i in range(len(normalized) - size + 1)]
+
+
+def simhash(text, bits=64):
+    """計算文字的 SimHash 指紋
+
+    內容相近的文章指紋的漢明距離也會很小，可用於找出轉載或僅少量修改的文章
+
+    Args:
+        text (str): 文章內容
+        bits (int): 指紋位元數，最多 64
+
+    Returns:
+        int: SimHash 指紋，內容為空時返回 0
+    """
+    weights = [0] * bits
+    for shingle, count in Counter(_shingles(text)).items():
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for i in range(bits):
+            weights[i] += count if value >> i & 1 else -count
+
+    fingerprint = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def hamming(a, b):
+    """計算兩個指紋的漢明距離"""
+    return bin(a ^ b).count('1')
+
+
+def format_fingerprint(fingerprint):
+    """將指紋轉為固定長度的十六進位字串，用於保存"""
+    return f"{fingerprint:016x}"
+
+
+def parse_fingerprint(value):
+    """將十六進位字串轉回指紋，格式錯誤時返回 None"""
+    try:
+        return int(value, 16)
+    except (TypeError, ValueError):
+        return None
+
+
+class SimHashIndex:
+    """以分段 LSH 索引 SimHash 指紋，快速找出近似重複的文章
+
+    指紋切成 bands 段，只有至少一段完全相同的指紋才會比對漢明距離。
+    依鴿籠原理，bands 大於 threshold 時，距離不超過 threshold 的指紋必定有一段相同，不會漏報。
+    """
+
+    def __init__(self, bits=64, bands=4, threshold=3):
+        """
+        Args:
+            bits (int): 指紋位元數
+            bands (int): 分段數，需大於 threshold
+            threshold (int): 視為近似重複的最大漢明距離
+        """
+        if bands <= threshold:
+            bands = threshold + 1
+        self.bits = bits
+        self.bands = bands
+        self.threshold = threshold
+        self.band_width = -(-bits // bands)
+        self._mask = (1 << self.band_width) - 1
+        self._buckets = [{} for _ in range(bands)]
+        self._fingerprints = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._fingerprints)
+
+    def __contains__(self, key):
+        return key in self._fingerprints
+
+    def _band_keys(self, fingerprint):
+        return [(fingerprint >> (i * self.band_width)) & self._mask for i in range(self.bands)]
+
+    def _query(self, fingerprint):
+        best = None
+        seen = set()
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            for key in self._buckets[band].get(band_key, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                distance = hamming(fingerprint, self._fingerprints[key])
+                if distance <= self.threshold and (best is None or distance < best[1]):
+                    best = (key, distance)
+        return best
+
+    def _add(self, key, fingerprint):
+        if key in self._fingerprints:
+            return
+        self._fingerprints[key] = fingerprint
+        for band, band_key in enumerate(self._band_keys(fingerprint)):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def add(self, key, fingerprint):
+        """加入指紋
+
+        Args:
+            key: 文章識別碼
+            fingerprint (int): SimHash 指紋
+        """
+        with self._lock:
+            self._add(key, fingerprint)
+
+    def query(self, fingerprint):
+        """查詢最相近的已索引文章
+
+        Returns:
+            tuple: (文章識別碼, 漢明距離)，沒有近似重複時返回 None
+        """
+        with self._lock:
+            return self._query(fingerprint)
+
+    def check_and_add(self, key, fingerprint):
+        """查詢近似重複，沒有時將指紋加入索引；查詢與加入在同一把鎖內，並行時不會互相漏判
+
+        Returns:
+            tuple: (文章識別碼, 漢明距離)，沒有近似重複時返回 None
+        """
+        with self._lock:
+            match = self._query(fingerprint)
+            if match is None:
+                self._add(key, fingerprint)
+            return match
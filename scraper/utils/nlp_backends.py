@@ -0,0 +1,168 @@
+import os
+import inspect
+import logging
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+# torch: PyTorch fp32 (原始模型)；quantized: PyTorch 動態 int8 量化；onnx: 匯出為 ONNX 並以 ONNX Runtime 執行
+BACKENDS = ('torch', 'quantized', 'onnx')
+
+_export_lock = threading.Lock()
+
+
+def quantize_model(model):
+    """
+    以 PyTorch 動態量化將模型的線性層轉為 int8，只適用於 CPU 推論
+
+    Args:
+        model: transformers 模型
+
+    Returns:
+        量化後的模型
+    """
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxTokenClassifier:
+    """以 ONNX Runtime 執行的 token 分類模型，呼叫方式與 transformers 模型相同
+
+    CKIP 的驅動程式以 model(input_ids=..., attention_mask=..., return_dict=False) 呼叫模型，
+    並取返回值的第一個元素作為 logits
+    """
+
+    def __init__(self, path, num_threads=None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.path = path
+        self.session = onnxruntime.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+
+    def __call__(self, input_ids, attention_mask, return_dict=False, **kwargs):
+        import torch
+
+        (logits,) = self.session.run(['logits'], {
+            'input_ids': input_ids.cpu().numpy().astype('int64'),
+            'attention_mask': attention_mask.cpu().numpy().astype('int64'),
+        })
+        return (torch.from_numpy(logits),)
+
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+
+def export_onnx(model, path):
+    """
+    將 token 分類模型匯出為 ONNX，批次大小與序列長度皆為動態
+
+    Args:
+        model: transformers 模型
+        path: 輸出路徑
+    """
+    import torch
+
+    class _LogitsOnly(torch.nn.Module):
+        def __init__(self, wrapped):
+            super().__init__()
+            self.wrapped = wrapped
+
+        def forward(self, input_ids, attention_mask):
+            return self.wrapped(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+    # torch 2.5 起 export 預設可能改用 dynamo 匯出器，需明確使用 TorchScript 匯出器；舊版沒有此參數
+    export_kwargs = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs['dynamo'] = False
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    dummy_ids = torch.ones((2, 16), dtype=torch.long)
+    dummy_mask = torch.ones((2, 16), dtype=torch.long)
+    tmp_path = f"{path}.tmp"
+    try:
+        torch.onnx.export(
+            _LogitsOnly(model).eval(), (dummy_ids, dummy_mask), tmp_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch', 1: 'sequence'},
+            },
+            opset_version=14,
+            **export_kwargs
+        )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def onnx_model(model, cache_dir=None, num_threads=None):
+    """
+    取得模型的 ONNX Runtime 版本，第一次使用時匯出並保存在 cache_dir，之後直接載入
+
+    Args:
+        model: transformers 模型
+        cache_dir: ONNX 模型目錄
+        num_threads: ONNX Runtime 每次推論使用的線程數
+
+    Returns:
+        OnnxTokenClassifier: 可取代原模型的 ONNX 模型
+    """
+    # 匯出需要 onnx，執行需要 onnxruntime，缺少時在匯出前就以 ImportError 返回
+    import onnx  # noqa: F401
+    import onnxruntime  # noqa: F401
+
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'ckip_onnx')
+    name = str(getattr(model.config, '_name_or_path', '') or model.__class__.__name__).replace('/', '__')
+    path = os.path.join(cache_dir, f"{name}.onnx")
+
+    with _export_lock:
+        if not os.path.exists(path):
+            logger.info(f"匯出 ONNX 模型: {path}")
+            export_onnx(model, path)
+    return OnnxTokenClassifier(path, num_threads=num_threads)
+
+
+def apply_backend(driver, backend, cache_dir=None, num_threads=None):
+    """
+    將 CKIP 驅動程式的模型換成指定的推論後端
+
+    後端無法使用 (如未安裝 onnxruntime) 時記錄警告並保留原本的 PyTorch 模型
+
+    Args:
+        driver: CKIP 驅動程式 (CkipWordSegmenter、CkipPosTagger 或 CkipNerChunker)
+        backend: BACKENDS 中的後端名稱
+        cache_dir: ONNX 模型目錄
+        num_threads: ONNX Runtime 每次推論使用的線程數
+
+    Returns:
+        str: 實際使用的後端
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"未知的 NLP 推論後端: {backend}")
+    if backend == 'torch':
+        return backend
+    if driver.device.type != 'cpu':
+        logger.warning(f"{backend} 後端只適用於 CPU，使用原本的 PyTorch 模型")
+        return 'torch'
+
+    try:
+        if backend == 'quantized':
+            driver.model = quantize_model(driver.model)
+        else:
+            driver.model = onnx_model(driver.model, cache_dir=cache_dir, num_threads=num_threads)
+        return backend
+    except ImportError as e:
+        logger.warning(f"無法使用 {backend} 後端，使用原本的 PyTorch 模型: {e}")
+    except Exception as e:
+        logger.warning(f"套用 {backend} 後端失敗，使用原本的 PyTorch 模型: {e!r}", exc_info=True)
+    return 'torch'
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_caches = {}
+
+
+def normalize_text(text):
+    """快取鍵使用的正規化文本：去除前後空白，內容相同但前後空白不同的文章共用快取"""
+    return (text or "").strip()
+
+
+def cache_key(text, model_version):
+    """以模型版本與正規化文本的 SHA-256 作為快取鍵"""
+    digest = hashlib.sha256()
+    digest.update(model_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(normalize_text(text).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class NlpResultCache:
+    """CKIP 斷詞、詞性與命名實體結果的持久化快取
+
+    每篇文章的結果以 zlib 壓縮的 JSON 存在 SQLite 中，鍵為模型版本與正規化文本的雜湊，
+    相同內容的文章在其他任務或重新分析時不需再呼叫模型。保存的是過濾前的模型輸出，
+    停用詞與詞性篩選條件修改後快取仍然有效；模型、推論後端或句段長度改變時模型版本不同，不會讀到舊結果。
+    每個線程使用各自的資料庫連線，多個程序可共用同一個快取檔案
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): SQLite 資料庫路徑
+        """
+        self.path = str(path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS nlp_results ("
+            "key TEXT PRIMARY KEY, data BLOB NOT NULL, created_at REAL NOT NULL)")
+
+    def _connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get_many(self, keys):
+        """
+        讀取多篇文章的快取結果
+
+        Args:
+            keys (list): 快取鍵
+
+        Returns:
+            dict: {快取鍵: 結果}，只包含命中的鍵
+        """
+        results = {}
+        keys = list(dict.fromkeys(keys))
+        # SQLite 單一查詢的參數數量有限，分批查詢
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            try:
+                rows = self._connection().execute(
+                    f"SELECT key, data FROM nlp_results WHERE key IN ({placeholders})", batch).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"讀取 NLP 快取失敗: {e}")
+                return results
+            for key, data in rows:
+                try:
+                    results[key] = json.loads(zlib.decompress(data).decode('utf-8'))
+                except (zlib.error, ValueError) as e:
+                    logger.warning(f"NLP 快取項目 {key} 已損壞: {e}")
+        return results
+
+    def put_many(self, items):
+        """
+        寫入多篇文章的結果
+
+        Args:
+            items (dict): {快取鍵: 結果}
+        """
+        if not items:
+            return
+        now = time.time()
+        rows = [(key, zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')),
+                 now) for key, value in items.items()]
+        try:
+            connection = self._connection()
+            connection.execute("BEGIN")
+            connection.executemany("INSERT OR REPLACE INTO nlp_results (key, data, created_at) VALUES (?, ?, ?)",
+                                   rows)
+            connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"寫入 NLP 快取失敗: {e}")
+            try:
+                self._connection().execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+
+    def stats(self):
+        """快取的項目數與資料大小(bytes)"""
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM nlp_results").fetchone()
+        return {'entries': count, 'bytes': size}
+
+    def clear(self):
+        """清除所有快取項目"""
+        self._connection().execute("DELETE FROM nlp_results")
+
+
+def get_result_cache(path=None):
+    """
+    取得程序內共用的 NLP 結果快取
+
+    Args:
+        path: 快取資料庫路徑，預設使用 NLP_SETTINGS['RESULT_CACHE_PATH']
+
+    Returns:
+        NlpResultCache: 快取，NLP_SETTINGS['RESULT_CACHE'] 為 False 或無法開啟時返回 None
+    """
+    from scraper.utils.nlp_models import nlp_setting
+
+    if path is None:
+        if not nlp_setting('RESULT_CACHE', True):
+            return None
+        path = nlp_setting('RESULT_CACHE_PATH')
+        if not path:
+            return None
+
+    path = str(path)
+    with _lock:
+        if path not in _caches:
+            try:
+                _caches[path] = NlpResultCache(path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"無法開啟 NLP 快取 {path}: {e}")
+                _caches[path] = None
+        return _caches[path]
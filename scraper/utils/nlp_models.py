@@ -0,0 +1,148 @@
+import logging
+import threading
+from collections import namedtuple
+
+from scraper.utils.nlp_backends import apply_backend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CKIP_MODEL = "albert-tiny"
+
+# 斷詞、詞性標註與命名實體辨識三個模型
+CkipModels = namedtuple('CkipModels', ['ws', 'pos', 'ner'])
+
+_lock = threading.Lock()
+_registry = {}
+_backends = {}  # 已載入模型實際使用的推論後端，指定的後端無法使用時為 torch
+
+
+class _SerializedDriver:
+    """以共用的鎖包裝 CKIP 模型的呼叫
+
+    Hugging Face 的 fast tokenizer 不能由多個線程同時使用 (會引發 "Already borrowed")，
+    同一組模型的推論因此逐一進行；PyTorch 本身會以多個線程執行單次推論
+    """
+
+    def __init__(self, driver, lock):
+        self.driver = driver
+        self.lock = lock
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            return self.driver(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+def _nlp_settings():
+    """讀取 NLP_SETTINGS，在 Django 以外 (如獨立執行爬蟲) 使用時返回空設定"""
+    try:
+        from django.conf import settings
+        return getattr(settings, 'NLP_SETTINGS', {})
+    except Exception:
+        return {}
+
+
+def nlp_setting(name, default=None):
+    """讀取 NLP_SETTINGS 中的單一設定"""
+    return _nlp_settings().get(name, default)
+
+
+def _model_key(model=None, device=None, backend=None):
+    """以 NLP_SETTINGS 補上未指定的參數，返回 (模型名稱, 裝置, 後端)"""
+    nlp_settings = _nlp_settings()
+    model = model or nlp_settings.get('CKIP_MODEL', DEFAULT_CKIP_MODEL)
+    device = nlp_settings.get('CKIP_DEVICE', -1) if device is None else device
+    backend = backend or nlp_settings.get('BACKEND', 'torch')
+    return model, device, backend
+
+
+def get_ckip_models(model=None, device=None, backend=None):
+    """
+    取得程序內共用的 CKIP 模型，第一次呼叫時才從磁碟載入
+
+    同一程序內的爬蟲管線、網頁與 API 視圖共用同一組模型，不需每次建立文本處理器都重新載入；
+    以鎖確保多個線程同時呼叫時模型只載入一次，模型的呼叫也以鎖保護，可安全地在多個線程間共用
+
+    Args:
+        model: 模型名稱，預設使用 NLP_SETTINGS['CKIP_MODEL']
+        device: 執行裝置，-1 為 CPU，0 以上為 GPU 編號，預設使用 NLP_SETTINGS['CKIP_DEVICE']
+        backend: 推論後端 torch、quantized 或 onnx，預設使用 NLP_SETTINGS['BACKEND']
+
+    Returns:
+        CkipModels: (ws, pos, ner)，未安裝 ckip_transformers 時返回 None
+    """
+    key = _model_key(model, device, backend)
+
+    if key in _registry:
+        return _registry[key]
+
+    with _lock:
+        if key not in _registry:
+            _registry[key] = _load_ckip_models(*key)
+        return _registry[key]
+
+
+def loaded_backend(model=None, device=None, backend=None):
+    """
+    已載入的模型實際使用的推論後端
+
+    指定的後端無法使用時 apply_backend 會保留原本的 PyTorch 模型，此時返回 torch
+
+    Returns:
+        str: 後端名稱，模型尚未載入或未安裝 ckip_transformers 時返回 None
+    """
+    return _backends.get(_model_key(model, device, backend))
+
+
+def ckip_model_version(model=None, backend=None, device=None):
+    """
+    模型版本識別字串，模型或推論後端不同時結果可能不同，作為 NLP 結果快取鍵的一部分
+
+    模型已載入時使用實際套用的後端，後端退回 torch 時不會與該後端的結果共用快取
+
+    Returns:
+        str: 如 "ckip-0.3.4:albert-tiny:torch"
+    """
+    model, device, backend = _model_key(model, device, backend)
+    backend = loaded_backend(model, device, backend) or backend
+    try:
+        from ckip_transformers import __version__ as ckip_version
+    except ImportError:
+        ckip_version = 'none'
+    return f"ckip-{ckip_version}:{model}:{backend}"
+
+
+def _load_ckip_models(model, device, backend='torch'):
+    try:
+        from ckip_transformers.nlp import CkipWordSegmenter, CkipPosTagger, CkipNerChunker
+    except ImportError:
+        logger.warning("未安裝中研院斷詞套件，使用簡易分詞模式")
+        return None
+
+    logger.info(f"載入中研院 CKIP Transformers 模型 {model} (device={device}, backend={backend})")
+    nlp_settings = _nlp_settings()
+    drivers = [CkipWordSegmenter(model=model, device=device),
+               CkipPosTagger(model=model, device=device),
+               CkipNerChunker(model=model, device=device)]
+    applied = {apply_backend(driver, backend, cache_dir=nlp_settings.get('ONNX_DIR'),
+                             num_threads=nlp_settings.get('ONNX_THREADS'))
+               for driver in drivers}
+    # 部分模型退回 torch 時結果與兩種後端都可能不同，以實際組合記錄
+    _backends[(model, device, backend)] = '+'.join(sorted(applied))
+
+    inference_lock = threading.Lock()
+    return CkipModels(*(_SerializedDriver(driver, inference_lock) for driver in drivers))
+
+
+def loaded_models():
+    """已載入的模型 (模型名稱, 裝置, 後端) 列表"""
+    return [key for key, models in _registry.items() if models is not None]
+
+
+def clear_models():
+    """釋放已載入的模型，下次呼叫 get_ckip_models 時重新載入"""
+    with _lock:
+        _registry.clear()
+        _backends.clear()
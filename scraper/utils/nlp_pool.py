@@ -0,0 +1,272 @@
+import os
+import logging
+import threading
+import multiprocessing
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_pools = {}
+
+# 工作程序內依設定快取的文本處理器
+_worker_processors = {}
+
+
+class AnalysisCounters:
+    """可合併的文章分析統計
+
+    每個工作程序只統計自己分析的文章，主程序以 merge 加總後再由 result 產生最終結果；
+    依提交順序合併時，結果與在單一程序內逐篇統計完全相同。
+    只保留計數，不保存逐篇的命名實體與關鍵詞，記憶體用量與文章數無關；
+    逐篇結果另由 article_terms.jsonl 輸出
+    """
+
+    def __init__(self):
+        self.total_articles = 0
+        self.total_words = 0
+        self.word_freq = Counter()
+        self.category_word_pos = defaultdict(Counter)
+        self.category_entity_freq = defaultdict(Counter)
+
+    def add(self, analysis):
+        """
+        加入單篇文章的分析結果
+
+        Args:
+            analysis (dict): analyze_article 格式的單篇分析結果
+        """
+        self.total_articles += 1
+        category = analysis["category"]
+        words_with_pos = analysis["words_with_pos"]
+
+        self.total_words += len(words_with_pos)
+        for word, pos in words_with_pos:
+            self.word_freq[word] += 1
+            self.category_word_pos[category][(word, pos)] += 1
+
+        for entity in analysis["named_entities"]:
+            self.category_entity_freq[category][(entity["entity"], entity["entity_type"])] += 1
+
+    def merge(self, other):
+        """將另一份統計加總到此統計"""
+        self.total_articles += other.total_articles
+        self.total_words += other.total_words
+        self.word_freq.update(other.word_freq)
+        for category, freq in other.category_word_pos.items():
+            self.category_word_pos[category].update(freq)
+        for category, freq in other.category_entity_freq.items():
+            self.category_entity_freq[category].update(freq)
+        return self
+
+    def result(self):
+        """
+        產生與 CTTextProcessor.analyze_articles 相同格式的分析結果
+
+        Returns:
+            dict: 分析結果，沒有文章時返回錯誤訊息
+        """
+        if not self.total_articles:
+            return {"error": "沒有文章可分析"}
+
+        # 按類別的關鍵詞統計
+        category_keywords_stats = {}
+        for category, freq in self.category_word_pos.items():
+            category_keywords_stats[category] = [
+                {"word": word, "pos": pos, "frequency": count}
+                for (word, pos), count in sorted(freq.items(), key=lambda x: x[1], reverse=True)
+            ]
+
+        # 按類別的命名實體統計
+        category_entities_stats = {}
+        for category, freq in self.category_entity_freq.items():
+            category_entities_stats[category] = [
+                {"entity": entity, "entity_type": entity_type, "frequency": count, "category": category}
+                for (entity, entity_type), count in sorted(freq.items(), key=lambda x: x[1], reverse=True)
+            ]
+
+        sorted_word_freq = sorted(self.word_freq.items(), key=lambda x: x[1], reverse=True)
+
+        return {
+            "total_articles": self.total_articles,
+            "total_words": self.total_words,
+            "unique_words": len(self.word_freq),
+            "top_words": sorted_word_freq[:50],  # 前50個高頻詞
+            "keywords": sorted_word_freq[:20],
+            "category_keywords_stats": category_keywords_stats,  # 按類別的關鍵詞統計
+            "category_entities_stats": category_entities_stats  # 按類別的命名實體統計
+        }
+
+
+def default_torch_threads(workers):
+    """每個工作程序的 PyTorch 線程數：CPU 核心數平均分配給各程序，避免線程數超過核心數"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _init_worker(torch_threads):
+    """工作程序初始化：限制 PyTorch 線程數並載入 CKIP 模型，之後每批文章直接使用"""
+    # 需在載入 torch 前設定，OpenMP 與 MKL 的線程池才會使用相同的線程數
+    for name in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[name] = str(torch_threads)
+    os.environ['TOKENIZERS_PARALLELISM'] = 'false'
+
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    except ImportError:
+        pass
+    except RuntimeError as e:
+        logger.warning(f"無法設定 PyTorch 線程數: {e}")
+
+    from scraper.utils.nlp_models import get_ckip_models
+    get_ckip_models()
+
+
+def _worker_processor(config):
+    """取得工作程序內符合設定的文本處理器，模型由程序內的模型登錄共用"""
+    from scraper.utils.scraper_utils import CTTextProcessor
+
+    key = (config['batch_size'], config['max_length'], config['result_cache'])
+    processor = _worker_processors.get(key)
+    if processor is None:
+        processor = CTTextProcessor(
+            output_dir='.', batch_size=config['batch_size'], max_length=config['max_length'],
+            result_cache=None if config['result_cache'] else False, process_workers=0)
+        _worker_processors[key] = processor
+
+    # 停用詞與篩選條件可能在主程序中修改過，每批都使用主程序的設定
+    processor.stop_words = config['stop_words']
+    processor.target_pos = config['target_pos']
+    processor.min_keyword_length = config['min_keyword_length']
+    return processor
+
+
+def _analyze_batch(articles, config):
+    """在工作程序中分析一批文章，返回逐篇分析結果"""
+    return _worker_processor(config).analyze_article_batch(articles)
+
+
+def _aggregate_batch(articles, config):
+    """在工作程序中分析並統計一批文章，返回 (AnalysisCounters, 每篇文章的關鍵詞與命名實體記錄)"""
+    processor = _worker_processor(config)
+    counters = AnalysisCounters()
+    terms = []
+    for analysis in processor.analyze_article_batch(articles):
+        counters.add(analysis)
+        record = processor.article_terms(analysis)
+        if record is not None:
+            terms.append(record)
+    return counters, terms
+
+
+class NlpProcessPool:
+    """多程序 NLP 工作池
+
+    每個工作程序在啟動時載入一次 CKIP 模型，並將 PyTorch 的線程數限制為核心數除以程序數，
+    各程序同時推論時不會搶占核心。文章依批次分派，斷詞後的統計也在工作程序中完成，
+    主程序只需合併各批的統計。工作程序以 spawn 方式啟動，不會繼承主程序已初始化的 PyTorch 線程池
+    """
+
+    def __init__(self, workers, torch_threads=None):
+        """
+        Args:
+            workers (int): 工作程序數
+            torch_threads (int, optional): 每個工作程序的 PyTorch 線程數，預設為 CPU 核心數除以程序數
+        """
+        self.workers = workers
+        self.torch_threads = torch_threads or default_torch_threads(workers)
+        # 同時送出的批次數有上限，文章可由迭代器逐批讀取，不需全部載入記憶體
+        self.max_pending = workers * 2
+        # 工作程序異常結束 (如記憶體不足) 後工作池無法再使用，下次取得時重新建立
+        self.broken = False
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self.torch_threads,)
+        )
+        logger.info(f"啟動 {workers} 個 NLP 工作程序，每個程序使用 {self.torch_threads} 個 PyTorch 線程")
+
+    def _result(self, future):
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self.broken = True
+            raise
+
+    def _imap(self, func, batches, config):
+        """依序返回每批的結果，最多同時送出 max_pending 批"""
+        pending = deque()
+        for batch in batches:
+            pending.append(self.executor.submit(func, batch, config))
+            if len(pending) >= self.max_pending:
+                yield self._result(pending.popleft())
+        while pending:
+            yield self._result(pending.popleft())
+
+    def analyze(self, articles, config):
+        """
+        在工作程序中分析一批文章
+
+        Args:
+            articles (list): 文章字典列表
+            config (dict): CTTextProcessor.pool_config() 的設定
+
+        Returns:
+            list: 每篇文章的分析結果，順序與輸入相同
+        """
+        return self._result(self.executor.submit(_analyze_batch, articles, config))
+
+    def aggregate(self, articles, batch_articles, config):
+        """
+        將文章分批交給工作程序分析與統計，依批次順序產生結果
+
+        Args:
+            articles (iterable): 文章，可為逐篇讀取的迭代器
+            batch_articles (int): 每批文章數
+            config (dict): CTTextProcessor.pool_config() 的設定
+
+        Yields:
+            tuple: 每批的 (AnalysisCounters, 關鍵詞與命名實體記錄列表)
+        """
+        articles = iter(articles)
+        batches = iter(lambda: list(islice(articles, batch_articles)), [])
+        yield from self._imap(_aggregate_batch, batches, config)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def get_nlp_pool(workers, torch_threads=None):
+    """
+    取得程序內共用的 NLP 工作池，工作程序與已載入的模型在多個爬蟲任務間重複使用
+
+    Args:
+        workers (int): 工作程序數
+        torch_threads (int, optional): 每個工作程序的 PyTorch 線程數
+
+    Returns:
+        NlpProcessPool: 工作池
+    """
+    key = (workers, torch_threads)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None or pool.broken:
+            if pool is not None:
+                logger.warning("NLP 工作池的工作程序異常結束，重新建立工作池")
+                pool.executor.shutdown(wait=False)
+            _pools[key] = NlpProcessPool(workers, torch_threads)
+        return _pools[key]
+
+
+def shutdown_nlp_pools():
+    """關閉所有 NLP 工作池"""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
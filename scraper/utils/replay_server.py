@@ -0,0 +1,196 @@
+import html
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 類別路徑與 CTSimpleScraper.base_urls 一致，文章編號尾碼對應中時網址的類別代碼
+CATEGORY_PATHS = {
+    "money": "260410",
+    "politic": "260407",
+    "society": "260402",
+    "technologynews": "260412",
+    "world": "260408",
+    "star": "260404",
+    "life": "260405",
+    "opinion": "262101",
+    "armament": "260417",
+}
+
+CHALLENGE_HTML = """<!DOCTYPE html>
+<html><head><title>Just a moment...</title></head>
+<body><div id="cf-browser-verification">Checking your browser - Cloudflare</div>
+<script src="/cdn-cgi/challenge-platform/h/b/orchestrate/jsch/v1"></script></body></html>"""
+
+
+class ReplayServer:
+    """離線回放用的本機 HTTP 伺服器
+
+    提供與中時新聞網相同 CSS 結構的列表頁與文章頁，可設定延遲、錯誤率與 Cloudflare 挑戰頁面比例，
+    讓爬蟲可在沒有網路的機器上測試與評估效能。文章頁可來自 HtmlCache 中錄製的真實頁面，
+    否則以模板產生。
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 challenge_rate=0.0, articles_per_page=20, html_cache=None, seed=None):
+        """
+        Args:
+            host (str): 監聽位址
+            port (int): 監聽埠號，0 表示自動選擇
+            latency (float): 每個回應的基本延遲(秒)
+            jitter (float): 延遲的隨機變動範圍(秒)
+            error_rate (float): 回應 HTTP 500 的比例
+            challenge_rate (float): 回應 Cloudflare 挑戰頁面的比例
+            articles_per_page (int): 每個列表頁的文章數
+            html_cache (HtmlCache, optional): 錄製的文章頁面來源
+            seed (int, optional): 隨機種子，固定後錯誤注入可重現
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.challenge_rate = challenge_rate
+        self.articles_per_page = articles_per_page
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.recorded_pages = self._load_recorded_pages(html_cache)
+
+        self.stats = {"listing": 0, "article": 0, "error": 0, "challenge": 0, "not_found": 0}
+        self._stats_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @staticmethod
+    def _load_recorded_pages(html_cache):
+        """從 HtmlCache 載入錄製的文章頁面"""
+        if html_cache is None:
+            return []
+        pages = []
+        for entry in html_cache.iter_entries():
+            try:
+                page = html_cache.read(entry)
+            except OSError:
+                continue
+            if 'article-title' in page:
+                pages.append(page)
+        return pages
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def article_url(self, category_path, serial_no):
+        """產生文章網址，格式與中時即時新聞相同"""
+        suffix = CATEGORY_PATHS.get(category_path, "260410")
+        return f"{self.base_url}/realtimenews/20240101{serial_no:06d}-{suffix}?chdtv"
+
+    def article_urls(self, category_path, count):
+        """產生指定類別的文章網址列表，供不經列表頁直接評估文章抓取"""
+        return [self.article_url(category_path, i) for i in range(1, count + 1)]
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _roll(self):
+        with self._random_lock:
+            return self.random.random(), self.random.uniform(0, self.jitter) if self.jitter else 0.0
+
+    def render_listing(self, category_path, page):
+        """產生列表頁，文章連結使用 `h3.title > a`"""
+        start = (page - 1) * self.articles_per_page + 1
+        items = "\n".join(
+            f'<li><h3 class="title"><a href="{self.article_url(category_path, n)}">'
+            f'回放新聞 {category_path} 第 {n} 則</a></h3></li>'
+            for n in range(start, start + self.articles_per_page)
+        )
+        return (f"<!DOCTYPE html><html><head><title>{category_path} - 回放</title></head>"
+                f"<body><ul class=\"vertical-list\">{items}</ul></body></html>")
+
+    def render_article(self, path):
+        """產生文章頁，結構與 parse_article_html / scrape_article_selenium 使用的選擇器一致"""
+        if self.recorded_pages:
+            page = self.recorded_pages[zlib.crc32(path.encode('utf-8')) % len(self.recorded_pages)]
+            # 標題加上網址編號，避免同一錄製頁面被爬蟲的標題去重略過
+            return re.sub(r'(<h1[^>]*article-title[^>]*>)', lambda m: f"{m.group(1)}[{html.escape(path)}] ",
+                          page, count=1)
+
+        title = html.escape(f"回放文章 {path.rsplit('/', 1)[-1]}")
+        paragraphs = "".join(
+            f"<p>這是回放伺服器產生的第 {i} 段內文，用於離線測試爬蟲的抓取與解析效能。</p>" for i in range(1, 9))
+        return (f"<!DOCTYPE html><html><head><title>{title}</title></head><body>"
+                f"<h1 class=\"article-title\">{title}</h1>"
+                f"<div class=\"meta-info\"><time datetime=\"2024-01-01 12:00\">2024/01/01 12:00</time></div>"
+                f"<div class=\"author\"><a href=\"#\">回放記者</a></div>"
+                f"<div class=\"article-body\">{paragraphs}"
+                f"<img src=\"{self.base_url}/static/photo.jpg\"></div>"
+                f"</body></html>")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _send(self, status, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                roll, jitter = server._roll()
+                if server.latency or jitter:
+                    time.sleep(server.latency + jitter)
+
+                parsed = urlparse(self.path)
+                parts = [p for p in parsed.path.split("/") if p]
+
+                if parts and parts[0] == "realtimenews":
+                    if roll < server.challenge_rate:
+                        server._count("challenge")
+                        return self._send(503, CHALLENGE_HTML)
+                    if roll < server.challenge_rate + server.error_rate:
+                        server._count("error")
+                        return self._send(500, "<html><body>Internal Server Error</body></html>")
+                    server._count("article")
+                    return self._send(200, server.render_article(parsed.path))
+
+                if parts and parts[0] in CATEGORY_PATHS:
+                    page = 1
+                    if len(parts) > 1 and parts[1] == "total":
+                        page = int(parse_qs(parsed.query).get("page", ["1"])[0])
+                    server._count("listing")
+                    return self._send(200, server.render_listing(parts[0], page))
+
+                server._count("not_found")
+                return self._send(404, "<html><body>Not Found</body></html>")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """於背景線程啟動伺服器"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止伺服器"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,81 @@
+import json
+import os
+import threading
+
+# NLP 階段逐篇輸出的文章關鍵詞與命名實體出現次數，每行一篇
+# {"item_id": ..., "keywords": [[詞, 詞性, 次數], ...], "entities": [[實體, 類型, 次數], ...]}
+ARTICLE_TERMS_FILE = 'article_terms.jsonl'
+
+# 管線模式 NLP 工作線程逐篇輸出的分析結果暫存檔，彙整完成後刪除
+PIPELINE_ANALYSES_FILE = 'pipeline_analyses.jsonl'
+
+
+class JsonlResultWriter:
+    """以 JSON Lines 格式逐篇追加寫入爬取結果
+
+    每篇文章寫入後立即 flush，程序中途結束時已爬取的文章仍保留在磁碟上，
+    且不需在記憶體中保留全部文章
+    """
+
+    def __init__(self, path, fsync=False):
+        """
+        Args:
+            path (str): 輸出檔案路徑，已存在時會接續追加
+            fsync (bool): 每篇寫入後是否呼叫 os.fsync，確保斷電時也不遺失
+        """
+        self.path = path
+        self.fsync = fsync
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, article):
+        """追加寫入一篇文章"""
+        line = json.dumps(article, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.count += 1
+
+    def close(self):
+        """關閉檔案"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def iter_articles(path):
+    """逐篇讀取結果檔案中的文章
+
+    支援 JSON Lines (.jsonl) 串流讀取；舊版的 JSON 陣列檔案 (.json) 則整份載入後逐篇返回。
+    程序中斷時最後一行可能寫到一半，會被略過。
+
+    Args:
+        path (str): 結果檔案路徑
+
+    Yields:
+        dict: 文章字典
+    """
+    if not path.endswith('.jsonl'):
+        with open(path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # 中斷時寫到一半的最後一行
+                continue
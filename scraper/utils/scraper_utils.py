@@ -5,19 +5,38 @@ import random
 import re
 import time
 import threading
+import contextlib
+import ipaddress
 import concurrent.futures
-from queue import Queue
-from collections import defaultdict
+from queue import Queue, Empty
+from collections import Counter, defaultdict
+from itertools import islice
 from datetime import datetime
 from urllib.parse import urlparse
 from django.utils import timezone
 
 import pandas as pd
+import requests
 import undetected_chromedriver as uc
 from fake_useragent import UserAgent
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from requests.adapters import HTTPAdapter
+
+from scraper.utils.async_fetcher import AsyncArticleFetcher
+from scraper.utils.article_parser import is_cloudflare_challenge, parse_article_html, filter_photo_links, \
+    content_hash
+from scraper.utils.browser_pool import BrowserPool
+from scraper.utils.near_duplicate import SimHashIndex, simhash, format_fingerprint, parse_fingerprint
+from scraper.utils.result_store import JsonlResultWriter, iter_articles, ARTICLE_TERMS_FILE, PIPELINE_ANALYSES_FILE
+from scraper.utils.checkpoint import ScrapeCheckpoint
+from scraper.utils.concurrency import AdaptiveConcurrency
+from scraper.utils.nlp_models import get_ckip_models, nlp_setting, ckip_model_version
+from scraper.utils.nlp_cache import get_result_cache, cache_key
+from scraper.utils.nlp_pool import AnalysisCounters, get_nlp_pool
+from scraper.utils.text_chunker import chunk_text, to_source_offset
 
 
 # 設定日誌
@@ -42,10 +61,98 @@ def setup_logger(output_dir):
     return logger
 
 
+class ThreadSafeSet:
+    """線程安全的集合，供多個工作線程共用去重"""
+
+    def __init__(self):
+        self._items = set()
+        self._lock = threading.Lock()
+
+    def add(self, item):
+        """加入項目
+
+        Returns:
+            bool: 項目是否為新加入（先前不存在）
+        """
+        with self._lock:
+            if item in self._items:
+                return False
+            self._items.add(item)
+            return True
+
+    def __contains__(self, item):
+        with self._lock:
+            return item in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+
 class CTSimpleScraper:
-    def __init__(self, headless=True):
+    # 文章抓取模式: selenium 只用瀏覽器；http 先用 requests 抓取，失敗時才退回 Selenium；
+    # async 以 asyncio 引擎大量並行抓取，失敗的頁面同樣退回 Selenium
+    FETCH_MODES = ('selenium', 'http', 'async')
+
+    # 近似重複文章的處理方式: flag 記錄來源文章 (duplicate_of) 後照常保存，但不交給 NLP 分析；
+    # skip 直接捨棄；None 不偵測
+    NEAR_DUPLICATE_MODES = ('flag', 'skip', None)
+
+    # 精簡瀏覽模式下以 CDP 封鎖的資源：只讀取文字與 img[src] 屬性，圖片、字型、樣式與廣告追蹤皆不需下載
+    LEAN_BLOCKED_URLS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.css", "*.mp4", "*.webm", "*.m3u8",
+        "*doubleclick.net*", "*googlesyndication.com*", "*googleadservices.com*",
+        "*google-analytics.com*", "*googletagmanager.com*", "*googletagservices.com*",
+        "*adservice.google.*", "*tenmax.io*", "*facebook.net*", "*connect.facebook.com*",
+        "*scorecardresearch.com*", "*criteo.*", "*taboola.com*", "*outbrain.com*",
+        "*popin.cc*", "*clickforce.com.tw*", "*onead.com.tw*", "*imedia.com.tw*",
+    ]
+
+    def __init__(self, headless=True, driver_max_pages=50, fetch_mode='selenium', http_timeout=10,
+                 async_concurrency=200, async_per_host=64, async_rate=20.0, listing_max_workers=9,
+                 pipeline_queue_size=100, nlp_workers=1, nlp_resource=None, checkpoint_interval=20, article_index=None,
+                 html_cache=None, site_root=None, lean_browser=True, adaptive_concurrency=False,
+                 adaptive_max_workers=32, near_duplicate='flag', near_duplicate_threshold=3):
         self.headless = headless
+        if fetch_mode not in self.FETCH_MODES:
+            raise ValueError(f"未知的抓取模式: {fetch_mode}")
+        self.fetch_mode = fetch_mode
+        self.http_timeout = http_timeout
+        self.async_concurrency = async_concurrency  # asyncio 引擎同時進行中的請求上限
+        self.async_per_host = async_per_host  # asyncio 引擎每個主機的並行上限
+        self.async_rate = async_rate  # asyncio 引擎每個主機每秒請求數
+        self.listing_max_workers = listing_max_workers  # 並行爬取列表頁的最大工作線程數
+        self.article_sink = None  # 每篇文章爬取成功後的下游處理函數，管線模式下為 NLP 佇列
+        self.pipeline_queue_size = pipeline_queue_size  # 管線模式各階段間佇列的容量上限
+        self.nlp_workers = nlp_workers  # 管線模式的 NLP 工作線程數
+        # NLP 階段期間進入的 context manager 工廠，用於向背景任務佇列取得 CKIP 模型名額
+        self.nlp_resource = nlp_resource or contextlib.nullcontext
+        self.checkpoint = None  # 任務檢查點，在run方法中建立
+        self.checkpoint_interval = checkpoint_interval  # 每寫入多少篇文章保存一次檢查點
+        self.completed_ids = set()  # 已寫入結果檔案的文章 item_id
+        self.discovery_complete = False  # 列表頁連結是否已全部收集完成
+        self.resuming = False  # 是否正從檢查點接續執行
+        self.resumed_count = 0  # 接續執行前結果檔案中已有的文章數
+        # 增量爬取使用的跨任務文章索引，需支援 `url in index` 與 index.lookup(url)，為 None 時不啟用
+        self.article_index = article_index
+        self.html_cache = html_cache  # 原始 HTML 磁碟快取 (HtmlCache)，為 None 時不啟用
+        self.http_session = None  # HTTP 模式使用的連線池，在scrape_articles中建立
+        self.fetch_stats = defaultdict(int)  # 各抓取路徑的統計，用於追蹤 HTTP 命中率
+        self.fetch_latencies = []  # 每篇文章的抓取耗時(秒)，用於效能評估
+        self.adaptive_concurrency = adaptive_concurrency  # 多線程模式是否依延遲與錯誤率自動調整並行數
+        self.adaptive_max_workers = adaptive_max_workers  # 自動調整時的並行數上限
+        self.concurrency = None  # 自適應並行數控制器，在scrape_articles中建立
+        if near_duplicate not in self.NEAR_DUPLICATE_MODES:
+            raise ValueError(f"未知的近似重複處理方式: {near_duplicate}")
+        # 近似重複文章的處理方式：flag 標記來源文章後照常保存、skip 不保存、None 不偵測
+        self.near_duplicate = near_duplicate
+        self.near_duplicate_index = SimHashIndex(threshold=near_duplicate_threshold) if near_duplicate else None
         self.driver = None
+        self.browser_pool = None  # 文章爬取用的瀏覽器池，在scrape_articles中建立
+        self.driver_max_pages = driver_max_pages  # 池中每個瀏覽器最多服務的頁數
+        self.lean_browser = lean_browser  # 精簡瀏覽模式：不載入圖片、字型、樣式與廣告，頁面 DOM 就緒即返回
         self.base_urls = {
             "財經": "https://www.chinatimes.com/money/?chdtv",
             "政治": "https://www.chinatimes.com/politic/?chdtv",
@@ -69,6 +176,15 @@ class CTSimpleScraper:
             "言論": "https://www.chinatimes.com/opinion/total?page={page}&chdtv",
             "軍事": "https://www.chinatimes.com/armament/total?page={page}&chdtv"
         }
+        # 網站根網址，可指向本機的回放伺服器以離線測試與效能評估
+        self.site_host = "chinatimes.com"
+        if site_root:
+            site_root = site_root.rstrip("/")
+            self.base_urls = {k: v.replace("https://www.chinatimes.com", site_root)
+                              for k, v in self.base_urls.items()}
+            self.page_url_templates = {k: v.replace("https://www.chinatimes.com", site_root)
+                                       for k, v in self.page_url_templates.items()}
+            self.site_host = urlparse(site_root).netloc
         self.category_codes = {
             "財經": "money",
             "政治": "politic",
@@ -81,10 +197,16 @@ class CTSimpleScraper:
             "軍事": "military"
         }
         self.article_links = {}  # 按類別存儲文章連結
-        self.results = []
+        self.link_serials = {}  # 分片爬取時由協調端分配的文章序號 {連結: 序號}，確保各分片的 item_id 不重複
+        self.result_writer = None  # 逐篇追加寫入結果的 JSONL 寫入器
+        self.result_file = None  # 結果檔案路徑
+        self.result_count = 0  # 已寫入的文章數
         self.ua = UserAgent()
         self.user_agent = self.ua.random
         self.cookies = {}
+        self.cookie_records = {}  # 各瀏覽器取得的完整 cookies {名稱: Selenium cookie}，合併後寫入 cookies 文件
+        self.cookie_file_lock = threading.Lock()  # 並行爬取列表頁時多個瀏覽器依序寫入 cookies 文件
+        self.async_fetcher = None  # asyncio 引擎執行中的抓取器，取得新的 cookies 時同步更新
         self.output_dir = None  # 將在run方法中設置
         self.logger = None  # 將在run方法中設置
         self.processed_urls = set()  # 用於儲存已處理過的 URL，防止重複爬取
@@ -117,9 +239,11 @@ class CTSimpleScraper:
             options.add_argument("--disable-extensions")
             options.add_argument("--disable-infobars")
             options.add_argument("--disable-translate")
+            self.apply_lean_options(options)
 
             # 初始化 undetected_chromedriver
             self.driver = uc.Chrome(options=options)
+            self.enable_resource_blocking(self.driver)
 
             # 注入基本的反檢測腳本
             minimal_js = """
@@ -145,17 +269,54 @@ class CTSimpleScraper:
                 self.logger.error(f"備用 WebDriver 初始化也失敗: {e2}", exc_info=True)
                 raise
 
-    def simulate_human_behavior(self):
+    def apply_lean_options(self, options):
+        """精簡瀏覽模式：停用圖片並在 DOM 就緒時即返回，不等待所有子資源載入完成"""
+        if not self.lean_browser:
+            return options
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+        })
+        options.page_load_strategy = 'eager'
+        return options
+
+    def enable_resource_blocking(self, driver):
+        """精簡瀏覽模式：以 CDP 封鎖圖片、字型、樣式與廣告追蹤請求"""
+        if not self.lean_browser:
+            return
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.LEAN_BLOCKED_URLS})
+        except Exception as e:
+            self.logger.warning(f"設定資源封鎖失敗，以完整模式載入頁面: {e}")
+
+    def create_article_driver(self):
+        """建立文章爬取用的 WebDriver，供瀏覽器池使用"""
+        options = uc.ChromeOptions()
+        if self.headless:
+            options.add_argument("--headless")
+            options.add_argument("--disable-gpu")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--no-sandbox")
+        options.add_argument(f"--user-agent={UserAgent().random}")
+        self.apply_lean_options(options)
+
+        driver = uc.Chrome(options=options)
+        self.enable_resource_blocking(driver)
+        return driver
+
+    def simulate_human_behavior(self, driver=None):
         """簡單的人類行為模擬"""
+        driver = driver or self.driver
         try:
             # 隨機滾動
             scroll_amount = random.randint(300, 700)
-            self.driver.execute_script(f"window.scrollTo(0, {scroll_amount});")
+            driver.execute_script(f"window.scrollTo(0, {scroll_amount});")
             time.sleep(random.uniform(0.3, 0.8))
 
             # 再滾動一次到不同位置
             scroll_amount = random.randint(800, 1200)
-            self.driver.execute_script(f"window.scrollTo(0, {scroll_amount});")
+            driver.execute_script(f"window.scrollTo(0, {scroll_amount});")
             time.sleep(random.uniform(0.3, 0.8))
         except Exception as e:
             self.logger.error(f"模擬人類行為時發生錯誤: {e}")
@@ -175,24 +336,44 @@ class CTSimpleScraper:
             return None
 
         # 確保是中時的 URL
-        if 'chinatimes.com' not in url:
+        if self.site_host not in url:
             return None
 
         return url
 
-    def save_cookies(self):
-        """儲存 cookies 到文件"""
+    def save_cookies(self, driver=None):
+        """儲存 cookies 到文件，並同步到 HTTP 與 asyncio 引擎已建立的 session
+
+        多線程模式下文章爬取與列表頁同時開始，session 建立時可能還沒有 cookies，
+        之後各類別的瀏覽器取得的 cookies 會在此補進 session；多個瀏覽器的 cookies 依名稱合併後寫入同一文件
+        """
+        driver = driver or self.driver
         try:
-            selenium_cookies = self.driver.get_cookies()
+            selenium_cookies = driver.get_cookies()
+            cookies = {cookie['name']: cookie['value'] for cookie in selenium_cookies}
+
+            # 轉換並儲存到內部字典，與 session 的建立互斥，確保新的 cookies 不會遺漏
+            with self.lock:
+                self.cookies.update(cookies)
+                for cookie in selenium_cookies:
+                    self.cookie_records[cookie['name']] = cookie
+                http_session = self.http_session
+                async_fetcher = self.async_fetcher
+
+            if http_session is not None:
+                domain = self.cookie_domain()
+                for name, value in cookies.items():
+                    http_session.cookies.set(name, value, domain=domain)
+            if async_fetcher is not None:
+                async_fetcher.update_cookies(cookies)
 
             # 儲存到文件
             cookie_path = os.path.join(self.output_dir, f"cookies_{datetime.now().strftime('%Y%m%d')}.json")
-            with open(cookie_path, "w", encoding="utf-8") as f:
-                json.dump(selenium_cookies, f)
-
-            # 轉換並儲存到內部字典
-            for cookie in selenium_cookies:
-                self.cookies[cookie['name']] = cookie['value']
+            with self.cookie_file_lock:
+                with self.lock:
+                    records = list(self.cookie_records.values())
+                with open(cookie_path, "w", encoding="utf-8") as f:
+                    json.dump(records, f)
 
         except Exception as e:
             self.logger.error(f"儲存 cookies 時發生錯誤: {e}")
@@ -221,8 +402,11 @@ class CTSimpleScraper:
                 try:
                     if 'expiry' in cookie:
                         cookie['expiry'] = int(cookie['expiry'])
-                    self.driver.add_cookie(cookie)
-                    self.cookies[cookie['name']] = cookie['value']
+                    if self.driver:
+                        self.driver.add_cookie(cookie)
+                    with self.lock:
+                        self.cookies[cookie['name']] = cookie['value']
+                        self.cookie_records[cookie['name']] = cookie
                 except Exception as e:
                     pass
 
@@ -277,93 +461,611 @@ class CTSimpleScraper:
             self.logger.error(f"生成 item_id 時出錯: {e}")
             return f"unknown_{date_str}_{serial_no}"
 
-    def scrape_categories(self, categories=None, limit_per_category=5):
-        """爬取指定類別的主頁並獲取文章連結，支持翻頁功能"""
+    def claim_title(self, title):
+        """檢查標題是否已處理過，未處理則標記
+
+        Returns:
+            bool: 標題是否為首次出現
+        """
+        with self.lock:
+            if title in self.processed_titles:
+                return False
+            self.processed_titles.add(title)
+            return True
+
+    def report_fetch_signal(self, kind):
+        """將抓取異常回報給自適應並行數控制器
+
+        Args:
+            kind (str): timeout、throttled (Cloudflare / HTTP 429 / 403 / 503) 或 error
+        """
+        if self.concurrency is not None:
+            self.concurrency.signal(kind)
+
+    def build_article(self, url, category, serial_no, fields, fetch_path):
+        """組合文章結果字典
+
+        Args:
+            url (str): 文章連結
+            category (str): 類別名稱
+            serial_no (int): 類別內序號
+            fields (dict): 解析出的 title、date、author、content、photo_links
+            fetch_path (str): 實際提供此文章的抓取路徑 (http、async、selenium 或 index)
+        """
+        # 提取日期用於 item_id
+        date_str = self.extract_date_from_url(url)
+
+        # 生成 item_id
+        category_code = self.category_codes.get(category, self.extract_category_from_url(url))
+        item_id = self.generate_item_id(url, date_str, category_code, serial_no)
+
+        return {
+            "item_id": item_id,
+            "category": category,
+            "date": fields["date"],
+            "author": fields["author"],
+            "title": fields["title"],
+            "content": fields["content"],
+            "link": url,
+            "photo_links": fields["photo_links"],
+            "content_hash": fields.get("content_hash") or content_hash(fields["content"]),
+            "fetch_path": fetch_path
+        }
+
+    def reuse_indexed_article(self, url, category, serial_no):
+        """增量爬取：連結已由先前任務保存時，直接沿用資料庫中的文章而不抓取網站
+
+        Returns:
+            dict: 沿用的文章結果，連結不在索引中或已處理過時返回 None
+        """
+        if self.article_index is None or url not in self.article_index:
+            return None
+
+        # 檢查與標記在同一個鎖內完成，同一連結只會由一個線程沿用
+        with self.lock:
+            if url in self.processed_urls:
+                return None
+            self.processed_urls.add(url)
+
+        try:
+            fields = self.article_index.lookup(url)
+        except Exception as e:
+            self.logger.warning(f"查詢文章索引 {url} 失敗，改為重新抓取: {e}")
+            fields = None
+        if fields is None:
+            # 未能沿用時取消標記，交由一般抓取流程處理
+            with self.lock:
+                self.processed_urls.discard(url)
+            return None
+
+        if not self.claim_title(fields["title"]):
+            self.logger.info(f"跳過已處理的文章標題: {fields['title']}")
+            return None
+
+        with self.lock:
+            self.fetch_stats["index"] += 1
+
+        return self.build_article(url, category, serial_no, fields, fetch_path="index")
+
+    def setup_http_session(self, pool_size=4):
+        """建立 HTTP 模式使用的 requests.Session
+
+        沿用瀏覽器的 User-Agent 與 save_cookies 收集到的 cookies，連線池大小與工作線程數一致；
+        建立後 save_cookies 取得的 cookies 會再同步到此 session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
+        })
+        domain = self.cookie_domain()
+        with self.lock:
+            for name, value in self.cookies.items():
+                session.cookies.set(name, value, domain=domain)
+            self.http_session = session
+        return session
+
+    def cookie_domain(self):
+        """依網站主機名稱 (不含連接埠) 取得 cookies 的網域
+
+        一般網域加上前置的點，讓子網域 (如 www) 也能使用；IP 位址只能完全相符；
+        localhost 等不含點的主機名稱，http.cookiejar 會以加上 .local 後的名稱比對
+        """
+        host = urlparse(f"//{self.site_host}").hostname or self.site_host
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        if "." not in host:
+            return f"{host}.local"
+        return f".{host}"
+
+    def fetch_article_http(self, url):
+        """以 HTTP 抓取並解析文章頁面
+
+        Returns:
+            tuple: (解析結果字典或 None, 失敗原因)，成功時原因為 None
+        """
+        cache_key = self.clean_url(url) or url
+        headers = self.html_cache.conditional_headers(cache_key) if self.html_cache else {}
+        try:
+            response = self.http_session.get(url, timeout=self.http_timeout, headers=headers)
+            if response.status_code == 304 and self.html_cache:
+                # 內容未變更，直接解析快取的 HTML
+                html = self.html_cache.get_html(cache_key)
+                if html is not None:
+                    self.html_cache.touch(cache_key)
+                    with self.lock:
+                        self.fetch_stats["http_not_modified"] += 1
+                    fields = parse_article_html(html)
+                    return (fields, None) if fields else (None, "parse")
+                # 快取在請求期間被清除，重新抓取完整頁面
+                response = self.http_session.get(url, timeout=self.http_timeout)
+        except requests.RequestException as e:
+            self.logger.warning(f"HTTP 抓取文章 {url} 失敗: {e}")
+            self.report_fetch_signal('timeout' if isinstance(e, requests.Timeout) else 'error')
+            return None, "error"
+
+        html = response.text
+        if is_cloudflare_challenge(html, response.status_code):
+            self.logger.warning(f"HTTP 抓取文章 {url} 遇到 Cloudflare 挑戰頁面")
+            self.report_fetch_signal('throttled')
+            return None, "cloudflare"
+
+        if response.status_code != 200:
+            self.logger.warning(f"HTTP 抓取文章 {url} 返回狀態碼 {response.status_code}")
+            self.report_fetch_signal('throttled' if response.status_code in (429, 403, 503) else 'error')
+            return None, "error"
+
+        if self.html_cache:
+            self.html_cache.store(cache_key, html, response.headers)
+
+        fields = parse_article_html(html)
+        if fields is None:
+            return None, "parse"
+        return fields, None
+
+    def scrape_article(self, url, category, serial_no):
+        """依抓取模式爬取單篇文章
+
+        HTTP 模式下先以 requests 抓取，只有解析失敗或遇到 Cloudflare 挑戰時才退回 Selenium；
+        增量爬取時，先前任務已保存的文章直接沿用
+        """
+        article_data = self.reuse_indexed_article(url, category, serial_no)
+        if article_data:
+            return article_data
+
+        if self.fetch_mode != 'http':
+            return self.scrape_article_selenium(url, category, serial_no)
+
+        with self.lock:
+            if url in self.processed_urls:
+                self.logger.info(f"跳過已處理的文章URL: {url}")
+                return None
+
+        self.logger.info(f"開始以 HTTP 爬取文章: {url}")
+        fields, reason = self.fetch_article_http(url)
+        if fields is None:
+            with self.lock:
+                self.fetch_stats[f"http_fallback_{reason}"] += 1
+            self.logger.info(f"HTTP 抓取未成功({reason})，改用 Selenium: {url}")
+            return self.scrape_article_selenium(url, category, serial_no)
+
+        if not self.claim_title(fields["title"]):
+            self.logger.info(f"跳過已處理的文章標題: {fields['title']}")
+            return None
+
+        with self.lock:
+            self.processed_urls.add(url)
+            self.fetch_stats["http"] += 1
+
+        return self.build_article(url, category, serial_no, fields, fetch_path="http")
+
+    def scrape_articles_async(self, tasks, use_threading=False, max_workers=4):
+        """以 asyncio 引擎抓取文章，解析失敗或遇到 Cloudflare 的頁面再交給 Selenium
+
+        Args:
+            tasks (list): 任務列表，每個任務為 (url, category, serial_no)
+            use_threading (bool): Selenium 備援是否使用多線程
+            max_workers (int): Selenium 備援的最大線程數
+        """
+        fallback_tasks = []
+
+        def pending_tasks():
+            for task in tasks:
+                # 增量爬取：已保存的文章直接沿用，不交給非同步引擎
+                article_data = self.reuse_indexed_article(*task)
+                if article_data:
+                    self.emit_article(article_data)
+                    continue
+                with self.lock:
+                    if task[0] in self.processed_urls:
+                        continue
+                yield task
+
+        # 與 save_cookies 互斥，列表頁之後取得的 cookies 由 save_cookies 同步到抓取器
+        with self.lock:
+            fetcher = AsyncArticleFetcher(
+                headers={
+                    "User-Agent": self.user_agent,
+                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                    "Accept-Language": "zh-TW,zh;q=0.9,en;q=0.8",
+                },
+                cookies=dict(self.cookies),
+                max_concurrency=self.async_concurrency,
+                per_host_limit=self.async_per_host,
+                rate_per_host=self.async_rate,
+                timeout=self.http_timeout,
+                html_cache=self.html_cache,
+                logger=self.logger
+            )
+            self.async_fetcher = fetcher
+
+        def on_result(task, fields, reason):
+            url, category, serial_no = task
+            if fields is None:
+                self.fetch_stats[f"http_fallback_{reason}"] += 1
+                fallback_tasks.append(task)
+                return
+
+            if not self.claim_title(fields["title"]):
+                self.logger.info(f"跳過已處理的文章標題: {fields['title']}")
+                return
+
+            with self.lock:
+                self.processed_urls.add(url)
+                self.fetch_stats["async"] += 1
+
+            article_data = self.build_article(url, category, serial_no, fields, fetch_path="async")
+            self.emit_article(article_data)
+
+        self.logger.info(f"使用 asyncio 引擎爬取文章，同時請求上限: {self.async_concurrency}")
+        try:
+            fetcher.run(pending_tasks(), on_result)
+        finally:
+            with self.lock:
+                self.async_fetcher = None
+        self.fetch_latencies.extend(fetcher.latencies)
+
+        if fallback_tasks:
+            self.logger.info(f"{len(fallback_tasks)} 篇文章改用 Selenium 爬取")
+            self._scrape_tasks(fallback_tasks, self.scrape_article_selenium, use_threading, max_workers)
+
+    def open_result_writer(self):
+        """在輸出目錄建立 JSONL 結果檔案"""
+        self.result_file = os.path.join(self.output_dir,
+                                        f"ct_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+        self.result_writer = JsonlResultWriter(self.result_file)
+        self.result_count = 0
+        return self.result_writer
+
+    def emit_article(self, article_data):
+        """將成功爬取的文章立即寫入結果檔案，並交給下游處理階段（若有設定 article_sink）
+
+        文章寫入後不保留在記憶體中；article_sink 可能因下游佇列已滿而阻塞，藉此將背壓傳回爬取階段。
+        與先前文章內容近似重複的文章依 near_duplicate 設定捨棄或標記，標記的文章不交給下游分析
+        """
+        fingerprint = None
+        if self.near_duplicate_index is not None and article_data.get("content"):
+            # 指紋計算較耗 CPU，在鎖外進行
+            fingerprint = simhash(article_data["content"])
+            article_data["simhash"] = format_fingerprint(fingerprint)
+
+        with self.lock:
+            if article_data["item_id"] in self.completed_ids:
+                self.logger.info(f"跳過已完成的文章: {article_data['item_id']}")
+                return
+            if fingerprint is not None:
+                match = self.near_duplicate_index.check_and_add(article_data["item_id"], fingerprint)
+                if match is not None:
+                    original_id, distance = match
+                    self.fetch_stats["near_duplicate"] += 1
+                    self.logger.info(
+                        f"近似重複文章 (與 {original_id} 相差 {distance} 位元): {article_data['title']}")
+                    if self.near_duplicate == 'skip':
+                        return
+                    article_data["duplicate_of"] = original_id
+            if self.result_writer is None:
+                self.open_result_writer()
+            self.completed_ids.add(article_data["item_id"])
+            self.result_count += 1
+            save_checkpoint = self.checkpoint_interval and self.result_count % self.checkpoint_interval == 0
+        self.result_writer.write(article_data)
+        if save_checkpoint:
+            self.save_checkpoint()
+        self.logger.info(f"成功爬取 {article_data['category']} 類別的文章: {article_data['title']}")
+        if self.article_sink is not None and not article_data.get("duplicate_of"):
+            self.article_sink(article_data)
+
+    def _scrape_tasks(self, tasks, scrape_func, use_threading, max_workers):
+        """以指定的爬取函數處理任務列表，可選擇多線程"""
+        if use_threading:
+            controller = self.concurrency
+            if controller is not None:
+                # 由控制器決定同時執行的任務數，線程池大小為並行數上限
+                acquire = controller.acquire
+                pool_size = controller.maximum
+            else:
+                # 限制已提交但尚未完成的任務數，避免把上游佇列一次搬進線程池而失去背壓
+                in_flight = threading.BoundedSemaphore(max_workers * 2)
+                acquire = in_flight.acquire
+                pool_size = max_workers
+
+            def run_task(link, category, serial_no):
+                started = time.monotonic()
+                try:
+                    article_data = scrape_func(link, category, serial_no)
+                    if article_data:
+                        self.emit_article(article_data)
+                except Exception as e:
+                    self.logger.error(f"爬取文章 {link} 時發生異常: {e}")
+                finally:
+                    latency = time.monotonic() - started
+                    self.fetch_latencies.append(latency)
+                    if controller is not None:
+                        controller.release(latency)
+                    else:
+                        in_flight.release()
+
+            # 使用線程池並行處理，離開 with 區塊時會等待所有任務完成
+            with concurrent.futures.ThreadPoolExecutor(max_workers=pool_size) as executor:
+                for link, category, serial_no in tasks:
+                    acquire()
+                    executor.submit(run_task, link, category, serial_no)
+        else:
+            current_category = None
+            for link, category, serial_no in tasks:
+                if category != current_category:
+                    current_category = category
+                    self.logger.info(f"開始爬取 {category} 類別的文章")
+
+                started = time.monotonic()
+                article_data = scrape_func(link, category, serial_no)
+                self.fetch_latencies.append(time.monotonic() - started)
+                if article_data:
+                    self.emit_article(article_data)
+
+                # 增加隨機等待時間，避免被封鎖；沿用索引的文章沒有請求網站，不需等待
+                if not (article_data and article_data["fetch_path"] == "index"):
+                    time.sleep(random.uniform(1, 3))
+
+    def log_fetch_stats(self):
+        """記錄各抓取路徑的文章數與 HTTP 命中率"""
+        served_index = self.fetch_stats.get("index", 0)
+        if served_index:
+            self.logger.info(f"增量爬取: {served_index} 篇文章沿用先前任務的資料，未重新抓取")
+        not_modified = self.fetch_stats.get("http_not_modified", 0)
+        if not_modified:
+            self.logger.info(f"HTML 快取: {not_modified} 篇文章伺服器回應 304，直接使用快取內容")
+        near_duplicate = self.fetch_stats.get("near_duplicate", 0)
+        if near_duplicate:
+            action = "已捨棄" if self.near_duplicate == 'skip' else "已標記，不進行 NLP 分析"
+            self.logger.info(f"近似重複偵測: {near_duplicate} 篇文章與先前文章內容近似，{action}")
+
+        served_http = self.fetch_stats.get("http", 0) + self.fetch_stats.get("async", 0)
+        served_selenium = self.fetch_stats.get("selenium", 0)
+        total = served_http + served_selenium
+        if not total:
+            return
+        fallbacks = {k: v for k, v in self.fetch_stats.items() if k.startswith("http_fallback_")}
+        self.logger.info(
+            f"抓取路徑統計: HTTP {served_http} 篇, Selenium {served_selenium} 篇, "
+            f"HTTP 命中率 {served_http / total:.1%}, 退回原因 {fallbacks}")
+
+    def scrape_categories(self, categories=None, limit_per_category=5, parallel=False, link_queue=None):
+        """爬取指定類別的主頁並獲取文章連結，支持翻頁功能
+
+        Args:
+            categories (list): 要爬取的類別列表，預設爬取全部類別
+            limit_per_category (int): 每個類別最多收集的文章連結數
+            parallel (bool): 是否每個類別使用獨立的工作線程與瀏覽器並行爬取，並行時不使用主瀏覽器
+            link_queue (Queue, optional): 若提供，找到的連結會以 (url, category, serial_no) 即時放入，
+                供文章爬取階段邊收集邊處理
+
+        Returns:
+            bool: 是否成功爬取到文章連結
+        """
         if not categories:
             categories = list(self.base_urls.keys())  # 默認爬取所有類別
 
-        # 用於臨時去重，但不把URL添加到self.processed_urls
-        all_urls = set()
-
+        valid_categories = []
         for category in categories:
             if category not in self.base_urls:
                 self.logger.warning(f"未知類別: {category}")
                 continue
+            valid_categories.append(category)
 
-            # 清空此類別的連結列表，準備重新收集
-            self.article_links[category] = []
+        # 用於臨時去重，但不把URL添加到self.processed_urls；並行模式下由多個類別工作線程共用
+        all_urls = ThreadSafeSet()
 
-            # 計算需要爬取的頁數
-            needed_pages = (limit_per_category + self.articles_per_page - 1) // self.articles_per_page
-            self.logger.info(f"類別 {category} 需要爬取 {needed_pages} 頁")
+        if parallel:
+            listing_pool = BrowserPool(
+                self.create_article_driver,
+                size=min(len(valid_categories), self.listing_max_workers),
+                max_pages_per_driver=self.driver_max_pages,
+                logger=self.logger
+            )
+            self.logger.info(f"並行爬取 {len(valid_categories)} 個類別的列表頁，工作線程數: {listing_pool.size}")
 
-            # 爬取需要的頁數
-            for page in range(1, needed_pages + 1):
-                # 第一頁使用原始URL，後續頁使用分頁URL模板
-                if page == 1:
-                    url = self.base_urls[category]
-                else:
-                    url = self.page_url_templates[category].format(page=page)
+            try:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=listing_pool.size) as executor:
+                    futures = {
+                        executor.submit(self._scrape_category_with_pool, listing_pool, category,
+                                        limit_per_category, all_urls, link_queue): category
+                        for category in valid_categories
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            self.logger.error(f"爬取 {futures[future]} 類別列表時發生異常: {e}", exc_info=True)
+            finally:
+                listing_pool.log_metrics()
+                listing_pool.close()
+        else:
+            for category in valid_categories:
+                self.scrape_category(self.driver, category, limit_per_category, all_urls, link_queue)
 
-                self.logger.info(f"開始爬取 {category} 類別第 {page} 頁: {url}")
+            # 儲存 cookies (只需儲存一次)
+            self.save_cookies()
 
-                try:
-                    self.driver.get(url)
-
-                    # 等待頁面載入
-                    WebDriverWait(self.driver, 15).until(
-                        EC.presence_of_element_located((By.TAG_NAME, "body"))
-                    )
-
-                    # 最小化人類行為模擬
-                    self.simulate_human_behavior()
-
-                    # 檢查是否成功載入頁面
-                    if "Cloudflare" in self.driver.title:
-                        self.logger.warning(f"{category} 類別檢測到 Cloudflare 挑戰頁面")
-                        time.sleep(10)
-                        if "Cloudflare" in self.driver.title:
-                            continue
-
-                    # 使用 CSS 選擇器加速查詢
-                    article_elements = self.driver.find_elements(By.CSS_SELECTOR, 'h3.title > a')
-                    temp_links = [elem.get_attribute('href') for elem in article_elements]
-
-                    # 清理連結並在內部去重（不影響processed_urls）
-                    valid_links = []
-                    for link in temp_links:
-                        cleaned_link = self.clean_url(link)
-                        # 只在當前收集階段去重，不添加到self.processed_urls
-                        if cleaned_link and cleaned_link not in all_urls:
-                            valid_links.append(cleaned_link)
-                            all_urls.add(cleaned_link)  # 僅添加到臨時集合
-
-                    # 添加到該類別的連結列表
-                    self.article_links[category].extend(valid_links)
-
-                    self.logger.info(f"{category} 類別第 {page} 頁找到 {len(valid_links)} 個有效且未重複的文章連結")
-
-                    # 加入適當延遲，避免被封鎖
-                    time.sleep(random.uniform(1, 3))
+        # 返回是否成功爬取到文章連結
+        return any(len(links) > 0 for links in self.article_links.values())
 
-                    # 如果已經收集到足夠的連結，提前結束
-                    if len(self.article_links[category]) >= limit_per_category:
+    def _scrape_category_with_pool(self, pool, category, limit_per_category, all_urls, link_queue):
+        """從瀏覽器池借出瀏覽器爬取單一類別的列表頁"""
+        driver = pool.checkout()
+        failed = False
+        try:
+            self.scrape_category(driver, category, limit_per_category, all_urls, link_queue)
+            # 每個類別的瀏覽器各自取得 cookies，合併保存供 HTTP 模式使用
+            self.save_cookies(driver)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            pool.checkin(driver, failed=failed)
+
+    def scrape_category(self, driver, category, limit_per_category, all_urls, link_queue=None):
+        """爬取單一類別的列表頁並收集文章連結
+
+        Args:
+            driver: 使用的 WebDriver
+            category (str): 類別名稱
+            limit_per_category (int): 此類別最多收集的文章連結數
+            all_urls (ThreadSafeSet): 跨類別共用的去重集合
+            link_queue (Queue, optional): 即時輸出連結的佇列
+        """
+        if self.resuming and self.article_links.get(category):
+            # 接續執行：沿用檢查點中已收集的連結，序號接續編排，未完成的連結重新交給爬取階段
+            category_links = self.article_links[category]
+            for serial_no, link in enumerate(category_links, start=1):
+                all_urls.add(link)
+                if link_queue is not None and link not in self.processed_urls:
+                    link_queue.put((link, category, serial_no))
+            self.logger.info(f"{category} 類別從檢查點恢復 {len(category_links)} 個連結")
+            if len(category_links) >= limit_per_category:
+                return category_links
+        else:
+            # 清空此類別的連結列表，準備重新收集
+            category_links = []
+            self.article_links[category] = category_links
+
+        # 計算需要爬取的頁數
+        needed_pages = (limit_per_category + self.articles_per_page - 1) // self.articles_per_page
+        self.logger.info(f"類別 {category} 需要爬取 {needed_pages} 頁")
+
+        # 爬取需要的頁數
+        for page in range(1, needed_pages + 1):
+            # 第一頁使用原始URL，後續頁使用分頁URL模板
+            if page == 1:
+                url = self.base_urls[category]
+            else:
+                url = self.page_url_templates[category].format(page=page)
+
+            self.logger.info(f"開始爬取 {category} 類別第 {page} 頁: {url}")
+
+            try:
+                driver.get(url)
+
+                # 等待頁面載入
+                WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
+
+                # 最小化人類行為模擬
+                self.simulate_human_behavior(driver)
+
+                # 檢查是否成功載入頁面
+                if "Cloudflare" in driver.title:
+                    self.logger.warning(f"{category} 類別檢測到 Cloudflare 挑戰頁面")
+                    time.sleep(10)
+                    if "Cloudflare" in driver.title:
+                        continue
+
+                # 使用 CSS 選擇器加速查詢
+                article_elements = driver.find_elements(By.CSS_SELECTOR, 'h3.title > a')
+                temp_links = [elem.get_attribute('href') for elem in article_elements]
+
+                # 清理連結並在內部去重（不影響processed_urls）
+                valid_links = []
+                for link in temp_links:
+                    if len(category_links) >= limit_per_category:
                         break
+                    cleaned_link = self.clean_url(link)
+                    # 只在當前收集階段去重，不添加到self.processed_urls
+                    if cleaned_link and all_urls.add(cleaned_link):
+                        valid_links.append(cleaned_link)
+                        category_links.append(cleaned_link)
+                        # 即時交給文章爬取階段
+                        if link_queue is not None:
+                            link_queue.put((cleaned_link, category, len(category_links)))
 
-                except Exception as e:
-                    self.logger.error(f"爬取 {category} 類別第 {page} 頁時發生錯誤: {e}", exc_info=True)
+                self.logger.info(f"{category} 類別第 {page} 頁找到 {len(valid_links)} 個有效且未重複的文章連結")
 
-            # 確保每個類別只保留所需數量的連結
-            if len(self.article_links[category]) > limit_per_category:
-                self.article_links[category] = self.article_links[category][:limit_per_category]
+                # 如果已經收集到足夠的連結，提前結束
+                if len(category_links) >= limit_per_category:
+                    break
 
-            self.logger.info(f"{category} 類別最終獲取 {len(self.article_links[category])} 個有效且未重複的文章連結")
+                # 加入適當延遲，避免被封鎖（每個類別工作線程各自等待）
+                time.sleep(random.uniform(1, 3))
 
-        # 儲存 cookies (只需儲存一次)
-        self.save_cookies()
+            except Exception as e:
+                self.logger.error(f"爬取 {category} 類別第 {page} 頁時發生錯誤: {e}", exc_info=True)
 
-        # 返回是否成功爬取到文章連結
-        return any(len(links) > 0 for links in self.article_links.values())
+        self.logger.info(f"{category} 類別最終獲取 {len(category_links)} 個有效且未重複的文章連結")
+        # 保存已收集的連結，中斷後不需重新爬取此類別的列表頁
+        self.save_checkpoint()
+        return category_links
+
+    def discover_links(self, categories=None, limit_per_category=5, max_retries=2, parallel=False,
+                       link_queue=None):
+        """爬取列表頁收集文章連結，失敗時使用指數退避策略重試
+
+        若提供 link_queue，結束時會放入 None 作為結束標記
+
+        Returns:
+            bool: 是否成功爬取到文章連結
+        """
+        success = False
+        try:
+            if self.discovery_complete:
+                # 接續執行且列表頁已收集完成，直接以檢查點中的連結作為待爬清單
+                self.logger.info("列表頁已於先前收集完成，沿用檢查點中的連結")
+                if link_queue is not None:
+                    for task in self.frontier_tasks():
+                        if task[0] not in self.processed_urls:
+                            link_queue.put(task)
+                return any(self.article_links.values())
+
+            retry_count = 0
+            wait_time = 5  # 初始等待 5 秒
+
+            while not success and retry_count < max_retries:
+                success = self.scrape_categories(categories, limit_per_category, parallel=parallel,
+                                                 link_queue=link_queue)
+                if not success:
+                    retry_count += 1
+                    self.logger.warning(f"主頁爬取失敗，嘗試重試 ({retry_count}/{max_retries})")
+                    # 指數退避策略
+                    wait_time = min(30, wait_time * 2)  # 最多等待 30 秒
+                    time.sleep(wait_time)
+
+            if success:
+                with self.lock:
+                    self.discovery_complete = True
+                self.save_checkpoint()
+        except Exception as e:
+            self.logger.error(f"收集文章連結時發生錯誤: {e}", exc_info=True)
+        finally:
+            if link_queue is not None:
+                link_queue.put(None)
+        return success
 
     def extract_photo_links(self, category):
         """提取文章中的圖片連結"""
@@ -382,9 +1084,13 @@ class CTSimpleScraper:
             return []
 
     def scrape_article_selenium(self, url, category, serial_no):
-        """使用 Selenium 爬取單篇文章"""
-        # 創建每個線程專屬的WebDriver實例
+        """使用 Selenium 爬取單篇文章
+
+        有瀏覽器池時從池中借出瀏覽器並於結束後歸還，否則建立一次性的瀏覽器
+        """
         local_driver = None
+        pool = self.browser_pool
+        failed = False
 
         try:
             # 使用線程鎖檢查URL和標題是否已經處理過
@@ -393,16 +1099,8 @@ class CTSimpleScraper:
                     self.logger.info(f"跳過已處理的文章URL: {url}")
                     return None
 
-            # 初始化每個線程自己的WebDriver，避免共享問題
-            options = uc.ChromeOptions()
-            if self.headless:
-                options.add_argument("--headless")
-                options.add_argument("--disable-gpu")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--no-sandbox")
-            options.add_argument(f"--user-agent={UserAgent().random}")
-
-            local_driver = uc.Chrome(options=options)
+            # 每個線程使用各自的WebDriver，避免共享問題
+            local_driver = pool.checkout() if pool else self.create_article_driver()
 
             self.logger.info(f"開始爬取文章: {url}")
             local_driver.get(url)
@@ -417,16 +1115,13 @@ class CTSimpleScraper:
             title = title_elem.text.strip() if title_elem else "未找到標題"
 
             # 檢查標題是否已處理過（避免不同URL但內容相同的情況）
-            with self.lock:
-                if title in self.processed_titles:
-                    self.logger.info(f"跳過已處理的文章標題: {title}")
-                    if local_driver:
-                        local_driver.quit()
-                    return None
+            if not self.claim_title(title):
+                self.logger.info(f"跳過已處理的文章標題: {title}")
+                return None
 
-                # 標記URL和標題為已處理
+            # 標記URL為已處理
+            with self.lock:
                 self.processed_urls.add(url)
-                self.processed_titles.add(title)
 
             # 最小化人類行為模擬
             scroll_height = 300
@@ -447,123 +1142,392 @@ class CTSimpleScraper:
             # 提取圖片連結 - 使用local_driver而不是self.driver
             photo_elements = local_driver.find_elements(By.CSS_SELECTOR, 'div.article-body img')
             photo_links = [img.get_attribute('src') for img in photo_elements if img.get_attribute('src')]
-            filtered_links = [link for link in photo_links if
-                              link and not ('gif' in link.lower() or 'ad' in link.lower())]
 
-            # 提取日期用於 item_id
-            date_str = self.extract_date_from_url(url)
+            with self.lock:
+                self.fetch_stats["selenium"] += 1
 
-            # 生成 item_id
-            category_code = self.category_codes.get(category, self.extract_category_from_url(url))
-            item_id = self.generate_item_id(url, date_str, category_code, serial_no)
+            # 保存渲染後的頁面，供離線重新解析
+            if self.html_cache:
+                try:
+                    self.html_cache.store(self.clean_url(url) or url, local_driver.page_source)
+                except Exception as e:
+                    self.logger.warning(f"保存 HTML 快取失敗 {url}: {e}")
 
-            return {
-                "item_id": item_id,
-                "category": category,
+            return self.build_article(url, category, serial_no, {
+                "title": title,
                 "date": date,
                 "author": author,
-                "title": title,
                 "content": content,
-                "link": url,
-                "photo_links": filtered_links
-            }
+                "photo_links": filter_photo_links(photo_links)
+            }, fetch_path="selenium")
         except Exception as e:
+            failed = True
             self.logger.error(f"爬取文章 {url} 失敗: {e}")
+            signal = 'error'
+            if isinstance(e, TimeoutException):
+                # 等不到文章標題時，停在 Cloudflare 挑戰頁面表示被限流，而不是個別頁面過慢
+                signal = 'timeout'
+                try:
+                    if local_driver and is_cloudflare_challenge(local_driver.page_source):
+                        self.logger.warning(f"Selenium 爬取文章 {url} 遇到 Cloudflare 挑戰頁面")
+                        signal = 'throttled'
+                except Exception:
+                    pass
+            self.report_fetch_signal(signal)
             return None
         finally:
-            # 確保每個線程的WebDriver都能被關閉
+            # 歸還到瀏覽器池（失敗時由池做健康檢查），或關閉一次性的WebDriver
             if local_driver:
-                try:
-                    local_driver.quit()
-                except:
-                    pass
+                if pool:
+                    pool.checkin(local_driver, failed=failed)
+                else:
+                    try:
+                        local_driver.quit()
+                    except:
+                        pass
+
+    def frontier_tasks(self, limit_per_category=None):
+        """依待爬清單逐一產生 (連結, 類別, 序號) 任務
+
+        序號預設為連結在類別中的位置；分片爬取時沿用協調端分配的序號
 
-    def scrape_articles(self, limit_per_category=5, use_threading=False, max_workers=4):
+        Args:
+            limit_per_category (int, optional): 每個類別最多產生的任務數
+        """
+        for category, links in self.article_links.items():
+            if limit_per_category is not None:
+                links = links[:limit_per_category]
+            for serial_no, link in enumerate(links, start=1):
+                yield link, category, self.link_serials.get(link, serial_no)
+
+    def assign_frontier(self, tasks):
+        """以預先分配的文章任務作為待爬清單，略過列表頁收集
+
+        Args:
+            tasks (iterable): (連結, 類別, 序號) 任務
+        """
+        self.article_links = {}
+        self.link_serials = {}
+        for link, category, serial_no in tasks:
+            self.article_links.setdefault(category, []).append(link)
+            self.link_serials[link] = serial_no
+        self.discovery_complete = True
+
+    def discover_frontier(self, categories=None, limit_per_category=5, max_retries=2, parallel=False,
+                          output_dir=None):
+        """只爬取列表頁，返回完整的文章任務列表，供分片爬取時由協調端統一分配
+
+        Returns:
+            list: (連結, 類別, 序號) 任務，失敗時為空列表
+        """
+        self.output_dir = output_dir or os.path.join(os.getcwd(), "output", datetime.now().strftime('%Y%m%d_%H%M_%S'))
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.logger = setup_logger(self.output_dir)
+        try:
+            # 並行爬取列表頁時各類別使用瀏覽器池，不需啟動主瀏覽器
+            if not parallel:
+                self.setup_driver()
+            self.load_recent_cookies()
+            if not self.discover_links(categories, limit_per_category, max_retries, parallel=parallel):
+                return []
+            return list(self.frontier_tasks(limit_per_category))
+        finally:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
+
+    def scrape_articles(self, limit_per_category=5, use_threading=False, max_workers=4, link_queue=None):
         """爬取每個類別的文章內容
 
         Args:
             limit_per_category (int): 每個類別最多爬取的文章數量
             use_threading (bool): 是否使用多線程處理
             max_workers (int): 最大線程數量
+            link_queue (Queue, optional): 若提供，從佇列中邊收集邊爬取，直到取得 None 結束標記
 
         Returns:
             bool: 是否成功爬取到文章
         """
-        results = []
+        if link_queue is not None:
+            # 連結由列表頁爬取階段即時提供
+            all_tasks = iter(link_queue.get, None)
+        else:
+            # 準備所有需要爬取的連結及對應資訊
+            all_tasks = list(self.frontier_tasks(limit_per_category))
+
+        # 自適應並行數：以使用者設定的線程數為起點 (不超過上限)，依延遲與錯誤率在上限內自動調整
+        worker_slots = max_workers if use_threading else 1
+        if use_threading and self.adaptive_concurrency:
+            self.concurrency = AdaptiveConcurrency(
+                initial=min(max_workers, self.adaptive_max_workers),
+                maximum=self.adaptive_max_workers,
+                logger=self.logger
+            )
+            worker_slots = self.concurrency.maximum
+            self.logger.info(f"啟用自適應並行數，初始 {self.concurrency.limit}，上限 {worker_slots}")
+
+        # HTTP 模式使用與線程數相同大小的連線池
+        if self.fetch_mode == 'http':
+            self.setup_http_session(pool_size=worker_slots)
+
+        # 每個工作線程對應一個暖機的瀏覽器，單線程模式則重複使用同一個瀏覽器
+        # 瀏覽器在首次借出時才建立，HTTP 模式下只有退回 Selenium 時才會啟動
+        self.browser_pool = BrowserPool(
+            self.create_article_driver,
+            size=worker_slots,
+            max_pages_per_driver=self.driver_max_pages,
+            logger=self.logger
+        )
 
-        if use_threading:
-            self.logger.info(f"使用多線程進行文章爬取，最大線程數: {max_workers}")
+        try:
+            if self.fetch_mode == 'async':
+                self.scrape_articles_async(all_tasks, use_threading, max_workers)
+            else:
+                if use_threading:
+                    self.logger.info(f"使用多線程進行文章爬取，最大線程數: {max_workers}")
+                self._scrape_tasks(all_tasks, self.scrape_article, use_threading, max_workers)
+        finally:
+            self.browser_pool.log_metrics()
+            self.browser_pool.close()
+            self.browser_pool = None
+            if self.http_session:
+                self.http_session.close()
+                self.http_session = None
+            if self.concurrency is not None:
+                self.concurrency.log_summary()
+                self.concurrency = None
+            self.log_fetch_stats()
+
+        # 接續執行時，檢查點之前完成的文章也算在內
+        return self.result_count > 0
+
+    def checkpoint_state(self):
+        """取得目前的爬取進度"""
+        with self.lock:
+            return {
+                "result_file": self.result_file,
+                "discovery_complete": self.discovery_complete,
+                "frontier": {category: list(links) for category, links in self.article_links.items()},
+                "link_serials": dict(self.link_serials),
+                "processed_urls": sorted(self.processed_urls),
+                "processed_titles": sorted(self.processed_titles),
+                "completed_ids": sorted(self.completed_ids),
+            }
 
-            # 準備所有需要爬取的連結及對應資訊
-            all_tasks = []
-            for category, links in self.article_links.items():
-                if not links:
-                    continue
+    def save_checkpoint(self):
+        """將目前的爬取進度寫入檢查點"""
+        if self.checkpoint is None:
+            return
+        try:
+            self.checkpoint.save(self.checkpoint_state())
+        except Exception as e:
+            self.logger.error(f"保存檢查點時發生錯誤: {e}", exc_info=True)
 
-                category_links = links[:limit_per_category]
-                for i, link in enumerate(category_links):
-                    all_tasks.append((link, category, i + 1))
-
-            # 使用線程池並行處理
-            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # 建立任務字典，將每個任務映射到相應的 future 對象
-                future_to_url = {
-                    executor.submit(self.scrape_article_selenium, link, category, serial_no): (
-                        link, category, serial_no)
-                    for link, category, serial_no in all_tasks
-                }
-
-                # 收集結果
-                for future in concurrent.futures.as_completed(future_to_url):
-                    link, category, serial_no = future_to_url[future]
-                    try:
-                        article_data = future.result()
-                        if article_data:
-                            with self.lock:  # 使用鎖保護對results的訪問
-                                results.append(article_data)
-                            self.logger.info(f"成功爬取 {category} 類別的文章: {article_data['title']}")
-                    except Exception as e:
-                        self.logger.error(f"爬取文章 {link} 時發生異常: {e}")
-        else:
-            # 原有的單線程處理邏輯
-            for category, links in self.article_links.items():
-                if not links:
-                    continue
+    def restore_checkpoint(self):
+        """從檢查點與既有結果檔案恢復爬取進度
 
-                self.logger.info(f"開始爬取 {category} 類別的文章")
-                category_links = links[:limit_per_category]
+        檢查點只會定期保存，最後一次保存後寫入的文章以結果檔案為準補回
 
-                for i, link in enumerate(category_links):
-                    # 嘗試爬取文章
-                    article_data = self.scrape_article_selenium(link, category, i + 1)
-                    if article_data:
-                        results.append(article_data)
-                        self.logger.info(f"成功爬取 {category} 類別的文章: {article_data['title']}")
+        Returns:
+            bool: 是否成功恢復
+        """
+        state = self.checkpoint.load() if self.checkpoint else None
+        if not state:
+            return False
 
-                    # 增加隨機等待時間，避免被封鎖
-                    time.sleep(random.uniform(1, 3))
+        self.article_links = {category: list(links) for category, links in state.get("frontier", {}).items()}
+        self.link_serials = dict(state.get("link_serials", {}))
+        self.discovery_complete = state.get("discovery_complete", False)
+        self.processed_urls = set(state.get("processed_urls", []))
+        self.processed_titles = set(state.get("processed_titles", []))
+        self.completed_ids = set(state.get("completed_ids", []))
+
+        result_file = state.get("result_file")
+        self.result_count = 0
+        if result_file and os.path.exists(result_file):
+            for article in iter_articles(result_file):
+                self.processed_urls.add(article.get("link"))
+                self.processed_titles.add(article.get("title"))
+                self.completed_ids.add(article.get("item_id"))
+                self.result_count += 1
+                # 重建近似重複索引，只收錄非重複的文章作為比對來源
+                fingerprint = parse_fingerprint(article.get("simhash"))
+                if self.near_duplicate_index is not None and fingerprint is not None \
+                        and not article.get("duplicate_of"):
+                    self.near_duplicate_index.add(article.get("item_id"), fingerprint)
+            # 接續追加到原本的結果檔案
+            self.result_file = result_file
+            self.result_writer = JsonlResultWriter(result_file)
+        else:
+            self.open_result_writer()
 
-        self.results.extend(results)
-        return len(results) > 0
+        self.resuming = True
+        self.resumed_count = self.result_count
+        self.logger.info(
+            f"已從檢查點恢復: 已完成 {self.result_count} 篇文章, 待爬清單 "
+            f"{sum(len(links) for links in self.article_links.values())} 個連結, "
+            f"列表頁{'已' if self.discovery_complete else '未'}收集完成")
+        return True
 
     def save_results(self):
-        """將結果保存到JSON文件"""
-        if not self.results:
+        """完成結果檔案的寫入
+
+        文章在爬取時已逐篇寫入 JSONL 檔案，此處只需關閉檔案
+        """
+        if self.result_writer is not None:
+            self.result_writer.close()
+
+        if not self.result_count:
             self.logger.warning("沒有結果可保存")
             return False
 
-        filename = os.path.join(self.output_dir, f"ct_articles_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        self.logger.info(f"{self.result_count} 篇文章已保存到: {self.result_file}")
+        return True
+
+    def _nlp_worker(self, article_queue, get_processor, analysis_writer):
+        """管線模式的 NLP 工作線程，分析佇列中的文章直到取得 None 結束標記
+
+        每次取出佇列中已有的文章 (最多 batch_articles 篇) 一起批次分析，佇列為空時不等待湊滿；
+        分析結果逐篇寫入 analysis_writer，不保留在記憶體中
+        """
+        processor = None
+        for article in iter(article_queue.get, None):
+            try:
+                if processor is None:
+                    processor = get_processor()
+            except Exception as e:
+                self.logger.error(f"載入 NLP 模型時發生錯誤: {e}", exc_info=True)
+                continue
+
+            batch = [article]
+            finished = False
+            while len(batch) < processor.batch_articles:
+                try:
+                    article = article_queue.get_nowait()
+                except Empty:
+                    break
+                if article is None:
+                    finished = True
+                    break
+                batch.append(article)
+
+            try:
+                for analysis in processor.dispatch_article_batch(batch):
+                    analysis_writer.write(analysis)
+            except Exception as e:
+                self.logger.error(f"分析 {len(batch)} 篇文章時發生錯誤: {e}", exc_info=True)
+            if finished:
+                return
+
+    def _requeue_resumed_articles(self, article_queue):
+        """將接續執行前已寫入結果檔案的文章重新交給 NLP 工作線程"""
+        for article in islice(iter_articles(self.result_file), self.resumed_count):
+            if not article.get("duplicate_of"):
+                article_queue.put(article)
+
+    def run_pipeline(self, categories=None, limit_per_category=5, max_retries=2, use_threading=False,
+                     max_workers=4):
+        """以管線方式執行列表頁收集、文章爬取與 NLP 分析
+
+        三個階段同時運行，以有界佇列串接：列表頁找到的連結交給爬取工作線程，
+        爬取完成的文章交給 NLP 工作線程。下游處理不及時佇列會填滿並阻塞上游，
+        總耗時趨近於最慢的階段而非各階段相加。
+
+        Returns:
+            bool: 是否成功完成
+        """
+        link_queue = Queue(maxsize=self.pipeline_queue_size)
+        article_queue = Queue(maxsize=self.pipeline_queue_size)
+
+        # 逐篇分析結果先寫入暫存檔，NLP 階段結束後再逐篇讀回彙整，文章數多時也不需全部保留在記憶體中
+        analyses_path = os.path.join(self.output_dir, PIPELINE_ANALYSES_FILE)
+        if os.path.exists(analyses_path):
+            os.remove(analyses_path)
+        analysis_writer = JsonlResultWriter(analyses_path)
+
+        # NLP 模型由第一個取得文章的工作線程載入，載入期間不會延誤列表頁與文章爬取；
+        # CKIP 模型名額也在此時才取得，管線結束時歸還
+        processor_lock = threading.Lock()
+        processors = []
+        nlp_hold = contextlib.ExitStack()
+
+        def get_processor():
+            with processor_lock:
+                if not processors:
+                    nlp_hold.enter_context(self.nlp_resource())
+                    processors.append(CTTextProcessor(self.output_dir))
+                return processors[0]
+
+        # 使用多程序 NLP 工作池時，每個工作線程等待一個工作程序，線程數至少與程序數相同
+        nlp_threads_count = max(1, self.nlp_workers, nlp_setting('PROCESS_WORKERS', 0) or 0)
+        self.logger.info(
+            f"使用管線模式，佇列容量 {self.pipeline_queue_size}，NLP 工作線程 {nlp_threads_count}")
+
+        discovery_thread = threading.Thread(
+            target=self.discover_links,
+            args=(categories, limit_per_category, max_retries),
+            kwargs={"parallel": use_threading, "link_queue": link_queue},
+            daemon=True
+        )
+        nlp_threads = [
+            threading.Thread(target=self._nlp_worker, args=(article_queue, get_processor, analysis_writer),
+                             daemon=True)
+            for _ in range(nlp_threads_count)
+        ]
+
+        discovery_thread.start()
+        for thread in nlp_threads:
+            thread.start()
+
+        # 接續執行時，先前已寫入結果檔案的文章也需要分析，才能得到完整的統計
+        resumed_thread = None
+        if self.resumed_count:
+            resumed_thread = threading.Thread(
+                target=self._requeue_resumed_articles, args=(article_queue,), daemon=True)
+            resumed_thread.start()
+
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(self.results, f, ensure_ascii=False, indent=2)
-            self.logger.info(f"結果已保存到: {filename}")
-            return True
-        except Exception as e:
-            self.logger.error(f"保存結果時發生錯誤: {e}", exc_info=True)
-            return False
+            with nlp_hold:
+                try:
+                    self.article_sink = article_queue.put
+                    try:
+                        articles_success = self.scrape_articles(limit_per_category, use_threading, max_workers,
+                                                                link_queue=link_queue)
+                    finally:
+                        self.article_sink = None
+                        if resumed_thread is not None:
+                            resumed_thread.join()
+
+                    discovery_thread.join()
+
+                    if not any(self.article_links.values()):
+                        self.logger.error("主頁爬取失敗，已達最大重試次數，終止程序")
+                        return False
+
+                    if not articles_success:
+                        self.logger.error("文章爬取失敗，終止程序")
+                        return False
+
+                    # 保存結果，同時 NLP 工作線程可能仍在處理佇列中剩餘的文章
+                    self.save_results()
+                finally:
+                    # 不論成功與否都通知並等待 NLP 工作線程結束，模型名額歸還前不會仍有線程在使用模型
+                    for _ in nlp_threads:
+                        article_queue.put(None)
+                    for thread in nlp_threads:
+                        thread.join()
+                    analysis_writer.close()
+
+                self.logger.info(f"NLP 階段完成，共分析 {analysis_writer.count} 篇文章")
+                processor = get_processor()
+                processor.process_article_analyses(iter_articles(analyses_path))
+                return True
+        finally:
+            if os.path.exists(analyses_path):
+                os.remove(analyses_path)
 
     def run(self, categories=None, limit_per_category=5, max_retries=2, use_threading=False, max_workers=4,
-            output_dir=None):
+            output_dir=None, pipeline=False, resume=False, frontier=None):
         """運行爬蟲流程
 
         Args:
@@ -573,6 +1537,9 @@ class CTSimpleScraper:
             use_threading (bool): 是否使用多線程爬取文章
             max_workers (int): 多線程模式下的最大線程數
             output_dir (str): 輸出目錄，默認使用當前日期時間
+            pipeline (bool): 是否以管線方式同時進行列表頁收集、文章爬取與 NLP 分析
+            resume (bool): 是否從輸出目錄中的檢查點接續先前中斷的執行
+            frontier (list, optional): 預先分配的 (連結, 類別, 序號) 任務，提供時不爬取列表頁 (分片爬取使用)
 
         Returns:
             bool: 爬蟲是否成功完成
@@ -581,6 +1548,11 @@ class CTSimpleScraper:
             # 每次執行時重置已處理 URL 和標題集合
             self.processed_urls = set()
             self.processed_titles = set()
+            self.completed_ids = set()
+            self.link_serials = {}
+            self.discovery_complete = False
+            self.resuming = False
+            self.resumed_count = 0
 
             # 設置輸出目錄
             if output_dir is None:
@@ -594,42 +1566,65 @@ class CTSimpleScraper:
             self.logger = setup_logger(output_dir)
             self.logger.info(f"爬蟲輸出目錄: {output_dir}")
 
-            # 設置 WebDriver
-            self.setup_driver()
+            # 建立檢查點；接續執行時恢復進度並追加到原本的結果檔案，否則建立新的結果檔案
+            self.checkpoint = ScrapeCheckpoint(output_dir)
+            if not (resume and self.restore_checkpoint()):
+                if resume:
+                    self.logger.warning("找不到可用的檢查點，重新開始爬取")
+                self.open_result_writer()
+                if frontier is not None:
+                    self.assign_frontier(frontier)
+                    self.logger.info(f"使用預先分配的待爬清單，共 {len(self.link_serials)} 個連結")
+            self.save_checkpoint()
+
+            # 設置 WebDriver；多線程模式的列表頁使用瀏覽器池，預先分配待爬清單時不爬取列表頁，都不需要主瀏覽器
+            if frontier is None and not use_threading:
+                self.setup_driver()
 
             # 嘗試載入已有的 cookies
             self.load_recent_cookies()
 
-            # 爬取多個類別的主頁，使用指數退避策略
-            success = False
-            retry_count = 0
-            wait_time = 5  # 初始等待 5 秒
-
-            while not success and retry_count < max_retries:
-                success = self.scrape_categories(categories,limit_per_category)
-                if not success:
-                    retry_count += 1
-                    self.logger.warning(f"主頁爬取失敗，嘗試重試 ({retry_count}/{max_retries})")
-                    # 指數退避策略
-                    wait_time = min(30, wait_time * 2)  # 最多等待 30 秒
-                    time.sleep(wait_time)
+            if pipeline:
+                return self.run_pipeline(categories, limit_per_category, max_retries, use_threading, max_workers)
+
+            if use_threading:
+                # 多線程模式：各類別列表頁並行爬取，找到的連結即時交給文章爬取階段
+                link_queue = Queue()
+                discovery_thread = threading.Thread(
+                    target=self.discover_links,
+                    args=(categories, limit_per_category, max_retries),
+                    kwargs={"parallel": True, "link_queue": link_queue},
+                    daemon=True
+                )
+                discovery_thread.start()
+                articles_success = self.scrape_articles(limit_per_category, use_threading, max_workers,
+                                                        link_queue=link_queue)
+                discovery_thread.join()
+
+                if not any(self.article_links.values()):
+                    self.logger.error("主頁爬取失敗，已達最大重試次數，終止程序")
+                    return False
+            else:
+                # 爬取多個類別的主頁，使用指數退避策略
+                if not self.discover_links(categories, limit_per_category, max_retries):
+                    self.logger.error("主頁爬取失敗，已達最大重試次數，終止程序")
+                    return False
 
-            if not success:
-                self.logger.error("主頁爬取失敗，已達最大重試次數，終止程序")
-                return False
+                articles_success = self.scrape_articles(limit_per_category, use_threading, max_workers)
 
-            # 使用 Selenium 爬取文章，可選擇是否使用多線程
-            if not self.scrape_articles(limit_per_category, use_threading, max_workers):
+            if not articles_success:
                 self.logger.error("文章爬取失敗，終止程序")
                 return False
 
             # 保存結果
             self.save_results()
 
-            # 處理關鍵詞分析
+            # 處理關鍵詞分析，從結果檔案逐篇讀取，不需把全部文章載入記憶體；近似重複的文章不重複分析
             self.logger.info("開始文本處理與分析")
-            processor = CTTextProcessor(self.output_dir)
-            processor.process_articles(self.results)
+            with self.nlp_resource():
+                processor = CTTextProcessor(self.output_dir)
+                processor.process_articles(
+                    article for article in iter_articles(self.result_file) if not article.get("duplicate_of"))
 
             return True
 
@@ -641,6 +1636,10 @@ class CTSimpleScraper:
             return False
 
         finally:
+            if self.result_writer is not None:
+                self.result_writer.close()
+            self.save_checkpoint()
+
             # 關閉瀏覽器
             if self.driver:
                 self.driver.quit()
@@ -654,8 +1653,19 @@ class CTTextProcessor:
     用於對爬取的新聞進行斷詞分析與預處理，使用中研院 CKIP 斷詞工具
     """
 
-    def __init__(self, output_dir):
-        """初始化文本處理器，使用中研院斷詞套件"""
+    def __init__(self, output_dir, batch_size=None, max_length=None, batch_articles=None, result_cache=None,
+                 process_workers=None):
+        """初始化文本處理器，使用中研院斷詞套件
+
+        Args:
+            output_dir (str): 輸出目錄
+            batch_size (int, optional): 每次模型推論的句段數，預設使用 NLP_SETTINGS['BATCH_SIZE']
+            max_length (int, optional): 每個句段的最大字數，預設使用 NLP_SETTINGS['MAX_LENGTH']
+            batch_articles (int, optional): 一起送入模型的文章數，預設使用 NLP_SETTINGS['BATCH_ARTICLES']
+            result_cache (NlpResultCache, optional): NLP 結果快取，預設使用 NLP_SETTINGS 設定的共用快取，False 表示不使用
+            process_workers (int, optional): NLP 工作程序數，大於 1 時以多個程序平行分析，
+                預設使用 NLP_SETTINGS['PROCESS_WORKERS']
+        """
         self.logger = logging.getLogger("scraper.processor")
         self.stop_words = set()
         self.output_dir = output_dir  # 儲存輸出目錄
@@ -663,21 +1673,27 @@ class CTTextProcessor:
         self.target_pos = {'Na', 'Nb', 'Nc'}
         # 最短關鍵字長度限制
         self.min_keyword_length = 2
-
-        # 初始化中研院斷詞工具
-        try:
-            from ckip_transformers.nlp import CkipWordSegmenter, CkipPosTagger, CkipNerChunker
-            self.logger.info("使用中研院 CKIP Transformers 進行斷詞")
-            # 使用 albert-tiny 模型以提高效能
-            self.ws = CkipWordSegmenter(model="albert-tiny")
-            self.pos = CkipPosTagger(model="albert-tiny")
-            self.ner = CkipNerChunker(model="albert-tiny")
-        except ImportError:
-            self.logger.warning("未安裝中研院斷詞套件，使用簡易分詞模式")
+        # 批次推論設定
+        self.batch_size = batch_size or nlp_setting('BATCH_SIZE', 32)
+        self.max_length = max_length or nlp_setting('MAX_LENGTH', 256)
+        self.batch_articles = batch_articles or nlp_setting('BATCH_ARTICLES', 32)
+        # 多程序分析設定，工作池在第一次使用時才啟動
+        self.process_workers = nlp_setting('PROCESS_WORKERS', 0) if process_workers is None else process_workers
+        self.torch_threads = nlp_setting('TORCH_THREADS')
+
+        # 中研院斷詞工具由程序內共用的模型登錄載入，同一程序只載入一次
+        models = get_ckip_models()
+        if models is not None:
+            self.ws, self.pos, self.ner = models
+        else:
             self.ws = None
             self.pos = None
             self.ner = None
 
+        # 相同內容的文章直接使用快取的模型輸出；句段長度會影響結果，一併納入模型版本
+        self.result_cache = get_result_cache() if result_cache is None else (result_cache or None)
+        self.model_version = f"{ckip_model_version()}:{self.max_length}"
+
         # 載入停用詞
         self.load_stop_words()
 
@@ -730,37 +1746,233 @@ class CTTextProcessor:
                 return [(w, 'Na') for w in words if
                         w and len(w) >= self.min_keyword_length and w not in self.stop_words]
 
-            # 使用中研院斷詞
-            ws_results = self.ws([text])
-            pos_results = self.pos(ws_results)
-
-            # 合併結果
-            words = ws_results[0]
-            pos_tags = pos_results[0]
-
-            # 過濾停用詞、指定詞性及長度
-            filtered_words = []
-            for w, p in zip(words, pos_tags):
-                # 僅保留指定詞性(Na,Nb,Nc)、長度>=2且不在停用詞表的詞
-                if (w.strip() and
-                        w not in self.stop_words and
-                        p in self.target_pos and
-                        len(w) >= self.min_keyword_length):
-                    filtered_words.append((w, p))  # 保留詞性標籤
-
-            return filtered_words
+            # 使用中研院斷詞，長文本切分為句段分批處理
+            chunks = [chunk.text for chunk in self.split_chunks(text)]
+            ws_results = self._run_bucketed(self.ws, chunks)
+            pos_results = self._run_bucketed(self.pos, ws_results)
+
+            # 合併結果並過濾
+            words = [word for chunk_words in ws_results for word in chunk_words]
+            pos_tags = [tag for chunk_pos in pos_results for tag in chunk_pos]
+            return self._filter_words(words, pos_tags)
         except Exception as e:
             self.logger.error(f"斷詞失敗: {e}")
             return []
 
-    def identify_named_entities(self, text):
+    def _filter_words(self, words, pos_tags):
+        """過濾停用詞、指定詞性及長度，返回 (詞, 詞性) 列表"""
+        filtered_words = []
+        for w, p in zip(words, pos_tags):
+            # 僅保留指定詞性(Na,Nb,Nc)、長度>=2且不在停用詞表的詞
+            if (w.strip() and
+                    w not in self.stop_words and
+                    p in self.target_pos and
+                    len(w) >= self.min_keyword_length):
+                filtered_words.append((w, p))  # 保留詞性標籤
+        return filtered_words
+
+    def split_chunks(self, text):
+        """將文本依中文句子標點切分為不超過 max_length 字的句段
+
+        Args:
+            text (str): 文本
+
+        Returns:
+            list: TextChunk 列表，記錄每個句段在原文中的位置
+        """
+        return list(chunk_text(text or "", self.max_length))
+
+    def _run_bucketed(self, driver, inputs):
+        """依長度排序後分批呼叫模型，每批只補齊到該批最長的句段，結果按原順序返回"""
+        results = [None] * len(inputs)
+        order = sorted(range(len(inputs)), key=lambda i: sum(len(x) for x in inputs[i]))
+        for start in range(0, len(order), self.batch_size):
+            indices = order[start:start + self.batch_size]
+            outputs = driver([inputs[i] for i in indices], batch_size=self.batch_size,
+                             max_length=self.max_length, show_progress=False)
+            for i, output in zip(indices, outputs):
+                results[i] = output
+        return results
+
+    def analyze_article_batch(self, articles):
+        """批次分析多篇文章的關鍵詞與命名實體
+
+        所有文章切分為句段後一起送入模型，並依長度分組減少補齊，
+        結果再依來源文章拆回，格式與 analyze_article 相同
+
+        Args:
+            articles (list): 文章字典列表
+
+        Returns:
+            list: 每篇文章的分析結果，順序與輸入相同
+        """
+        if self.ws is None or self.pos is None or self.ner is None:
+            return [self.analyze_article(article) for article in articles]
+
+        contents = [article.get("content", "") or "" for article in articles]
+        keys = [cache_key(content, self.model_version) for content in contents]
+        cached = self.result_cache.get_many(keys) if self.result_cache is not None else {}
+
+        # 未命中快取的文章，相同內容只分析一次
+        pending = {}
+        for key, content in zip(keys, contents):
+            if key not in cached and key not in pending and content.strip():
+                pending[key] = content
+
+        if pending:
+            try:
+                computed = self._analyze_raw(list(pending.values()))
+            except Exception as e:
+                self.logger.error(f"批次分析 {len(articles)} 篇文章失敗，改為逐篇分析: {e}", exc_info=True)
+                return [self.analyze_article(article) for article in articles]
+            computed = dict(zip(pending.keys(), computed))
+            if self.result_cache is not None:
+                self.result_cache.put_many(computed)
+            cached.update(computed)
+
+        self.logger.debug(f"NLP 快取命中 {len(articles) - len(pending)}/{len(articles)} 篇文章")
+
+        analyses = []
+        for article, key, content in zip(articles, keys, contents):
+            raw = cached.get(key, {"ws": [], "pos": [], "ner": []})
+            # 快取的實體位置相對於去除前導空白後的內容
+            lead = len(content) - len(content.lstrip())
+            analyses.append({
+                "item_id": article.get("item_id", ""),
+                "title": article.get("title", "未知標題"),
+                "category": article.get("category", "未知"),
+                "has_content": bool(content),
+                "words_with_pos": self._filter_words(raw["ws"], raw["pos"]),
+                "named_entities": [{'entity': word, 'entity_type': entity_type, 'offset': [start + lead, end + lead]}
+                                   for word, entity_type, start, end in raw["ner"]]
+            })
+        return analyses
+
+    def _analyze_raw(self, contents):
+        """以模型批次分析多段內容，返回未過濾的斷詞、詞性與命名實體，格式與 NLP 結果快取相同
+
+        Args:
+            contents (list): 文章內容
+
+        Returns:
+            list: 每段內容的 {"ws": 詞列表, "pos": 詞性列表, "ner": [[實體, 類型, 起始, 結束], ...]}，
+                  實體位置相對於去除前導空白後的內容
+        """
+        contents = [content.strip() for content in contents]
+        chunks = []
+        owners = []
+        for index, content in enumerate(contents):
+            for chunk in self.split_chunks(content):
+                chunks.append(chunk)
+                owners.append(index)
+
+        results = [{"ws": [], "pos": [], "ner": []} for _ in contents]
+        if not chunks:
+            return results
+
+        texts = [chunk.text for chunk in chunks]
+        ws_results = self._run_bucketed(self.ws, texts)
+        pos_results = self._run_bucketed(self.pos, ws_results)
+        ner_results = self._run_bucketed(self.ner, texts)
+
+        for owner, chunk, chunk_words, chunk_pos, chunk_entities in zip(owners, chunks, ws_results, pos_results,
+                                                                       ner_results):
+            results[owner]["ws"].extend(chunk_words)
+            results[owner]["pos"].extend(chunk_pos)
+            # 實體位置由句段內的位置換算為在內容中的位置
+            results[owner]["ner"].extend([entity.word, entity.ner, *to_source_offset(chunk, entity.idx)]
+                                         for entity in chunk_entities)
+        return results
+
+    @property
+    def pool(self):
+        """多程序 NLP 工作池，process_workers 不大於 1 時為 None"""
+        if not self.process_workers or self.process_workers <= 1:
+            return None
+        return get_nlp_pool(self.process_workers, self.torch_threads)
+
+    def pool_config(self):
+        """傳給工作程序的處理設定，工作程序依此建立相同設定的文本處理器"""
+        return {
+            'batch_size': self.batch_size,
+            'max_length': self.max_length,
+            'result_cache': self.result_cache is not None,
+            'stop_words': self.stop_words,
+            'target_pos': self.target_pos,
+            'min_keyword_length': self.min_keyword_length,
+        }
+
+    def dispatch_article_batch(self, articles):
+        """批次分析多篇文章，設定了多程序工作池時交給工作程序分析，否則在目前程序內分析
+
+        Args:
+            articles (list): 文章字典列表
+
+        Returns:
+            list: 每篇文章的分析結果，順序與輸入相同
+        """
+        pool = self.pool
+        if pool is None:
+            return self.analyze_article_batch(articles)
+        return pool.analyze(articles, self.pool_config())
+
+    def aggregate_in_pool(self, articles, write_terms=False):
+        """以多程序工作池分析並統計文章
+
+        工作程序分析每批文章後直接統計關鍵詞與命名實體，主程序只需依批次順序合併統計，
+        斷詞、詞性、命名實體與統計迴圈都分散到多個核心上執行
+
+        Args:
+            articles (iterable): 文章，可為逐篇讀取的迭代器
+            write_terms (bool): 是否同時輸出每篇文章的關鍵詞與命名實體 (article_terms.jsonl)
+
+        Returns:
+            dict: 與 analyze_articles 相同格式的分析結果
+        """
+        counters = AnalysisCounters()
+        terms_file = open(os.path.join(self.output_dir, ARTICLE_TERMS_FILE), 'w', encoding='utf-8') \
+            if write_terms else None
+        try:
+            for batch_counters, batch_terms in self.pool.aggregate(articles, self.batch_articles,
+                                                                   self.pool_config()):
+                counters.merge(batch_counters)
+                if terms_file is not None:
+                    for record in batch_terms:
+                        terms_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        finally:
+            if terms_file is not None:
+                terms_file.close()
+
+        self.logger.info(f"{self.process_workers} 個 NLP 工作程序共分析 {counters.total_articles} 篇文章")
+        return counters.result()
+
+    def iter_article_analyses(self, articles):
+        """每 batch_articles 篇文章批次分析一次，逐篇產生分析結果
+
+        Args:
+            articles (iterable): 文章，可為逐篇讀取的迭代器
+
+        Yields:
+            dict: 與 analyze_article 格式相同的單篇分析結果
+        """
+        articles = iter(articles)
+        while True:
+            group = list(islice(articles, self.batch_articles))
+            if not group:
+                return
+            yield from self.analyze_article_batch(group)
+
+    def identify_named_entities(self, text, with_offsets=False):
         """識別文本中的命名實體
 
         Args:
             text (str): 文本內容
+            with_offsets (bool): 是否返回與 analyze_article_batch 相同格式的實體字典，
+                位置為實體在 text 中的 [起始, 結束]
 
         Returns:
-            list: 命名實體列表
+            list: 命名實體列表 (CKIP NerToken，或 with_offsets 時的
+                  {'entity', 'entity_type', 'offset'} 字典)
         """
         try:
             if self.ner is None:
@@ -771,10 +1983,18 @@ class CTTextProcessor:
             if not text or len(text.strip()) == 0:
                 return []
 
-            # 使用CKIP進行命名實體識別
-            ner_results = self.ner([text])
-            self.logger.info(f"識別出 {len(ner_results[0])} 個命名實體")
-            return ner_results[0]
+            # 使用CKIP進行命名實體識別，長文本切分為句段分批處理
+            chunks = self.split_chunks(text)
+            ner_results = self._run_bucketed(self.ner, [chunk.text for chunk in chunks])
+            if with_offsets:
+                # 實體位置由句段內的位置換算為在原文中的位置
+                entities = [{'entity': entity.word, 'entity_type': entity.ner,
+                             'offset': list(to_source_offset(chunk, entity.idx))}
+                            for chunk, chunk_entities in zip(chunks, ner_results) for entity in chunk_entities]
+            else:
+                entities = [entity for chunk_entities in ner_results for entity in chunk_entities]
+            self.logger.info(f"識別出 {len(entities)} 個命名實體")
+            return entities
         except Exception as e:
             self.logger.error(f"命名實體識別失敗: {e}", exc_info=True)
             return []
@@ -788,50 +2008,7 @@ class CTTextProcessor:
         Returns:
             dict: 按類別組織的命名實體統計
         """
-        # 按類別分組
-        category_articles = defaultdict(list)
-        for article in articles:
-            category = article.get("category", "未知")
-            category_articles[category].append(article)
-
-        # 存儲每個類別的命名實體與詞頻結果
-        category_entities = {}
-
-        # 對每個類別進行分析
-        for category, category_data in category_articles.items():
-            self.logger.info(f"分析 {category} 類別的 {len(category_data)} 篇文章命名實體")
-
-            # 合併該類別所有文章內容
-            category_text = ""
-            for article in category_data:
-                category_text += article.get("content", "") + "\n"
-
-            # 使用CKIP NER分析
-            named_entities = self.identify_named_entities(category_text)
-
-            # 統計實體頻率
-            entity_freq = defaultdict(int)
-            entity_type_map = {}  # 記錄每個實體的類型
-
-            for entity in named_entities:
-                entity_key = f"{entity.word}_{entity.ner}"  # 使用實體+類型作為唯一鍵
-                entity_freq[entity_key] += 1
-                entity_type_map[entity_key] = {"entity": entity.word, "type": entity.ner}
-
-            # 轉換為排序列表
-            entities_with_freq = []
-            for entity_key, freq in sorted(entity_freq.items(), key=lambda x: x[1], reverse=True):
-                entity_info = entity_type_map[entity_key]
-                entities_with_freq.append({
-                    "entity": entity_info["entity"],
-                    "entity_type": entity_info["type"],
-                    "frequency": freq,
-                    "category": category
-                })
-
-            category_entities[category] = entities_with_freq
-
-        return category_entities
+        return self.analyze_articles(articles).get("category_entities_stats", {})
 
     def extract_keywords(self, words_with_pos, topK=20):
         """根據詞性和詞頻提取關鍵詞
@@ -864,123 +2041,124 @@ class CTTextProcessor:
         Returns:
             dict: 按類別組織的關鍵詞統計
         """
-        # 按類別分組
-        category_articles = defaultdict(list)
-        for article in articles:
-            category = article.get("category", "未知")
-            category_articles[category].append(article)
-
-        # 存儲每個類別的關鍵詞與詞頻結果
-        category_keywords = {}
-
-        # 對每個類別進行分析
-        for category, category_data in category_articles.items():
-            self.logger.info(f"分析 {category} 類別的 {len(category_data)} 篇文章")
-
-            # 合併該類別所有文章內容
-            category_text = ""
-            for article in category_data:
-                category_text += article.get("content", "") + "\n"
-
-            # 使用CKIP斷詞與詞性標註 (已篩選符合條件的詞)
-            segmented_words_with_pos = self.segment_text(category_text)
-
-            # 統計詞性與頻率
-            word_pos_freq = defaultdict(int)
-            word_pos_map = {}  # 記錄每個詞的詞性
-
-            for word, pos in segmented_words_with_pos:
-                word_pos_key = f"{word}_{pos}"  # 使用詞+詞性作為唯一鍵
-                word_pos_freq[word_pos_key] += 1
-                word_pos_map[word_pos_key] = {"word": word, "pos": pos}
-
-            # 轉換為排序列表
-            keywords_with_pos_freq = []
-            for word_pos_key, freq in sorted(word_pos_freq.items(), key=lambda x: x[1], reverse=True):
-                word_info = word_pos_map[word_pos_key]
-                keywords_with_pos_freq.append({
-                    "word": word_info["word"],
-                    "pos": word_info["pos"],
-                    "frequency": freq
-                })
-
-            category_keywords[category] = keywords_with_pos_freq
-
-        return category_keywords
+        return self.analyze_articles(articles).get("category_keywords_stats", {})
 
-    def analyze_articles(self, articles):
-        """分析文章集合
+    def analyze_article(self, article):
+        """分析單篇文章的關鍵詞與命名實體，供管線模式逐篇處理
 
         Args:
-            articles (list): 文章字典列表
+            article (dict): 文章字典
+
+        Returns:
+            dict: 單篇分析結果，可由 aggregate_article_analyses 彙整
+        """
+        content = article.get("content", "")
+        # 與 analyze_article_batch 相同，以去除前後空白的內容分析，實體位置再換算回原內容
+        text = (content or "").strip()
+        lead = len(content or "") - len((content or "").lstrip())
+        words_with_pos = self.segment_text(text) if text else []
+        entities = self.identify_named_entities(text, with_offsets=True) if text else []
+        for entity in entities:
+            entity['offset'] = [entity['offset'][0] + lead, entity['offset'][1] + lead]
+
+        return {
+            "item_id": article.get("item_id", ""),
+            "title": article.get("title", "未知標題"),
+            "category": article.get("category", "未知"),
+            "has_content": bool(content),
+            "words_with_pos": words_with_pos,
+            "named_entities": entities
+        }
+
+    def aggregate_article_analyses(self, article_analyses):
+        """將逐篇分析結果彙整成與 analyze_articles 相同格式的分析結果
+
+        類別統計由各篇文章的結果加總而得，不需再對合併後的文本重新斷詞
+
+        Args:
+            article_analyses (iterable): analyze_article 的結果，可為逐篇產生的迭代器
 
         Returns:
             dict: 分析結果
         """
-        if not articles:
-            return {"error": "沒有文章可分析"}
+        counters = AnalysisCounters()
+        for analysis in article_analyses:
+            counters.add(analysis)
+        return counters.result()
+
+    def article_terms(self, analysis):
+        """單篇文章在 article_terms.jsonl 中的記錄，沒有文章編號或內容時返回 None"""
+        if not analysis.get("item_id") or not analysis["has_content"]:
+            return None
+        keywords = Counter((word, pos) for word, pos in analysis["words_with_pos"])
+        entities = Counter((entity["entity"], entity["entity_type"]) for entity in analysis["named_entities"])
+        return {
+            "item_id": analysis["item_id"],
+            "keywords": [[word, pos, count] for (word, pos), count in keywords.items()],
+            "entities": [[entity, entity_type, count] for (entity, entity_type), count in entities.items()]
+        }
 
-        # 合併所有文章內容作為語料庫
-        corpus = ""
-        for article in articles:
-            if "content" in article and article["content"]:
-                corpus += article["content"] + "\n"
+    def write_article_terms(self, article_analyses):
+        """將每篇文章的關鍵詞與命名實體出現次數逐篇寫入 article_terms.jsonl，並原樣產生分析結果
 
-        # 斷詞結果（包含詞性標籤，只有符合條件的詞）
-        segmented_corpus_with_pos = self.segment_text(corpus)
+        檔案由網站匯入文章關鍵詞與命名實體表，搜尋與人物分析可直接查詢，不需掃描文章內容
 
-        # 提取只有詞的列表（用於計算總詞數）
-        segmented_corpus = [word for word, _ in segmented_corpus_with_pos]
+        Args:
+            article_analyses (iterable): analyze_article 的結果
 
-        # 詞頻統計（只根據詞）
-        word_freq = {}
-        for word in segmented_corpus:
-            word_freq[word] = word_freq.get(word, 0) + 1
+        Yields:
+            dict: 與輸入相同的分析結果
+        """
+        path = os.path.join(self.output_dir, ARTICLE_TERMS_FILE)
+        with open(path, 'w', encoding='utf-8') as f:
+            for analysis in article_analyses:
+                record = self.article_terms(analysis)
+                if record is not None:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                yield analysis
 
-        # 排序詞頻
-        sorted_word_freq = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-
-        # 根據詞性和詞頻提取關鍵詞
-        keywords = self.extract_keywords(segmented_corpus_with_pos)
-
-        # 命名實體識別
-        named_entities = self.identify_named_entities(corpus)
-
-        # 按類別分析關鍵詞統計
-        category_keywords_stats = self.analyze_by_category(articles)
-
-        # 按類別分析命名實體統計
-        category_entities_stats = self.process_named_entities(articles)
-
-        # 獲取每篇文章的關鍵詞和命名實體
-        articles_analysis = []
-        for article in articles:
-            if "content" in article and article["content"]:
-                title = article.get("title", "未知標題")
-                article_words_with_pos = self.segment_text(article["content"])
-                article_keywords = self.extract_keywords(article_words_with_pos, topK=10)
-                article_entities = self.identify_named_entities(article["content"])
-
-                articles_analysis.append({
-                    "title": title,
-                    "keywords": article_keywords,
-                    "named_entities": [{'entity': entity.word, 'entity_type': entity.ner} for entity in
-                                       article_entities]
-                })
-
-        result = {
-            "total_articles": len(articles),
-            "total_words": len(segmented_corpus),
-            "unique_words": len(word_freq),
-            "top_words": sorted_word_freq[:50],  # 前50個高頻詞
-            "keywords": keywords,
-            "named_entities": [{'entity': entity.word, 'entity_type': entity.ner} for entity in named_entities],
-            "articles_analysis": articles_analysis,
-            "category_keywords_stats": category_keywords_stats,  # 按類別的關鍵詞統計
-            "category_entities_stats": category_entities_stats  # 按類別的命名實體統計
-        }
+    def process_article_analyses(self, article_analyses, output_dir=None):
+        """彙整逐篇分析結果並輸出，與 process_articles 輸出相同的檔案
+
+        Args:
+            article_analyses (iterable): analyze_article 的結果，可為逐篇產生的迭代器
+            output_dir (str, optional): 輸出目錄，不指定則使用初始化時設定的目錄
+
+        Returns:
+            bool: 是否成功處理
+        """
+        try:
+            if output_dir is not None:
+                self.output_dir = output_dir
+            os.makedirs(self.output_dir, exist_ok=True)
+
+            analysis_result = self.aggregate_article_analyses(self.write_article_terms(article_analyses))
+            self.save_analysis_result(analysis_result)
+
+            self.logger.info(f"所有處理結果已保存到目錄: {self.output_dir}")
+            return True
+        except Exception as e:
+            self.logger.error(f"處理文章分析結果時發生錯誤: {e}")
+            return False
+
+    def analyze_articles(self, articles):
+        """分析文章集合
 
-        return result
+        每篇文章只進行一次斷詞、詞性標註與命名實體識別，
+        語料庫與類別統計皆由逐篇結果彙整，不需對合併後的文本重複分析
+
+        Args:
+            articles (list): 文章字典列表
+
+        Returns:
+            dict: 分析結果
+        """
+        if not articles:
+            return {"error": "沒有文章可分析"}
+
+        if self.pool is not None:
+            return self.aggregate_in_pool(articles)
+        return self.aggregate_article_analyses(self.iter_article_analyses(articles))
 
     def save_analysis_result(self, result, output_file=None):
         """保存分析結果到檔案，只輸出所需的分析結果
@@ -1052,8 +2230,14 @@ class CTTextProcessor:
             self.logger.info(
                 f"只保存包含目標詞性({', '.join(self.target_pos)})且長度>={self.min_keyword_length}的關鍵詞統計")
 
-            # 分析文章
-            analysis_result = self.analyze_articles(articles)
+            # 分析文章，同時輸出每篇文章的關鍵詞與命名實體
+            if articles and self.pool is not None:
+                analysis_result = self.aggregate_in_pool(articles, write_terms=True)
+            elif articles:
+                analysis_result = self.aggregate_article_analyses(
+                    self.write_article_terms(self.iter_article_analyses(articles)))
+            else:
+                analysis_result = self.analyze_articles(articles)
 
             # 保存分析結果（只保存主要的關鍵詞統計）
             self.save_analysis_result(analysis_result)
@@ -0,0 +1,84 @@
+import re
+from collections import namedtuple
+
+# 句段文字與其在原文中的位置 (start 包含、end 不包含)
+TextChunk = namedtuple('TextChunk', ['text', 'start', 'end'])
+
+# 句子結尾的標點，優先在此處斷開
+SENTENCE_END = re.compile(r'[。！？!?；;\n]+')
+# 單句超過長度時，退而在子句標點處斷開
+CLAUSE_END = re.compile(r'[，,、：:]+')
+
+
+def _split_after(pattern, text, offset):
+    """在符合 pattern 的標點之後斷開，返回 (片段, 起始位置) 列表，標點保留在前一片段"""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append((text[start:match.end()], offset + start))
+        start = match.end()
+    if start < len(text):
+        pieces.append((text[start:], offset + start))
+    return pieces
+
+
+def _pieces(text, max_length):
+    """將文本拆成不超過 max_length 字的片段：先依句子，再依子句，最後依長度硬切"""
+    for sentence, start in _split_after(SENTENCE_END, text, 0):
+        if len(sentence) <= max_length:
+            yield sentence, start
+            continue
+        for clause, clause_start in _split_after(CLAUSE_END, sentence, start):
+            for i in range(0, len(clause), max_length):
+                yield clause[i:i + max_length], clause_start + i
+
+
+def chunk_text(text, max_length=256):
+    """
+    依中文句子標點將文本切分為不超過 max_length 字的句段
+
+    相鄰的短句會合併，使每個句段接近但不超過最大長度，減少模型的補齊與截斷；
+    句段以產生器逐一返回，記憶體用量與文本長度無關。每個句段記錄在原文中的位置，
+    模型輸出的詞與實體位置可用 to_source_offset 對應回原文
+
+    Args:
+        text (str): 文本
+        max_length (int): 每個句段的最大字數
+
+    Yields:
+        TextChunk: (句段文字, 起始位置, 結束位置)，只包含空白的句段會略過
+    """
+    if not text:
+        return
+
+    current_start = None
+    current_end = 0
+    for piece, start in _pieces(text, max_length):
+        end = start + len(piece)
+        if current_start is not None and end - current_start > max_length:
+            chunk = text[current_start:current_end]
+            if chunk.strip():
+                yield TextChunk(chunk, current_start, current_end)
+            current_start = None
+        if current_start is None:
+            current_start = start
+        current_end = end
+
+    if current_start is not None:
+        chunk = text[current_start:current_end]
+        if chunk.strip():
+            yield TextChunk(chunk, current_start, current_end)
+
+
+def to_source_offset(chunk, span):
+    """
+    將句段內的位置對應回原文位置
+
+    Args:
+        chunk (TextChunk): 句段
+        span (tuple): 句段內的 (start, end)，如 CKIP NerToken.idx
+
+    Returns:
+        tuple: 原文中的 (start, end)
+    """
+    return chunk.start + span[0], chunk.start + span[1]
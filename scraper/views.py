@@ -17,8 +17,8 @@ from .models import ScrapeJob, Article, KeywordAnalysis, NamedEntityAnalysis, Se
     CategorySentimentSummary, AIReport, ArticleSummary
 from .forms import LoginForm, ScrapeJobForm, KeywordFilterForm, AdvancedSearchForm
 from .services.search_service import SearchAnalysisService
-from .services.task_service import execute_scraper_task
-from .services.sentiment_service import analyze_job_sentiment, SentimentAnalysisService
+from .services.task_service import execute_scraper_task, execute_resume_task, is_scraper_task_active
+from .services.sentiment_service import analyze_job_sentiment_async, SentimentAnalysisService
 from .services.analysis_service import (
     get_keywords_analysis,
     get_entities_analysis,
@@ -362,6 +362,25 @@ def job_delete(request, job_id):
     return redirect('job_list')
 
 
+@login_required
+def job_resume(request, job_id):
+    """從檢查點接續執行中斷的爬蟲任務"""
+    job = get_object_or_404(ScrapeJob, id=job_id, user=request.user)
+
+    if request.method != 'POST':
+        return redirect('job_detail', job_id=job.id)
+
+    if job.status not in ('running', 'failed'):
+        messages.warning(request, '只有執行中斷或失敗的任務可以接續執行')
+    elif is_scraper_task_active(job.id):
+        messages.warning(request, '此任務仍在執行中')
+    else:
+        execute_resume_task(job.id)
+        messages.success(request, f'爬蟲任務 #{job.id} 已從檢查點接續執行')
+
+    return redirect('job_detail', job_id=job.id)
+
+
 ##########################################
 @login_required
 def job_search_analysis(request, job_id):
@@ -547,6 +566,7 @@ def analyze_search_terms(request):
         if not search_terms:
             return JsonResponse({'status': 'error', 'message': '未提供搜索詞'})
 
+        # CKIP 模型由程序內共用的模型登錄提供，建立處理器不會重新載入模型
         processor = CTTextProcessor(output_dir=settings.MEDIA_ROOT)
 
         # 進行斷詞
@@ -1007,7 +1027,7 @@ def job_sentiment_analysis(request, job_id):
     if analyze_now:
         # 啟動情感分析
         messages.info(request, '情感分析已啟動，這可能需要一些時間...')
-        analyze_job_sentiment(job_id)
+        analyze_job_sentiment_async(job_id)
         return redirect('job_sentiment_analysis', job_id=job_id)
 
     # 獲取情感分析服務
@@ -1139,10 +1159,7 @@ def start_sentiment_analysis(request, job_id):
     analyzed_articles = SentimentAnalysis.objects.filter(job=job).count()
 
     # 啟動情感分析
-    import threading
-    thread = threading.Thread(target=analyze_job_sentiment, args=(job_id,))
-    thread.daemon = True
-    thread.start()
+    analyze_job_sentiment_async(job_id)
 
     return JsonResponse({
         'status': 'success',
@@ -1515,7 +1532,7 @@ def start_summary_analysis(request, job_id):
         })
 
     # 啟動摘要分析
-    thread = analyze_job_summaries_async(job_id)
+    task = analyze_job_summaries_async(job_id)
 
     return JsonResponse({
         'status': 'success',